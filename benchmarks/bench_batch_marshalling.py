@@ -0,0 +1,37 @@
+"""
+Benchmark of the batch mode marshalling: cell by cell ctypes arrays versus row pointer tables over contiguous NumPy
+blocks. This script does not need the twin runtime library.
+
+Usage: python benchmarks/bench_batch_marshalling.py
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import pytwin.twin_runtime.twin_runtime_core as twin_runtime_core
+
+
+def main(rows: int = 2000, cols: int = 51, repeat: int = 5):
+    input_df = pd.DataFrame(np.random.rand(rows, cols))
+    t_cells = t_block = float("inf")
+    for _ in range(repeat):
+        # Cell by cell marshalling (previous implementation)
+        t0 = time.perf_counter()
+        twin_runtime_core.build_ctype_2d_array(rows, input_df.astype(np.float64))
+        out_data = twin_runtime_core.build_empty_ctype_2d_array(rows, cols)
+        data = [np.ctypeslib.as_array(out_data[i], shape=(cols,)) for i in range(rows)]
+        pd.DataFrame(data=data)
+        t_cells = min(t_cells, time.perf_counter() - t0)
+        # Row pointer tables over contiguous blocks
+        t0 = time.perf_counter()
+        input_block = np.ascontiguousarray(input_df.to_numpy(dtype=np.float64))
+        twin_runtime_core.build_ctype_row_pointers(input_block)
+        output_block = np.empty((rows, cols), dtype=np.float64)
+        twin_runtime_core.build_ctype_row_pointers(output_block)
+        pd.DataFrame(data=output_block, copy=False)
+        t_block = min(t_block, time.perf_counter() - t0)
+    print(f"Batch marshalling of {rows}x{cols} values: cell by cell {t_cells:.4f}s, block {t_block:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmarks of the twin model evaluation fast paths: step by step evaluation with dictionaries versus arrays, and
+parametric sweep cases evaluated with initialize_evaluation versus evaluate_sweep_case. This script needs the twin
+runtime library.
+
+Start values of inputs and parameters are now queried once per TwinModel instance, which also speeds up
+initialize_evaluation. The sweep baseline therefore queries start values again before each initialize_evaluation call
+(one twin_get_var_start call per variable), as initialize_evaluation did before; initialize_evaluation with cached start
+values is reported as well.
+
+Usage: python benchmarks/bench_twin_model.py [path_to_your_twin_model.twin]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from pytwin import TwinModel
+
+COUPLE_CLUTCHES_FILEPATH = os.path.join(
+    os.path.dirname(__file__), "..", "tests", "evaluate", "data", "CoupleClutches_22R2_other.twin"
+)
+
+
+def bench_step_by_step(twin: TwinModel, step_count: int = 1000):
+    input_name = twin.input_names[0]
+    twin.initialize_evaluation()
+    t0 = time.perf_counter()
+    for i in range(step_count):
+        twin.evaluate_step_by_step(step_size=0.001, inputs={input_name: i / step_count})
+    t_dict = (time.perf_counter() - t0) / step_count
+
+    twin.initialize_evaluation()
+    inputs = np.array(list(twin.inputs.values()))
+    outputs = np.empty(len(twin.output_names))
+    t0 = time.perf_counter()
+    for i in range(step_count):
+        inputs[0] = i / step_count
+        twin.evaluate_step_by_step_array(step_size=0.001, inputs=inputs, outputs=outputs)
+    t_array = (time.perf_counter() - t0) / step_count
+    print(f"Step by step evaluation: {t_dict * 1e6:.1f}us per step (dict), {t_array * 1e6:.1f}us per step (array)")
+
+
+def bench_sweep_cases(twin: TwinModel, case_count: int = 200):
+    parameter_name = list(twin.parameters)[0]
+    input_name = twin.input_names[0]
+    cases = [
+        {"parameters": {parameter_name: 1.0 + i % 5}, "inputs": {input_name: (i % 3) / 2}} for i in range(case_count)
+    ]
+    metadata = twin._metadata
+    twin._metadata = None
+    t0 = time.perf_counter()
+    for case in cases:
+        # Baseline: start values queried from the twin runtime at every initialization
+        twin._cache_start_values()
+        twin.initialize_evaluation(parameters=case["parameters"], inputs=case["inputs"])
+    t_baseline = time.perf_counter() - t0
+    twin._metadata = metadata
+    twin._cache_start_values()
+    t0 = time.perf_counter()
+    for case in cases:
+        twin.initialize_evaluation(parameters=case["parameters"], inputs=case["inputs"])
+    t_init = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for case in cases:
+        twin.evaluate_sweep_case(case["parameters"], case["inputs"])
+    t_sweep = time.perf_counter() - t0
+    print(
+        f"Sweep cases: {case_count / t_baseline:.0f} cases/s (initialize_evaluation querying start values), "
+        f"{case_count / t_init:.0f} cases/s (initialize_evaluation), "
+        f"{case_count / t_sweep:.0f} cases/s (evaluate_sweep_case)"
+    )
+
+
+def main(model_filepath: str = COUPLE_CLUTCHES_FILEPATH):
+    twin = TwinModel(model_filepath=model_filepath)
+    bench_step_by_step(twin)
+    bench_sweep_cases(twin)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -31,12 +31,9 @@ These parameters can be defined in the Twin Builder subsheet before Twin compila
 ###############################################################################
 # Import all necessary modules and launch an instance of MAPDL
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-import struct
-
 from ansys.mapdl.core import launch_mapdl
 import numpy as np
-import pandas as pd
-from pytwin import TwinModel, download_file
+from pytwin import TwinModel, download_file, read_tbrom_points, read_tbrom_snapshot
 import pyvista as pv
 
 twin_file = download_file("ThermalTBROM_23R1_other.twin", "twin_files")
@@ -54,29 +51,6 @@ print(mapdl)
 cfd_inputs = {"main_inlet_temperature": 353.15, "side_inlet_temperature": 293.15}
 rom_parameters = {"ThermalROM23R1_1_store_snapshots": 1}
 
-###############################################################################
-# Auxiliary functions definition
-# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-# Conversion of ROM snapshot for data mapping on FEA mesh.
-
-
-def snapshot_to_fea(snapshot_file, geometry_file):
-    """Create a Pandas Dataframe containing the ROM geometry x, y , z coordinates as well as the snapshot file result"""
-    with open(geometry_file, "rb") as geo, open(snapshot_file, "rb") as snp:
-        nb = struct.unpack("Q", snp.read(8))[0]
-        struct.unpack("Q", geo.read(8))
-        res_list = []
-        for i in range(nb):
-            res_line = []
-            res_line.append(struct.unpack("d", geo.read(8))[0])
-            res_line.append(struct.unpack("d", geo.read(8))[0])
-            res_line.append(struct.unpack("d", geo.read(8))[0])
-            res_line.append(struct.unpack("d", snp.read(8))[0])
-            res_list.append(res_line)
-
-    return pd.DataFrame(res_list)
-
-
 ###############################################################################
 # Import and save the mesh.
 # ~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -102,19 +76,18 @@ rom_name = twin_model.tbrom_names[0]
 snapshot = twin_model.get_snapshot_filepath(rom_name=rom_name)
 geometry = twin_model.get_geometry_filepath(rom_name=rom_name)
 
-temperature_file = snapshot_to_fea(snapshot, geometry)
+# Read the ROM geometry x, y, z coordinates and the temperature snapshot as NumPy arrays
+points = read_tbrom_points(geometry)
+temperature = read_tbrom_snapshot(snapshot)
 
 ###############################################################################
 # Map temperature data to FEA mesh
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
-temperature_data = temperature_file.values  # Save data to a NumPy array
-nd_temp_data = temperature_data[:, :].astype(float)  # Change data type to Float
-
 # Map temperature data to FE mesh
 # Convert imported data into PolyData format
-wrapped = pv.PolyData(nd_temp_data[:, :3])  # Convert NumPy array to PolyData format
-wrapped["temperature"] = nd_temp_data[:, 3]  # Add a scalar variable 'temperature' to PolyData
+wrapped = pv.PolyData(points)  # Convert NumPy array to PolyData format
+wrapped["temperature"] = temperature  # Add a scalar variable 'temperature' to PolyData
 
 # Perform data mapping
 inter_grid = grid.interpolate(
@@ -38,7 +38,36 @@ PYTWIN_LOGGING_OPT_NOLOGGING = PyTwinLogOption.PYTWIN_LOGGING_OPT_NOLOGGING
 """
 PUBLIC API TO PYTWIN EVALUATE 
 """
+from pytwin.evaluate.async_twin_model import AsyncTwinModel
+from pytwin.evaluate.saved_state_registry import RetentionPolicy
+from pytwin.evaluate.saved_state_storage import SavedStateStorage, SavedStateStorageError
+from pytwin.evaluate.state_snapshot import StateSnapshot, StateSnapshotStore, StateSnapshotStoreError
+from pytwin.evaluate.tbrom import (
+    TbromError,
+    TBROMImagePrefetcher,
+    TBROMProbe,
+    TBROMReconstructor,
+    TBROMSeries,
+    map_tbrom_image_files,
+    nearest_point_indices,
+    read_tbrom_basis,
+    read_tbrom_points,
+    read_tbrom_snapshot,
+)
 from pytwin.evaluate.twin_model import TwinModel, TwinModelError
+from pytwin.evaluate.twin_model_metadata import get_twin_model_metadata, read_twin_model_metadata
+from pytwin.evaluate.twin_model_pool import TwinModelPool, TwinModelPoolError
+
+"""
+PUBLIC API TO PYTWIN SWEEP
+"""
+from pytwin.sweep.parametric_sweep import (
+    ParametricSweep,
+    ParametricSweepError,
+    SweepResult,
+    full_factorial,
+    latin_hypercube,
+)
 
 """
 PUBLIC API TO PYTWIN RUNTIME 
@@ -0,0 +1,140 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from pytwin.evaluate.twin_model import TwinModel
+
+
+class AsyncTwinModel:
+    """
+    The public class to evaluate a twin model from asyncio code without blocking the event loop. It owns a
+    TwinModel whose calls (including its instantiation) run on a dedicated single thread executor. Calls on the same
+    instance are therefore executed one at a time in submission order, while calls on different instances proceed
+    concurrently.
+
+    Awaitable methods have the same arguments and raise the same errors as their TwinModel counterparts.
+
+    Parameters
+    ----------
+    model_filepath : str
+        File path to the twin model (with .twin) extension.
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> from pytwin import AsyncTwinModel
+    >>>
+    >>> async def main():
+    >>>     async with AsyncTwinModel(model_filepath='path_to_your_twin_model.twin') as twin_model:
+    >>>         await twin_model.initialize_evaluation(inputs={'input1': 1., 'input2': 2.})
+    >>>         outputs = await twin_model.evaluate_step_by_step(step_size=0.1, inputs={'input1': 10., 'input2': 20.})
+    >>>
+    >>> asyncio.run(main())
+    """
+
+    def __init__(self, model_filepath: str):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="AsyncTwinModel")
+        self._twin_model_future = self._executor.submit(TwinModel, model_filepath)
+
+    async def __aenter__(self):
+        await self.run(lambda twin_model: None)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def _call(self, function: Callable, args: tuple, kwargs: dict):
+        return function(self._twin_model_future.result(), *args, **kwargs)
+
+    @property
+    def twin_model(self):
+        """
+        Wrapped TwinModel (blocks until it is instantiated). Use it only to read properties when no call is pending,
+        since pending calls modify it from the executor thread.
+        """
+        return self._twin_model_future.result()
+
+    async def run(self, function: Callable, *args, **kwargs):
+        """
+        Run function(twin_model, *args, **kwargs) on the executor of this instance, after all previously submitted
+        calls, and return its result.
+
+        Parameters
+        ----------
+        function : Callable
+            The function to run. Its first argument is the wrapped TwinModel.
+
+        Examples
+        --------
+        >>> image_filepath = await twin_model.run(TwinModel.get_image_filepath, 'rom_name', 'view_name', 0.1)
+        """
+        if self._executor is None:
+            raise RuntimeError("AsyncTwinModel has been closed!")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self._call, function, args, kwargs))
+
+    async def close(self):
+        """
+        Wait for pending calls, release the twin model and shut down the executor.
+        """
+        if self._executor is not None:
+            await self.run(lambda twin_model: None)
+            self._twin_model_future = None
+            executor = self._executor
+            self._executor = None
+            executor.shutdown(wait=False)
+
+    async def initialize_evaluation(
+        self, parameters: dict = None, inputs: dict = None, json_config_filepath: str = None, tbrom_outputs: bool = True
+    ):
+        """
+        Awaitable counterpart of TwinModel.initialize_evaluation.
+        """
+        await self.run(TwinModel.initialize_evaluation, parameters, inputs, json_config_filepath, tbrom_outputs)
+
+    async def evaluate_step_by_step(self, step_size: float, inputs: dict = None):
+        """
+        Awaitable counterpart of TwinModel.evaluate_step_by_step. Return a copy of the outputs dictionary taken right
+        after the evaluation, since later calls may update the twin model outputs before the caller reads them.
+        """
+
+        def _evaluate_step_by_step(twin_model: TwinModel):
+            twin_model.evaluate_step_by_step(step_size, inputs)
+            return dict(twin_model.outputs)
+
+        return await self.run(_evaluate_step_by_step)
+
+    async def evaluate_step_by_step_array(
+        self, step_size: float, inputs: np.ndarray = None, outputs: np.ndarray = None
+    ):
+        """
+        Awaitable counterpart of TwinModel.evaluate_step_by_step_array.
+        """
+        return await self.run(TwinModel.evaluate_step_by_step_array, step_size, inputs, outputs)
+
+    async def evaluate_batch(self, inputs_df: pd.DataFrame):
+        """
+        Awaitable counterpart of TwinModel.evaluate_batch.
+        """
+        return await self.run(TwinModel.evaluate_batch, inputs_df)
+
+    async def evaluate_batch_array(self, time: np.ndarray, inputs=None, output_array: np.ndarray = None):
+        """
+        Awaitable counterpart of TwinModel.evaluate_batch_array.
+        """
+        return await self.run(TwinModel.evaluate_batch_array, time, inputs, output_array)
+
+    async def save_state(self):
+        """
+        Awaitable counterpart of TwinModel.save_state.
+        """
+        await self.run(TwinModel.save_state)
+
+    async def load_state(self, model_id: str, evaluation_time: float, epsilon: float = 1e-8):
+        """
+        Awaitable counterpart of TwinModel.load_state.
+        """
+        await self.run(TwinModel.load_state, model_id, evaluation_time, epsilon)
@@ -1,10 +1,15 @@
+import bisect
+import contextlib
 import json
+import math
 import os
+import threading
 import uuid
 
-import numpy as np
 from pytwin import get_pytwin_logger
 from pytwin.evaluate.model import Model
+from pytwin.evaluate.saved_state_storage import SavedStateStorage
+from pytwin.evaluate.state_snapshot import snapshot_exchange_dir
 
 
 class SavedState:
@@ -17,6 +22,7 @@ class SavedState:
     INPUTS_KEY = "inputs"
     OUTPUTS_KEY = "outputs"
     PARAMETERS_KEY = "parameters"
+    STORAGE_KEY = "storage"
 
     def __init__(self):
         self._id = f"{uuid.uuid4()}"[0:8]
@@ -24,6 +30,7 @@ class SavedState:
         self.inputs = None
         self.outputs = None
         self.parameters = None
+        self.storage = None
 
     def dump(self):
         var = dict()
@@ -32,6 +39,8 @@ class SavedState:
         var[self.INPUTS_KEY] = self.inputs
         var[self.OUTPUTS_KEY] = self.outputs
         var[self.PARAMETERS_KEY] = self.parameters
+        if self.storage is not None:
+            var[self.STORAGE_KEY] = self.storage
         return var
 
     def load(self, json_dict: dict):
@@ -41,6 +50,7 @@ class SavedState:
         self.inputs = json_dict[self.INPUTS_KEY]
         self.outputs = json_dict[self.OUTPUTS_KEY]
         self.parameters = json_dict[self.PARAMETERS_KEY]
+        self.storage = json_dict.get(self.STORAGE_KEY)
 
     @staticmethod
     def _raise_error(msg):
@@ -62,18 +72,91 @@ class SavedStateError(Exception):
         return f"[SavedStateError] {self.args[0]}"
 
 
+class RetentionPolicy:
+    """
+    Retention policy of the saved states of a registry (see SavedStateRegistry.apply_retention_policy).
+
+    A saved state is retained if it is one of the keep_last most recently registered ones, or the most recently
+    registered one of its time bucket. If neither keep_last nor time_bucket is given, all saved states are retained.
+    Then, if max_bytes is given, the oldest retained saved states are pruned until their files total size is below
+    max_bytes. The most recently registered saved state is never pruned.
+
+    Parameters
+    ----------
+    keep_last : int, optional
+        Number of most recently registered saved states to retain.
+    time_bucket : float, optional
+        Duration (in second of evaluation time) of the buckets in which one saved state is retained.
+    max_bytes : int, optional
+        Maximum total size of the retained saved state files.
+    """
+
+    def __init__(self, keep_last: int = None, time_bucket: float = None, max_bytes: int = None):
+        if keep_last is not None and keep_last < 1:
+            raise SavedStateRegistryError(f"keep_last must be strictly positive ({keep_last} was provided)!")
+        if time_bucket is not None and time_bucket <= 0.0:
+            raise SavedStateRegistryError(f"time_bucket must be strictly positive ({time_bucket} was provided)!")
+        if max_bytes is not None and max_bytes < 0:
+            raise SavedStateRegistryError(f"max_bytes must be positive ({max_bytes} was provided)!")
+        self.keep_last = keep_last
+        self.time_bucket = time_bucket
+        self.max_bytes = max_bytes
+
+    def select(self, saved_states: list, sizes: list):
+        """
+        Return the positions of the retained saved states, given the saved states in registration order and the size
+        of their files.
+        """
+        count = len(saved_states)
+        if self.keep_last is None and self.time_bucket is None:
+            retained = set(range(count))
+        else:
+            retained = set()
+            if self.keep_last is not None:
+                retained.update(range(max(0, count - self.keep_last), count))
+            if self.time_bucket is not None:
+                last_of_bucket = dict()
+                for i, ss in enumerate(saved_states):
+                    last_of_bucket[math.floor(ss.time / self.time_bucket)] = i
+                retained.update(last_of_bucket.values())
+        retained = sorted(retained)
+        if self.max_bytes is not None:
+            total_bytes = sum(sizes[i] for i in retained)
+            while total_bytes > self.max_bytes and len(retained) > 1:
+                total_bytes -= sizes[retained.pop(0)]
+        return retained
+
+
 class SavedStateRegistry:
     """
     This class manages a registry of twin model saved states. It registers meta-data associated to saved state, persists
     it and provide append and extract saved state methods.
+
+    Saved states are appended to a JSON-lines registry file (one saved state per line) so that appending does not
+    rewrite the registry. Registry files written by previous versions (single JSON document) are still read. An
+    in-memory index sorted by time is updated incrementally, reading only the lines appended since the last read.
+
+    Saved states can be pruned with a retention policy, either on demand or periodically by a background thread.
+
+    Saved state files are stored through a SavedStateStorage (raw by default), that may compress them and/or
+    deduplicate their content. Use saved_state_file to get a raw saved state file to load in the twin runtime.
     """
 
     SAVED_STATES_KEY = "saved_states"
 
-    def __init__(self, model_id: str, model_name: str):
+    def __init__(self, model_id: str, model_name: str, storage: SavedStateStorage = None):
+        self._storage = storage if storage is not None else SavedStateStorage()
         self._model_id = None
         self._model_name = None
-        self._saved_states = None
+        self._saved_states = []
+        self._times = []
+        self._time_index = []
+        self._legacy_registry_is_read = False
+        self._read_offset = 0
+        self._registry_file_id = None
+        self._lock = threading.RLock()
+        self._compaction_thread = None
+        self._compaction_stop = None
 
         self._check_model_dir_exists(model_id, model_name)
         self._model_id = model_id
@@ -92,21 +175,180 @@ class SavedStateRegistry:
 
     @property
     def registry_filename(self):
-        return "registry.json"
+        return "registry.jsonl"
 
     @property
     def registry_filepath(self):
         return os.path.join(self.backup_folderpath, self.registry_filename)
 
+    @property
+    def legacy_registry_filepath(self):
+        return os.path.join(self.backup_folderpath, "registry.json")
+
+    @property
+    def storage(self):
+        """Storage of the saved state files appended to the registry."""
+        return self._storage
+
+    @storage.setter
+    def storage(self, storage: SavedStateStorage):
+        with self._lock:
+            self._storage = storage
+
+    @property
+    def saved_states(self):
+        """Saved states registered so far, in registration order."""
+        with self._lock:
+            self._read_registry()
+            return list(self._saved_states)
+
     def append_saved_state(self, ss: SavedState):
-        if self._saved_states is None:
-            self._saved_states = []
-        self._saved_states.append(ss)
-        self._write_registry()
+        """
+        Register a saved state. Its raw saved state file (see return_saved_state_filepath), if any, is stored through
+        the registry storage first.
+        """
+        with self._lock:
+            ss_filepath = self.return_saved_state_filepath(ss)
+            if os.path.exists(ss_filepath):
+                ss.storage = self._storage.store(ss_filepath, self.backup_folderpath)
+            self._append_saved_state(ss)
+
+    @contextlib.contextmanager
+    def saved_state_file(self, ss: SavedState):
+        """
+        Context manager providing the path of the raw saved state file of a registered saved state. Stored (compressed
+        or chunked) saved states are restored into a temporary file that is removed on exit.
+
+        Examples
+        --------
+        >>> with registry.saved_state_file(ss) as ss_filepath:
+        >>>     twin_runtime.twin_load_state(ss_filepath, ss.time)
+        """
+        ss_filepath = self.return_saved_state_filepath(ss)
+        if ss.storage is None or SavedStateStorage.stored_filepath(ss_filepath, ss.storage) == ss_filepath:
+            yield ss_filepath
+            return
+        temp_filepath = os.path.join(snapshot_exchange_dir(), f"pytwin_saved_state_{uuid.uuid4().hex[0:8]}.bin")
+        try:
+            with self._lock:
+                self._storage.restore(ss_filepath, ss.storage, self.backup_folderpath, temp_filepath)
+            yield temp_filepath
+        finally:
+            if os.path.exists(temp_filepath):
+                os.remove(temp_filepath)
+
+    def apply_retention_policy(self, retention_policy: RetentionPolicy):
+        """
+        Prune the saved states that are not retained by the given policy. The registry file is rewritten under a
+        temporary name then atomically renamed, before the files (and chunks) of the pruned saved states are removed.
+        Return the pruned saved states.
+        """
+        with self._lock:
+            self._read_registry()
+            sizes = [
+                SavedStateStorage.stored_size(self.return_saved_state_filepath(ss), ss.storage)
+                for ss in self._saved_states
+            ]
+            retained = retention_policy.select(self._saved_states, sizes)
+            if len(retained) == len(self._saved_states):
+                return []
+            retained_states = [self._saved_states[i] for i in retained]
+            retained_ids = set(ss._id for ss in retained_states)
+            pruned_states = [ss for ss in self._saved_states if ss._id not in retained_ids]
+
+            try:
+                # Rewrite registry atomically, legacy registry entries are migrated into the new registry file
+                temp_filepath = f"{self.registry_filepath}.{uuid.uuid4().hex[0:8]}.tmp"
+                with open(temp_filepath, "wb") as fp:
+                    for ss in retained_states:
+                        fp.write(self._saved_state_line(ss))
+                os.replace(temp_filepath, self.registry_filepath)
+                if os.path.exists(self.legacy_registry_filepath):
+                    os.remove(self.legacy_registry_filepath)
+            except Exception as e:
+                msg = f"Something went wrong while compacting registry file {self.registry_filename}!"
+                msg += f"\n{str(e)}"
+                self._raise_error(msg)
+
+            self._reset_index()
+            self._read_registry()
+
+            # Remove the saved state files and chunks of pruned states only: files of saved states that are being
+            # saved but not registered yet must not be removed
+            for ss in pruned_states:
+                ss_filepath = self.return_saved_state_filepath(ss)
+                for filepath in {ss_filepath, SavedStateStorage.stored_filepath(ss_filepath, ss.storage)}:
+                    if filepath is not None and os.path.exists(filepath):
+                        try:
+                            os.remove(filepath)
+                        except OSError:
+                            pass
+            SavedStateStorage.collect_chunks(
+                self.backup_folderpath, [ss.storage for ss in pruned_states], [ss.storage for ss in retained_states]
+            )
+            get_pytwin_logger().debug(f"[SavedStateRegistry] {len(pruned_states)} saved states pruned.")
+            return pruned_states
+
+    def start_background_compaction(self, retention_policy: RetentionPolicy, interval: float):
+        """
+        Start a daemon thread applying the given retention policy every interval seconds (see apply_retention_policy).
+        A running background compaction is stopped first.
+        """
+        self.stop_background_compaction()
+        stop = threading.Event()
+
+        def _compact():
+            while not stop.wait(interval):
+                try:
+                    self.apply_retention_policy(retention_policy)
+                except Exception as e:
+                    get_pytwin_logger().warning(f"[SavedStateRegistry] Background compaction failed: {str(e)}")
+
+        self._compaction_stop = stop
+        self._compaction_thread = threading.Thread(target=_compact, name="SavedStateRegistryCompaction", daemon=True)
+        self._compaction_thread.start()
+
+    def stop_background_compaction(self):
+        """
+        Stop the background compaction thread, if any.
+        """
+        if self._compaction_thread is not None:
+            self._compaction_stop.set()
+            self._compaction_thread.join()
+            self._compaction_thread = None
+            self._compaction_stop = None
+
+    def _append_saved_state(self, ss: SavedState):
+        # Legacy registry entries were registered before any entry of the registry file
+        self._read_legacy_registry()
+        try:
+            line = self._saved_state_line(ss)
+            with open(self.registry_filepath, "ab") as fp:
+                offset = fp.seek(0, os.SEEK_END)
+                fp.write(line)
+        except Exception as e:
+            msg = f"Something went wrong while writing registry file {self.registry_filename}!"
+            msg += f"\n{str(e)}"
+            self._raise_error(msg)
+        if offset == self._read_offset:
+            # In-memory index is up-to-date with the registry file, otherwise the new line is read at next extraction
+            self._index_saved_state(ss)
+            self._read_offset = offset + len(line)
 
     def extract_saved_state(self, simulation_time: float, epsilon: float):
-        self._read_registry()
-        return self._search_saved_state(simulation_time, epsilon)
+        with self._lock:
+            self._read_registry()
+            return self._search_saved_state(simulation_time, epsilon)
+
+    def extract_saved_states_in_window(self, start_time: float, end_time: float):
+        """
+        Return saved states whose time is in [start_time, end_time], sorted by time.
+        """
+        with self._lock:
+            self._read_registry()
+            start = bisect.bisect_left(self._times, start_time)
+            end = bisect.bisect_right(self._times, end_time)
+            return [self._saved_states[i] for i in self._time_index[start:end]]
 
     def return_saved_state_filepath(self, ss: SavedState):
         return os.path.join(self.backup_folderpath, f"saved_state{ss._id}.bin")
@@ -132,72 +374,106 @@ class SavedStateRegistry:
     def _check_given_dict(self, json_dict):
         requested_keys = [self.SAVED_STATES_KEY]
         for key in requested_keys:
-            if key not in requested_keys:
-                if key not in json_dict:
-                    msg = f"Meta data is corrupted! No '{key}' key was found!"
-                    msg += f"\n{json_dict}"
-                    self._raise_error(msg)
+            if key not in json_dict:
+                msg = f"Meta data is corrupted! No '{key}' key was found!"
+                msg += f"\n{json_dict}"
+                self._raise_error(msg)
 
-    def _dump(self):
-        var = dict()
-        var[self.SAVED_STATES_KEY] = []
-        for ss in self._saved_states:
-            var[self.SAVED_STATES_KEY].append(ss.dump())
-        return var
+    def _reset_index(self):
+        self._saved_states = []
+        self._times = []
+        self._time_index = []
+        self._legacy_registry_is_read = False
+        self._read_offset = 0
+        self._registry_file_id = None
+
+    @staticmethod
+    def _saved_state_line(ss: SavedState):
+        return (json.dumps(ss.dump(), separators=(",", ":")) + "\n").encode("utf-8")
+
+    def _index_saved_state(self, ss: SavedState):
+        position = bisect.bisect_right(self._times, ss.time)
+        self._times.insert(position, ss.time)
+        self._time_index.insert(position, len(self._saved_states))
+        self._saved_states.append(ss)
 
     def _load(self, json_dict: dict):
         self._check_given_dict(json_dict)
         # Load saved states
-        self._saved_states = []
         for ss_dict in json_dict[self.SAVED_STATES_KEY]:
             ss = SavedState()
             ss.load(ss_dict)
-            self._saved_states.append(ss)
+            self._index_saved_state(ss)
+
+    def _read_legacy_registry(self):
+        if self._legacy_registry_is_read:
+            return
+        try:
+            if os.path.exists(self.legacy_registry_filepath):
+                with open(self.legacy_registry_filepath, "r", encoding="utf-8") as fp:
+                    self._load(json_dict=json.load(fp))
+        except Exception as e:
+            msg = "Something went wrong while reading legacy registry file registry.json!"
+            msg += f"\n{str(e)}"
+            self._raise_error(msg)
+        self._legacy_registry_is_read = True
 
     def _read_registry(self):
+        self._read_legacy_registry()
         try:
-            with open(self.registry_filepath, "r", encoding="utf-8") as fp:
-                self._load(json_dict=json.load(fp))
+            if not os.path.exists(self.registry_filepath):
+                if len(self._saved_states) == 0:
+                    raise FileNotFoundError(f"No registry file found in {self.backup_folderpath}")
+                return
+            registry_stat = os.stat(self.registry_filepath)
+            registry_file_id = (registry_stat.st_dev, registry_stat.st_ino)
+            if self._registry_file_id is not None and (
+                registry_file_id != self._registry_file_id or registry_stat.st_size < self._read_offset
+            ):
+                # Registry file has been compacted since last read, index is rebuilt
+                self._reset_index()
+                self._read_registry()
+                return
+            self._registry_file_id = registry_file_id
+            with open(self.registry_filepath, "rb") as fp:
+                fp.seek(self._read_offset)
+                for line in fp:
+                    if not line.endswith(b"\n"):
+                        # Line is being written, it is read next time
+                        break
+                    self._read_offset += len(line)
+                    if line.strip():
+                        ss = SavedState()
+                        ss.load(json.loads(line.decode("utf-8")))
+                        self._index_saved_state(ss)
         except Exception as e:
             msg = f"Something went wrong while reading registry file {self.registry_filename}!"
             msg += f"\n{str(e)}"
             self._raise_error(msg)
 
     def _search_saved_state(self, evaluation_time: float, epsilon: float):
-        time_instants = np.array([ss.time for ss in self._saved_states])
         tl = evaluation_time - epsilon
         tr = evaluation_time + epsilon
-        idx = np.where((time_instants > tl) & (time_instants < tr))
+        start = bisect.bisect_right(self._times, tl)
+        end = bisect.bisect_left(self._times, tr)
 
-        if len(idx[0]) == 0:
+        if start >= end:
             msg = f"No state at simulation time {evaluation_time} was found!"
             self._raise_error(msg)
 
-        if len(idx[0]) > 1:
-            times = []
-            for i in range(len(idx[0])):
-                ss = self._saved_states[idx[0][i]]
-                times.append(ss.time)
+        # First registered saved state among the ones found in the time window
+        idx = min(self._time_index[start:end])
+
+        if end - start > 1:
             msg = (
-                f"[SavedStateRegistry]Multiple saved states were found! Using first one, at simulation time {times[0]}"
+                f"[SavedStateRegistry]Multiple saved states were found! Using first one, at simulation time "
+                f"{self._saved_states[idx].time}"
             )
             logger = get_pytwin_logger()
             logger.warning(msg)
 
-        idx = idx[0][0]
-
         return self._saved_states[idx]
 
-    def _write_registry(self):
-        try:
-            # Save current registry to registry file
-            with open(self.registry_filepath, "w", encoding="utf-8") as fp:
-                json.dump(self._dump(), fp, indent=4)
-        except Exception as e:
-            msg = f"Something went wrong while writing registry file {self.registry_filename}!"
-            msg += f"\n{str(e)}"
-            self._raise_error(msg)
-
 
 class SavedStateRegistryError(Exception):
     def __str__(self):
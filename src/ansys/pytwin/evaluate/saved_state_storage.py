@@ -0,0 +1,200 @@
+import hashlib
+import lzma
+import os
+import time
+import uuid
+import zlib
+
+COMPRESSIONS = [None, "zlib", "lzma"]
+CHUNKS_FOLDER_NAME = "chunks"
+
+
+def _compress(data: bytes, compression: str, level: int):
+    if compression == "zlib":
+        return zlib.compress(data, 6 if level is None else level)
+    if compression == "lzma":
+        return lzma.compress(data, preset=0 if level is None else level)
+    return data
+
+
+def _decompress(data: bytes, compression: str):
+    if compression == "zlib":
+        return zlib.decompress(data)
+    if compression == "lzma":
+        return lzma.decompress(data)
+    return data
+
+
+def _write_file_atomically(filepath: str, data: bytes):
+    temp_filepath = f"{filepath}.{uuid.uuid4().hex[0:8]}.tmp"
+    with open(temp_filepath, "wb") as f:
+        f.write(data)
+    os.replace(temp_filepath, filepath)
+
+
+class SavedStateStorage:
+    """
+    Storage layer of the saved state files of a SavedStateRegistry. State blobs written by the twin runtime can be
+    compressed (zlib or lzma from the standard library) and/or split into fixed size chunks stored once per content
+    (named after their sha256 hash), so that nearly identical consecutive saved states share most of their chunks.
+
+    How a saved state is stored is recorded in its meta-data, so that a registry can always restore saved states
+    stored with other settings (including raw saved states written by previous versions).
+
+    Parameters
+    ----------
+    compression : str, optional
+        Compression of the blobs (or chunks): None (default), 'zlib' or 'lzma'.
+    chunk_size : int, optional
+        Size in bytes of content-addressed chunks. If None (default), each blob is stored as a single file.
+    level : int, optional
+        Compression level (zlib level or lzma preset). Default is 6 for zlib and 0 for lzma.
+
+    Examples
+    --------
+    >>> from pytwin import SavedStateStorage, TwinModel
+    >>> twin_model = TwinModel('model.twin')
+    >>> twin_model.set_saved_state_storage(SavedStateStorage(compression='zlib', chunk_size=64 * 1024))
+    >>> twin_model.initialize_evaluation()
+    >>> for i in range(100):
+    >>>     twin_model.evaluate_step_by_step(step_size=0.1)
+    >>>     twin_model.save_state()
+    >>> print(twin_model.saved_state_storage_statistics)
+    """
+
+    def __init__(self, compression: str = None, chunk_size: int = None, level: int = None):
+        if compression not in COMPRESSIONS:
+            raise SavedStateStorageError(f"Unknown compression {compression}! Please choose among {COMPRESSIONS}.")
+        if chunk_size is not None and chunk_size < 1:
+            raise SavedStateStorageError(f"Chunk size must be strictly positive ({chunk_size} was provided)!")
+        self.compression = compression
+        self.chunk_size = chunk_size
+        self.level = level
+        self._statistics = dict.fromkeys(
+            ["saves", "raw_bytes", "stored_bytes", "save_seconds", "loads", "load_seconds"], 0
+        )
+
+    @property
+    def statistics(self):
+        """
+        Dictionary with the number of saves and loads, the raw and stored (actually written) bytes, the space savings
+        ratio (1 - stored_bytes / raw_bytes) and the time spent storing and restoring blobs.
+        """
+        statistics = dict(self._statistics)
+        raw_bytes = statistics["raw_bytes"]
+        statistics["space_savings"] = 1.0 - statistics["stored_bytes"] / raw_bytes if raw_bytes > 0 else 0.0
+        return statistics
+
+    def store(self, raw_filepath: str, backup_folderpath: str):
+        """
+        Store the raw blob file written by the twin runtime and remove it. Return the storage meta-data to be kept
+        with the saved state, or None if the blob is kept raw.
+        """
+        if self.compression is None and self.chunk_size is None:
+            size = os.path.getsize(raw_filepath)
+            self._statistics["saves"] += 1
+            self._statistics["raw_bytes"] += size
+            self._statistics["stored_bytes"] += size
+            return None
+
+        start = time.perf_counter()
+        with open(raw_filepath, "rb") as f:
+            data = f.read()
+        stored_bytes = 0
+        storage_info = {"compression": self.compression, "raw_size": len(data)}
+        if self.chunk_size is None:
+            blob = _compress(data, self.compression, self.level)
+            _write_file_atomically(self.stored_filepath(raw_filepath, storage_info), blob)
+            stored_bytes = len(blob)
+            storage_info["stored_size"] = stored_bytes
+        else:
+            chunks_folderpath = os.path.join(backup_folderpath, CHUNKS_FOLDER_NAME)
+            os.makedirs(chunks_folderpath, exist_ok=True)
+            chunk_hashes = []
+            stored_size = 0
+            for offset in range(0, len(data), self.chunk_size):
+                chunk = data[offset : offset + self.chunk_size]
+                chunk_hash = hashlib.sha256(chunk).hexdigest()
+                chunk_filepath = os.path.join(chunks_folderpath, chunk_hash)
+                if os.path.exists(chunk_filepath):
+                    stored_size += os.path.getsize(chunk_filepath)
+                else:
+                    blob = _compress(chunk, self.compression, self.level)
+                    _write_file_atomically(chunk_filepath, blob)
+                    stored_bytes += len(blob)
+                    stored_size += len(blob)
+                chunk_hashes.append(chunk_hash)
+            storage_info["chunks"] = chunk_hashes
+            storage_info["stored_size"] = stored_size
+        os.remove(raw_filepath)
+
+        self._statistics["saves"] += 1
+        self._statistics["raw_bytes"] += len(data)
+        self._statistics["stored_bytes"] += stored_bytes
+        self._statistics["save_seconds"] += time.perf_counter() - start
+        return storage_info
+
+    def restore(self, raw_filepath: str, storage_info: dict, backup_folderpath: str, target_filepath: str):
+        """
+        Write the raw blob of a stored saved state into target_filepath.
+        """
+        start = time.perf_counter()
+        if "chunks" in storage_info:
+            chunks_folderpath = os.path.join(backup_folderpath, CHUNKS_FOLDER_NAME)
+            with open(target_filepath, "wb") as target:
+                for chunk_hash in storage_info["chunks"]:
+                    with open(os.path.join(chunks_folderpath, chunk_hash), "rb") as f:
+                        target.write(_decompress(f.read(), storage_info["compression"]))
+        else:
+            with open(self.stored_filepath(raw_filepath, storage_info), "rb") as f:
+                data = _decompress(f.read(), storage_info["compression"])
+            with open(target_filepath, "wb") as target:
+                target.write(data)
+        self._statistics["loads"] += 1
+        self._statistics["load_seconds"] += time.perf_counter() - start
+
+    @staticmethod
+    def stored_filepath(raw_filepath: str, storage_info: dict):
+        """
+        Path of the file holding a saved state blob (None for chunked saved states).
+        """
+        if storage_info is None:
+            return raw_filepath
+        if "chunks" in storage_info:
+            return None
+        if storage_info["compression"] is None:
+            return raw_filepath
+        return f"{raw_filepath}.{storage_info['compression']}"
+
+    @staticmethod
+    def stored_size(raw_filepath: str, storage_info: dict):
+        """
+        Size in bytes of the files holding a saved state (chunks shared with other saved states are included).
+        """
+        if storage_info is not None and "stored_size" in storage_info:
+            return storage_info["stored_size"]
+        return os.path.getsize(raw_filepath) if os.path.exists(raw_filepath) else 0
+
+    @staticmethod
+    def collect_chunks(backup_folderpath: str, pruned_storage_infos: list, retained_storage_infos: list):
+        """
+        Remove the chunks referenced by pruned storage meta-data that are not referenced by retained ones.
+        """
+        chunks_folderpath = os.path.join(backup_folderpath, CHUNKS_FOLDER_NAME)
+        retained_chunks = set()
+        for storage_info in retained_storage_infos:
+            if storage_info is not None and "chunks" in storage_info:
+                retained_chunks.update(storage_info["chunks"])
+        for storage_info in pruned_storage_infos:
+            if storage_info is None or "chunks" not in storage_info:
+                continue
+            for chunk_hash in set(storage_info["chunks"]) - retained_chunks:
+                try:
+                    os.remove(os.path.join(chunks_folderpath, chunk_hash))
+                except OSError:
+                    pass
+
+
+class SavedStateStorageError(Exception):
+    def __str__(self):
+        return f"[SavedStateStorageError] {self.args[0]}"
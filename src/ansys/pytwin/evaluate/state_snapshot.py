@@ -0,0 +1,136 @@
+from collections import OrderedDict
+import os
+import tempfile
+import uuid
+
+from pytwin import get_pytwin_logger
+
+# Directory backed by memory (tmpfs) used to exchange state files with the twin runtime, if available
+_SHARED_MEMORY_DIR = "/dev/shm"
+
+
+def snapshot_exchange_dir():
+    """
+    Return the directory used to exchange state files with the twin runtime: a tmpfs directory if available (Linux),
+    otherwise the system temporary directory.
+    """
+    if os.path.isdir(_SHARED_MEMORY_DIR) and os.access(_SHARED_MEMORY_DIR, os.W_OK):
+        return _SHARED_MEMORY_DIR
+    return tempfile.gettempdir()
+
+
+class StateSnapshot:
+    """
+    In-memory state of a twin model, created with TwinModel.save_snapshot and restored with TwinModel.load_snapshot.
+    It holds the state blob written by the twin runtime together with the evaluation time, parameters, inputs and
+    outputs values of the twin model at the time the snapshot was taken.
+    """
+
+    def __init__(self, model_name: str, time: float, parameters: dict, inputs: dict, outputs: dict, data: bytes):
+        self._id = f"{uuid.uuid4()}"[0:8]
+        self.model_name = model_name
+        self.time = time
+        self.parameters = parameters
+        self.inputs = inputs
+        self.outputs = outputs
+        self.data = data
+
+    @property
+    def id(self):
+        """Snapshot unique id."""
+        return self._id
+
+    @property
+    def nbytes(self):
+        """Size in bytes of the state blob."""
+        return len(self.data)
+
+
+class StateSnapshotStore:
+    """
+    Store of state snapshots with a byte budget. When adding a snapshot exceeds the budget, the least recently used
+    snapshots are evicted. The most recently added snapshot is always kept, even if it exceeds the budget alone.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Byte budget of the state blobs kept in the store. Default is 256 MB.
+
+    Examples
+    --------
+    >>> from pytwin import StateSnapshotStore, TwinModel
+    >>> store = StateSnapshotStore(max_bytes=64 * 1024 * 1024)
+    >>> twin_model = TwinModel(model_filepath='path_to_your_twin_model.twin')
+    >>> twin_model.initialize_evaluation()
+    >>> twin_model.evaluate_step_by_step(step_size=0.1)
+    >>> snapshot = twin_model.save_snapshot(store=store)
+    >>> for value in [1., 2., 3.]:
+    >>>     twin_model.load_snapshot(store.get(snapshot.id))
+    >>>     twin_model.evaluate_step_by_step(step_size=0.1, inputs={'input1': value})
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        if max_bytes <= 0:
+            raise StateSnapshotStoreError(f"Byte budget must be strictly positive ({max_bytes} was provided)!")
+        self._max_bytes = max_bytes
+        self._nbytes = 0
+        self._snapshots = OrderedDict()
+
+    def __contains__(self, snapshot_id: str):
+        return snapshot_id in self._snapshots
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    @property
+    def max_bytes(self):
+        """Byte budget of the store."""
+        return self._max_bytes
+
+    @property
+    def nbytes(self):
+        """Size in bytes of the state blobs currently kept in the store."""
+        return self._nbytes
+
+    def clear(self):
+        """Remove all snapshots from the store."""
+        self._snapshots.clear()
+        self._nbytes = 0
+
+    def get(self, snapshot_id: str):
+        """
+        Return the snapshot with given id and mark it as the most recently used one.
+
+        Raises
+        ------
+        StateSnapshotStoreError:
+            If no snapshot with given id is in the store (e.g. it has been evicted).
+        """
+        if snapshot_id not in self._snapshots:
+            msg = f"No snapshot with id {snapshot_id} was found! It may have been evicted from the store."
+            raise StateSnapshotStoreError(msg)
+        self._snapshots.move_to_end(snapshot_id)
+        return self._snapshots[snapshot_id]
+
+    def put(self, snapshot: StateSnapshot):
+        """
+        Add a snapshot to the store, evicting least recently used snapshots if the byte budget is exceeded.
+        """
+        self.remove(snapshot.id)
+        self._snapshots[snapshot.id] = snapshot
+        self._nbytes += snapshot.nbytes
+        while self._nbytes > self._max_bytes and len(self._snapshots) > 1:
+            evicted_id, evicted_snapshot = self._snapshots.popitem(last=False)
+            self._nbytes -= evicted_snapshot.nbytes
+            get_pytwin_logger().debug(f"[StateSnapshotStore] Snapshot {evicted_id} evicted from the store.")
+
+    def remove(self, snapshot_id: str):
+        """Remove the snapshot with given id from the store, if any."""
+        snapshot = self._snapshots.pop(snapshot_id, None)
+        if snapshot is not None:
+            self._nbytes -= snapshot.nbytes
+
+
+class StateSnapshotStoreError(Exception):
+    def __str__(self):
+        return f"[StateSnapshotStoreError] {self.args[0]}"
@@ -0,0 +1,668 @@
+import json
+import os
+import queue
+import re
+import threading
+from typing import Callable, Iterable
+
+import numpy as np
+
+# TBROM binary files (snapshots, points) start with a 8 bytes unsigned integer counting the stored values
+TBROM_HEADER_DTYPE = np.dtype("<u8")
+TBROM_VALUE_DTYPE = np.dtype("<f8")
+# Snapshot files written by the twin runtime are named snapshot_<time>.bin
+TBROM_SNAPSHOT_FILENAME_PATTERN = re.compile(r"snapshot_([-+0-9.eE]+)\.bin$")
+# Mode coefficient files written by the twin runtime are named <name>_<time>.bin
+TBROM_MODE_COEF_FILENAME_PATTERN = re.compile(r"_([-+0-9.eE]+)\.bin$")
+# Basis and settings files in the binaryOutputField folder of a ROM resource directory
+TBROM_FIELD_FOLDER_NAME = "binaryOutputField"
+TBROM_BASIS_FILENAME = "basis.svd"
+TBROM_SETTINGS_FILENAME = "settings.json"
+TBROM_BASIS_HEADER_SIZE = 16
+
+
+def _read_tbrom_values(filepath: str, memmap: bool):
+    """
+    Return the header count and the values of a TBROM binary file as a 1D array (a read-only memory map of the file
+    if memmap is True).
+    """
+    if not os.path.exists(filepath):
+        raise TbromError(f"TBROM binary file {filepath} does not exist!")
+    file_size = os.path.getsize(filepath)
+    header_size = TBROM_HEADER_DTYPE.itemsize
+    if file_size < header_size or (file_size - header_size) % TBROM_VALUE_DTYPE.itemsize != 0:
+        raise TbromError(f"TBROM binary file {filepath} is corrupted (unexpected size of {file_size} bytes)!")
+    count = int(np.fromfile(filepath, dtype=TBROM_HEADER_DTYPE, count=1)[0])
+    value_count = (file_size - header_size) // TBROM_VALUE_DTYPE.itemsize
+    if value_count == 0:
+        values = np.empty(0, dtype=TBROM_VALUE_DTYPE)
+    elif memmap:
+        values = np.memmap(filepath, dtype=TBROM_VALUE_DTYPE, mode="r", offset=header_size, shape=(value_count,))
+    else:
+        values = np.fromfile(filepath, dtype=TBROM_VALUE_DTYPE, offset=header_size)
+    return count, values
+
+
+def read_tbrom_snapshot(snapshot_filepath: str, field_dim: int = None, memmap: bool = False):
+    """
+    Read a TBROM snapshot file (see TwinModel.get_snapshot_filepath) into a NumPy array.
+
+    The file header counts either the stored values or the field points, so that the field dimension is deduced from
+    the file size if not given.
+
+    Parameters
+    ----------
+    snapshot_filepath : str
+        File path to the snapshot binary file.
+    field_dim : int, optional
+        Number of components of the field (1 for a scalar field, 3 for a vector field). Deduced from the header if
+        None.
+    memmap : bool, optional
+        If True, return a read-only memory map of the file instead of loading it (zero-copy). Default is False.
+
+    Returns
+    -------
+    field : numpy.ndarray
+        Array of shape (n,) for a scalar field or (n, field_dim) otherwise, n being the number of points.
+
+    Raises
+    ------
+    TbromError:
+        If the file does not exist or its size is not consistent with its header or with field_dim.
+
+    Examples
+    --------
+    >>> from pytwin import TwinModel, read_tbrom_points, read_tbrom_snapshot
+    >>> model = TwinModel('model.twin')
+    >>> model.initialize_evaluation()
+    >>> rom_name = model.tbrom_names[0]
+    >>> temperature = read_tbrom_snapshot(model.get_snapshot_filepath(rom_name))
+    >>> points = read_tbrom_points(model.get_geometry_filepath(rom_name))
+    """
+    count, values = _read_tbrom_values(snapshot_filepath, memmap)
+    if field_dim is None:
+        if count == 0 or values.size % count != 0:
+            msg = f"Snapshot file {snapshot_filepath} is corrupted ({values.size} values for a header of {count})!"
+            raise TbromError(msg)
+        field_dim = values.size // count
+    if field_dim < 1 or values.size % field_dim != 0:
+        raise TbromError(f"Snapshot file {snapshot_filepath} does not hold a field of dimension {field_dim}!")
+    if field_dim == 1:
+        return values
+    return values.reshape(-1, field_dim)
+
+
+def read_tbrom_points(points_filepath: str, memmap: bool = False):
+    """
+    Read a TBROM geometry file (see TwinModel.get_geometry_filepath) into a NumPy array of point coordinates.
+
+    Parameters
+    ----------
+    points_filepath : str
+        File path to the points binary file.
+    memmap : bool, optional
+        If True, return a read-only memory map of the file instead of loading it (zero-copy). Default is False.
+
+    Returns
+    -------
+    points : numpy.ndarray
+        Array of shape (n, 3) holding the x, y, z coordinates of the n points.
+
+    Raises
+    ------
+    TbromError:
+        If the file does not exist or does not hold 3D coordinates.
+    """
+    count, values = _read_tbrom_values(points_filepath, memmap)
+    if values.size % 3 != 0 or count not in [values.size, values.size // 3]:
+        msg = f"Points file {points_filepath} is corrupted ({values.size} values for a header of {count})!"
+        raise TbromError(msg)
+    return values.reshape(-1, 3)
+
+
+class TBROMSeries:
+    """
+    Time series of TBROM snapshots, seen as a lazily memory-mapped array of shape (n_times, n_points) (or
+    (n_times, n_points, field_dim) for vector fields). Snapshot files are only mapped when their values are accessed,
+    so that reading a time step or a few points does not load the whole series.
+
+    Use TwinModel.get_snapshot_series to get the series of snapshots written by the twin runtime. Querying the
+    history of a single point still opens every snapshot file, export the series to one consolidated .npy file to
+    make such queries read one contiguous block.
+
+    Parameters
+    ----------
+    snapshot_filepaths : list
+        File paths to the snapshot binary files, in time order.
+    times : list, optional
+        Evaluation time of each snapshot. Parsed from the snapshot file names (snapshot_<time>.bin) if None.
+    field_dim : int, optional
+        Number of components of the field. Deduced from the snapshot files if None.
+
+    Examples
+    --------
+    >>> from pytwin import TwinModel
+    >>> model = TwinModel('model_with_tbrom.twin')
+    >>> model.initialize_evaluation(parameters={'ThermalROM23R1_1_store_snapshots': 1})
+    >>> for step in range(100):
+    >>>     model.evaluate_step_by_step(step_size=0.1)
+    >>> series = model.get_snapshot_series(model.tbrom_names[0])
+    >>> first_field = series[0]
+    >>> series.export('series.npy')
+    >>> node_history = series.history(point_index=42)
+    """
+
+    def __init__(self, snapshot_filepaths: list, times: list = None, field_dim: int = None):
+        self._snapshot_filepaths = list(snapshot_filepaths)
+        self._field_dim = field_dim
+        self._field_shape = None
+        self._array = None
+        if times is None:
+            times = [self._parse_snapshot_time(filepath) for filepath in self._snapshot_filepaths]
+        if len(times) != len(self._snapshot_filepaths):
+            raise TbromError(f"{len(times)} times were given for {len(self._snapshot_filepaths)} snapshot files!")
+        self._times = np.array(times, dtype=np.float64)
+
+    def __len__(self):
+        return len(self._times)
+
+    def __getitem__(self, key):
+        """
+        NumPy indexing of the series, the first axis being the time axis. Only the selected snapshot files are read.
+        """
+        if self._array is not None:
+            return self._array[key]
+        key = key if isinstance(key, tuple) else (key,)
+        time_indices = np.arange(len(self))[key[0]]
+        if np.ndim(time_indices) == 0:
+            return self._read_snapshot(int(time_indices))[key[1:]]
+        values = [self._read_snapshot(int(i))[key[1:]] for i in time_indices]
+        if len(values) == 0:
+            return np.empty(0, dtype=TBROM_VALUE_DTYPE)
+        return np.stack(values)
+
+    @staticmethod
+    def _parse_snapshot_time(snapshot_filepath: str):
+        return _parse_tbrom_file_time(snapshot_filepath, TBROM_SNAPSHOT_FILENAME_PATTERN, "snapshot")
+
+    def _read_snapshot(self, time_index: int):
+        field = read_tbrom_snapshot(self._snapshot_filepaths[time_index], field_dim=self._field_dim, memmap=True)
+        if self._field_shape is None:
+            self._field_shape = field.shape
+            self._field_dim = 1 if field.ndim == 1 else field.shape[1]
+        elif field.shape != self._field_shape:
+            msg = f"Snapshot file {self._snapshot_filepaths[time_index]} has shape {field.shape} while previous"
+            msg += f" snapshots have shape {self._field_shape}!"
+            raise TbromError(msg)
+        return field
+
+    @property
+    def times(self):
+        """Evaluation time of each snapshot."""
+        return self._times
+
+    @property
+    def snapshot_filepaths(self):
+        """File paths to the snapshot files of the series."""
+        return list(self._snapshot_filepaths)
+
+    @property
+    def shape(self):
+        """Shape of the series: (n_times, n_points) or (n_times, n_points, field_dim)."""
+        if self._array is not None:
+            return self._array.shape
+        if self._field_shape is None:
+            if len(self) == 0:
+                return (0,)
+            self._read_snapshot(0)
+        return (len(self),) + self._field_shape
+
+    def history(self, point_index: int):
+        """
+        Return the values of a point over time, as an array of shape (n_times,) or (n_times, field_dim).
+        """
+        return self[:, point_index]
+
+    def to_numpy(self):
+        """
+        Return the whole series loaded in memory.
+        """
+        return np.array(self[:])
+
+    def export(self, npy_filepath: str):
+        """
+        Write the series into one consolidated .npy file (streamed snapshot by snapshot) and use a memory map of this
+        file for next accesses to the series.
+
+        Parameters
+        ----------
+        npy_filepath : str
+            File path to the .npy file to write.
+
+        Returns
+        -------
+        npy_filepath : str
+            File path to the written .npy file.
+        """
+        array = np.lib.format.open_memmap(npy_filepath, mode="w+", dtype=TBROM_VALUE_DTYPE, shape=self.shape)
+        for i in range(len(self)):
+            array[i] = self._read_snapshot(i)
+        array.flush()
+        del array
+        self._array = np.load(npy_filepath, mmap_mode="r")
+        return npy_filepath
+
+    @classmethod
+    def from_npy(cls, npy_filepath: str, times: list):
+        """
+        Return a series backed by a .npy file written by TBROMSeries.export.
+
+        Parameters
+        ----------
+        npy_filepath : str
+            File path to the .npy file.
+        times : list
+            Evaluation time of each snapshot.
+        """
+        array = np.load(npy_filepath, mmap_mode="r")
+        if array.shape[0] != len(times):
+            raise TbromError(f"{len(times)} times were given for a series of {array.shape[0]} snapshots!")
+        series = cls([], times=[])
+        series._times = np.array(times, dtype=np.float64)
+        series._array = array
+        return series
+
+
+def _parse_tbrom_file_time(filepath: str, pattern: re.Pattern, file_kind: str):
+    match = pattern.search(os.path.basename(filepath))
+    if match is None:
+        msg = f"Cannot parse the evaluation time of {file_kind} file {filepath}, please provide times!"
+        raise TbromError(msg)
+    try:
+        return float(match.group(1))
+    except ValueError:
+        raise TbromError(f"Cannot parse the evaluation time of {file_kind} file {filepath}!")
+
+
+def _as_mode_coefficients(coefficients, mode_count: int):
+    coefficients = np.asarray(coefficients, dtype=TBROM_VALUE_DTYPE)
+    if coefficients.shape[-1] != mode_count:
+        msg = f"Mode coefficients of shape {coefficients.shape} cannot be used with a basis of {mode_count} modes!"
+        raise TbromError(msg)
+    return coefficients
+
+
+def read_tbrom_basis(basis_filepath: str):
+    """
+    Read a TBROM basis file (basis.svd) into a NumPy array of shape (n_modes, n_values). The file holds a 16 bytes
+    header, the number of values and the number of modes (stored as 8 or 4 bytes integers, deduced from the file
+    size), then the modes as contiguous doubles.
+    """
+    if not os.path.exists(basis_filepath):
+        raise TbromError(f"TBROM basis file {basis_filepath} does not exist!")
+    file_size = os.path.getsize(basis_filepath)
+    for count_dtype in [np.dtype("<u8"), np.dtype("<u4")]:
+        data_offset = TBROM_BASIS_HEADER_SIZE + 2 * count_dtype.itemsize
+        if file_size < data_offset:
+            continue
+        nb_val, nb_mc = np.fromfile(basis_filepath, dtype=count_dtype, count=2, offset=TBROM_BASIS_HEADER_SIZE)
+        if file_size == data_offset + int(nb_val) * int(nb_mc) * TBROM_VALUE_DTYPE.itemsize:
+            basis = np.fromfile(basis_filepath, dtype=TBROM_VALUE_DTYPE, offset=data_offset)
+            return basis.reshape(int(nb_mc), int(nb_val))
+    raise TbromError(f"TBROM basis file {basis_filepath} is corrupted (unexpected size of {file_size} bytes)!")
+
+
+class TBROMReconstructor:
+    """
+    Reconstruct the fields of a TBROM from its mode coefficients, without the twin runtime writing full snapshot files.
+    The ROM basis is loaded once from the ROM resource directory, then fields are computed with one matrix product
+    (coefficients @ basis) for a single time step or a whole batch of time steps.
+
+    Use TwinModel.get_tbrom_reconstructor to get the reconstructor of a ROM available in a twin model.
+
+    Parameters
+    ----------
+    resource_directory : str
+        ROM resource directory (see TwinRuntime.twin_get_rom_resource_directory), holding the
+        binaryOutputField/basis.svd file.
+
+    Examples
+    --------
+    >>> from pytwin import TBROMReconstructor
+    >>> reconstructor = TBROMReconstructor('path_to_rom_resource_directory')
+    >>> fields = reconstructor.reconstruct(mode_coefficients)
+    """
+
+    def __init__(self, resource_directory: str):
+        field_directory = os.path.join(resource_directory, TBROM_FIELD_FOLDER_NAME)
+        self._basis = read_tbrom_basis(os.path.join(field_directory, TBROM_BASIS_FILENAME))
+        self._field_dim = 1
+        settings_filepath = os.path.join(field_directory, TBROM_SETTINGS_FILENAME)
+        if os.path.exists(settings_filepath):
+            with open(settings_filepath, "r") as f:
+                dimensionality = json.load(f).get("dimensionality", 1)
+            self._field_dim = int(dimensionality[0] if isinstance(dimensionality, list) else dimensionality)
+
+    @property
+    def basis(self):
+        """ROM basis, array of shape (n_modes, n_values)."""
+        return self._basis
+
+    @property
+    def field_dim(self):
+        """Number of components of the field."""
+        return self._field_dim
+
+    @property
+    def mode_count(self):
+        """Number of modes of the ROM."""
+        return self._basis.shape[0]
+
+    def reconstruct(self, coefficients: np.ndarray):
+        """
+        Compute fields from mode coefficients.
+
+        Parameters
+        ----------
+        coefficients : numpy.ndarray
+            Mode coefficients of one time step, array of shape (n_modes,), or of a batch of time steps, array of shape
+            (n_times, n_modes).
+
+        Returns
+        -------
+        fields : numpy.ndarray
+            Array of shape (n_points,) or (n_points, field_dim) for one time step, with a leading n_times axis for a
+            batch of time steps.
+        """
+        coefficients = _as_mode_coefficients(coefficients, self.mode_count)
+        fields = coefficients @ self._basis
+        if self._field_dim == 1:
+            return fields
+        return fields.reshape(fields.shape[:-1] + (-1, self._field_dim))
+
+    def probe(self, point_indices, rom_name: str = None):
+        """
+        Return a probe computing the field values at the given points only (see TBROMProbe).
+        """
+        return TBROMProbe(self, point_indices, rom_name)
+
+    def read_mode_coefficients(self, mode_coef_filepaths: list):
+        """
+        Read mode coefficient files (8 bytes count header then doubles) into an array of shape (n_files, n_modes).
+        """
+        coefficients = np.empty((len(mode_coef_filepaths), self.mode_count), dtype=TBROM_VALUE_DTYPE)
+        for i, filepath in enumerate(mode_coef_filepaths):
+            count, values = _read_tbrom_values(filepath, memmap=False)
+            if values.size != self.mode_count:
+                msg = f"Mode coefficient file {filepath} holds {values.size} values while the basis has"
+                msg += f" {self.mode_count} modes!"
+                raise TbromError(msg)
+            coefficients[i] = values
+        return coefficients
+
+    def read_mode_coefficient_series(self, mode_coef_filepaths: list):
+        """
+        Read mode coefficient files named <name>_<time>.bin, sorted by evaluation time.
+
+        Returns
+        -------
+        times : numpy.ndarray
+            Sorted evaluation times, array of shape (n_files,).
+        coefficients : numpy.ndarray
+            Mode coefficients at each evaluation time, array of shape (n_files, n_modes).
+        """
+        times = np.array(
+            [
+                _parse_tbrom_file_time(f, TBROM_MODE_COEF_FILENAME_PATTERN, "mode coefficient")
+                for f in mode_coef_filepaths
+            ],
+            dtype=np.float64,
+        )
+        order = np.argsort(times, kind="stable")
+        return times[order], self.read_mode_coefficients([mode_coef_filepaths[i] for i in order])
+
+    def reconstruct_files(self, mode_coef_filepaths: list):
+        """
+        Compute the fields of a batch of mode coefficient files, with one matrix product.
+
+        Returns
+        -------
+        fields : numpy.ndarray
+            Array of shape (n_files, n_points) or (n_files, n_points, field_dim).
+        """
+        return self.reconstruct(self.read_mode_coefficients(mode_coef_filepaths))
+
+
+def nearest_point_indices(points: np.ndarray, coordinates: np.ndarray, block_size: int = 1 << 20):
+    """
+    Return the index of the nearest point of each coordinates, with a brute force search processing points by blocks
+    so that memory usage does not depend on the number of points.
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        Point coordinates, array of shape (n_points, 3) (see read_tbrom_points).
+    coordinates : numpy.ndarray
+        Coordinates to locate, array of shape (n_coordinates, 3).
+    block_size : int, optional
+        Number of point coordinates processed at once.
+
+    Returns
+    -------
+    point_indices : numpy.ndarray
+        Array of shape (n_coordinates,), empty if no coordinates are given.
+
+    Raises
+    ------
+    TbromError:
+        If coordinates are not 3D coordinates, or if there are no points.
+    """
+    coordinates = np.atleast_2d(np.asarray(coordinates, dtype=np.float64))
+    if coordinates.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if coordinates.shape[1] != 3:
+        raise TbromError(f"Coordinates of shape {coordinates.shape} are not 3D coordinates!")
+    if len(points) == 0:
+        raise TbromError("Nearest points cannot be searched among an empty set of points!")
+    block_size = max(1, block_size // len(coordinates))
+    best_distances = np.full(len(coordinates), np.inf)
+    best_indices = np.zeros(len(coordinates), dtype=np.int64)
+    for start in range(0, len(points), block_size):
+        block = points[start : start + block_size]
+        distances = ((block[np.newaxis, :, :] - coordinates[:, np.newaxis, :]) ** 2).sum(axis=2)
+        block_indices = distances.argmin(axis=1)
+        block_distances = distances[np.arange(len(coordinates)), block_indices]
+        closer = block_distances < best_distances
+        best_distances[closer] = block_distances[closer]
+        best_indices[closer] = block_indices[closer] + start
+    return best_indices
+
+
+class TBROMProbe:
+    """
+    Probe computing the values of a TBROM field at a set of points from mode coefficients. Only the basis columns of
+    the probed points are kept, so that evaluating a probe costs n_modes x n_probes operations per time step instead
+    of reconstructing the full field.
+
+    Use TBROMReconstructor.probe or TwinModel.create_tbrom_probe to create a probe.
+
+    Parameters
+    ----------
+    reconstructor : TBROMReconstructor
+        The field reconstructor of the ROM.
+    point_indices : list
+        Indices of the probed points.
+    rom_name : str, optional
+        Name of the probed ROM in its twin model.
+
+    Examples
+    --------
+    >>> from pytwin import TwinModel
+    >>> model = TwinModel('model_with_tbrom.twin')
+    >>> model.initialize_evaluation()
+    >>> rom_name = model.tbrom_names[0]
+    >>> probe = model.create_tbrom_probe(rom_name, coordinates=[[0., 0., 0.], [0.1, 0., 0.]])
+    >>> for step in range(100):
+    >>>     model.evaluate_step_by_step(step_size=0.1)
+    >>> times, probe_values = model.evaluate_tbrom_probe(probe)
+    """
+
+    def __init__(self, reconstructor: TBROMReconstructor, point_indices, rom_name: str = None):
+        self._point_indices = np.atleast_1d(np.asarray(point_indices, dtype=np.int64))
+        self._field_dim = reconstructor.field_dim
+        self.rom_name = rom_name
+        basis = reconstructor.basis.reshape(reconstructor.mode_count, -1, self._field_dim)
+        point_count = basis.shape[1]
+        if np.any(self._point_indices < 0) or np.any(self._point_indices >= point_count):
+            raise TbromError(f"Probed point indices must be in [0, {point_count - 1}]!")
+        self._sub_basis = np.ascontiguousarray(basis[:, self._point_indices, :].reshape(reconstructor.mode_count, -1))
+
+    @property
+    def point_indices(self):
+        """Indices of the probed points."""
+        return self._point_indices
+
+    @property
+    def mode_count(self):
+        """Number of modes of the ROM."""
+        return self._sub_basis.shape[0]
+
+    def evaluate(self, coefficients: np.ndarray):
+        """
+        Compute the probed values from mode coefficients of shape (n_modes,) or (n_times, n_modes).
+
+        Returns
+        -------
+        values : numpy.ndarray
+            Array of shape (n_probes,) or (n_probes, field_dim) for one time step, with a leading n_times axis for a
+            batch of time steps.
+        """
+        coefficients = _as_mode_coefficients(coefficients, self.mode_count)
+        values = coefficients @ self._sub_basis
+        if self._field_dim == 1:
+            return values
+        return values.reshape(values.shape[:-1] + (-1, self._field_dim))
+
+
+def map_tbrom_image_files(image_filepaths: Iterable[str], view_names: list):
+    """
+    Return a mapping {evaluation_time: {view_name: image_filepath}} sorted by evaluation time, from the paths of image
+    files named <view_name>_<time>.png (see TwinRuntime.twin_get_rom_images_files).
+    """
+    view_names = sorted(view_names, key=len, reverse=True)
+    image_files = dict()
+    for filepath in image_filepaths:
+        filepath = str(filepath)
+        stem = os.path.splitext(os.path.basename(filepath))[0]
+        for view_name in view_names:
+            if stem.startswith(f"{view_name}_"):
+                try:
+                    time = float(stem[len(view_name) + 1 :])
+                except ValueError:
+                    continue
+                image_files.setdefault(time, dict())[view_name] = filepath
+                break
+    return dict(sorted(image_files.items()))
+
+
+class TBROMImagePrefetcher:
+    """
+    Iterator over image files that reads (and optionally decodes) them in a background thread, a few files ahead of
+    the consumer. It yields (filepath, image) tuples in the order of the given files. An error raised while reading a
+    file is raised again when the consumer reaches it.
+
+    Parameters
+    ----------
+    image_filepaths : Iterable[str]
+        Paths of the image files, in consumption order.
+    decode : Callable, optional
+        Function called with each file path and returning the decoded image (e.g. matplotlib.image.imread). If None,
+        the raw file content (bytes) is returned.
+    buffer_size : int, optional
+        Maximum number of images read ahead of the consumer. Default is 16.
+
+    Examples
+    --------
+    >>> import matplotlib.image as mpimg
+    >>> from pytwin import TBROMImagePrefetcher, TwinModel
+    >>> model = TwinModel('model_with_tbrom.twin')
+    >>> model.initialize_evaluation()
+    >>> rom_name = model.tbrom_names[0]
+    >>> image_files = model.get_image_filepaths(rom_name)
+    >>> filepaths = [views['View1'] for views in image_files.values()]
+    >>> with TBROMImagePrefetcher(filepaths, decode=mpimg.imread) as prefetcher:
+    >>>     for filepath, image in prefetcher:
+    >>>         display(image)
+    """
+
+    _END = object()
+
+    def __init__(self, image_filepaths: Iterable[str], decode: Callable = None, buffer_size: int = 16):
+        if buffer_size < 1:
+            raise TbromError(f"Buffer size must be strictly positive ({buffer_size} was provided)!")
+        self._decode = decode
+        self._queue = queue.Queue(maxsize=buffer_size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._prefetch, args=(list(image_filepaths),), name="TBROMImagePrefetcher", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._thread is None:
+            raise StopIteration
+        item = self._queue.get()
+        if item is self._END:
+            self._thread.join()
+            self._thread = None
+            raise StopIteration
+        filepath, image, error = item
+        if error is not None:
+            raise error
+        return filepath, image
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _prefetch(self, image_filepaths: list):
+        for filepath in image_filepaths:
+            try:
+                if self._decode is None:
+                    with open(filepath, "rb") as f:
+                        item = (filepath, f.read(), None)
+                else:
+                    item = (filepath, self._decode(filepath), None)
+            except Exception as e:
+                item = (filepath, None, e)
+            if not self._put(item):
+                return
+        self._put(self._END)
+
+    def close(self):
+        """
+        Stop prefetching images and wait for the background thread to exit.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+
+class TbromError(Exception):
+    def __str__(self):
+        return f"[TbromError] {self.args[0]}"
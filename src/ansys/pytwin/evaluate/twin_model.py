@@ -1,11 +1,29 @@
+import csv
 import json
 import os
 import time
+from typing import Iterable, Union
 
 import numpy as np
 import pandas as pd
 from pytwin.evaluate.model import Model
-from pytwin.evaluate.saved_state_registry import SavedState, SavedStateRegistry
+from pytwin.evaluate.saved_state_registry import RetentionPolicy, SavedState, SavedStateRegistry
+from pytwin.evaluate.saved_state_storage import SavedStateStorage
+from pytwin.evaluate.state_snapshot import StateSnapshot, StateSnapshotStore, snapshot_exchange_dir
+from pytwin.evaluate.tbrom import (
+    TBROMProbe,
+    TBROMReconstructor,
+    TBROMSeries,
+    map_tbrom_image_files,
+    nearest_point_indices,
+    read_tbrom_points,
+)
+from pytwin.evaluate.twin_model_metadata import (
+    query_twin_model_metadata,
+    read_twin_model_metadata,
+    write_twin_model_metadata,
+)
+from pytwin.examples.downloads import load_data
 from pytwin.settings import PyTwinLogLevel, get_pytwin_log_level, pytwin_logging_is_enabled
 from pytwin.twin_runtime.log_level import LogLevel
 from pytwin.twin_runtime.twin_runtime_core import TwinRuntime
@@ -21,6 +39,10 @@ class TwinModel(Model):
     ----------
     model_filepath : str
         File path to the twin model (with .twin) extension.
+    metadata_cache_dir : str, optional
+        Directory of the on-disk metadata cache (see get_twin_model_metadata). If provided, the twin model metadata
+        (start values, visualization resources...) is read from this cache, or queried once and stored there, so that
+        instantiation and evaluation initialization skip the corresponding runtime queries.
 
     Examples
     --------
@@ -55,7 +77,7 @@ class TwinModel(Model):
     TBROM_SNAPSHOT_FILE_PREFIX = "snapshot_"
     TBROM_SNAPSHOT_EXT = ".bin"
 
-    def __init__(self, model_filepath: str):
+    def __init__(self, model_filepath: str, metadata_cache_dir: str = None):
         super().__init__()
         self._evaluation_time = None
         self._initialization_time = None
@@ -65,8 +87,24 @@ class TwinModel(Model):
         self._outputs = None
         self._parameters = None
         self._ss_registry = None
+        self._ss_registries = dict()
+        self._ss_retention_policy = None
+        self._ss_storage = SavedStateStorage()
         self._twin_runtime = None
         self._tbrom_info = None
+        self._tbrom_info_is_resolved = False
+        self._tbrom_outputs_enabled = None
+        self._tbrom_image_directory_is_set = False
+        self._tbrom_reconstructors = dict()
+        self._tbrom_points = dict()
+        self._array_step_inputs = None
+        self._array_step_outputs = None
+        self._dicts_are_outdated = False
+        self._metadata = None
+        self._metadata_cache_dir = metadata_cache_dir
+        self._start_inputs = None
+        self._start_parameters = None
+        self._parameter_indices = None
 
         if self._check_model_filepath_is_valid(model_filepath):
             self._model_filepath = model_filepath
@@ -76,6 +114,8 @@ class TwinModel(Model):
         """
         Close twin runtime when object is garbage collected.
         """
+        if self._ss_registry is not None:
+            self._ss_registry.stop_background_compaction()
         if self._twin_runtime is not None:
             self._twin_runtime.twin_close()
 
@@ -93,6 +133,66 @@ class TwinModel(Model):
             raise self._raise_error(msg)
         return True
 
+    def _create_array_inputs(self, time: np.ndarray, inputs: Union[np.ndarray, dict], default_inputs: dict = None):
+        """
+        Create a 2D array inputs that satisfies the conventions of the runtime SDK batch mode evaluation (same
+        conventions as _create_dataframe_inputs). Values are written once into a C-ordered float64 block.
+
+        If an input is not found in the given inputs, then initialization value (or default_inputs value if given) is
+        used to keep associated input constant over Time.
+        """
+        if default_inputs is None:
+            default_inputs = self._inputs
+        input_names = list(self._inputs)
+        _inputs = np.empty((time.shape[0], len(input_names) + 1), dtype=np.float64)
+        _inputs[:, 0] = time
+        if inputs is None:
+            _inputs[:, 1:] = [default_inputs[name] for name in input_names]
+        elif isinstance(inputs, dict):
+            for i, name in enumerate(input_names):
+                if name not in inputs:
+                    _inputs[:, i + 1] = default_inputs[name]
+                    continue
+                values = np.asarray(inputs[name], dtype=np.float64)
+                if values.shape not in [(), (time.shape[0],)]:
+                    msg = f"Given values of input {name} have shape {values.shape}!"
+                    msg += f"\nPlease provide a scalar or one value per time instant (shape {(time.shape[0],)})."
+                    self._raise_error(msg)
+                _inputs[:, i + 1] = values
+        else:
+            inputs = np.asarray(inputs, dtype=np.float64)
+            if inputs.shape != (time.shape[0], len(input_names)):
+                msg = f"Given inputs array has shape {inputs.shape}!"
+                msg += f"\nPlease provide an array with shape {(time.shape[0], len(input_names))}"
+                msg += " (one row per time instant and one column per input, ordered by input_names)."
+                self._raise_error(msg)
+            _inputs[:, 1:] = inputs
+        return _inputs
+
+    def _create_chunk_inputs(self, chunk, default_inputs: dict, warns: bool):
+        """
+        Create a 2D array inputs (see _create_array_inputs) from a chunk of historical input values given to the
+        chunked batch evaluation.
+        """
+        if hasattr(chunk, "to_pandas"):
+            chunk = chunk.to_pandas()
+        if isinstance(chunk, pd.DataFrame):
+            if "Time" not in chunk:
+                msg = "Given inputs chunk has no 'Time' column!"
+                msg += f"\nExisting column labels are :{[s for s in chunk.columns]}"
+                msg += f"\nPlease provide chunks with a 'Time' column to use chunked batch mode evaluation."
+                self._raise_error(msg)
+            if warns:
+                self._warns_if_input_key_not_found(dict.fromkeys(chunk.columns))
+            inputs = {name: chunk[name].to_numpy(dtype=np.float64) for name in chunk.columns if name in self._inputs}
+            return self._create_array_inputs(chunk["Time"].to_numpy(dtype=np.float64), inputs, default_inputs)
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.ndim != 2 or chunk.shape[1] != len(self._inputs) + 1:
+            msg = f"Given inputs chunk has shape {chunk.shape}!"
+            msg += f"\nPlease provide chunks with {len(self._inputs) + 1} columns (time and inputs)."
+            self._raise_error(msg)
+        return np.ascontiguousarray(chunk)
+
     def _create_dataframe_inputs(self, inputs_df: pd.DataFrame):
         """
         Create a dataframe inputs that satisfies the conventions of the runtime SDK batch mode evaluation, that are:
@@ -128,7 +228,24 @@ class TwinModel(Model):
         if pytwin_level == PyTwinLogLevel.PYTWIN_LOG_CRITICAL:
             return LogLevel.TWIN_LOG_FATAL
 
-    def _initialize_evaluation(self, parameters: dict = None, inputs: dict = None):
+    def _snapshot_filepath(self):
+        """
+        Path of the file used to exchange state snapshots with the twin runtime (in a tmpfs directory if available).
+        """
+        return os.path.join(snapshot_exchange_dir(), f"pytwin_snapshot_{self.id}.bin")
+
+    def _get_saved_state_registry(self, model_id: str):
+        """
+        Return the saved state registry of the given model id. Registries are kept so that their time index is only
+        updated with the saved states registered since the last call.
+        """
+        ss_registry = self._ss_registries.get(model_id)
+        if ss_registry is None:
+            ss_registry = SavedStateRegistry(model_id=model_id, model_name=self.name, storage=self._ss_storage)
+            self._ss_registries[model_id] = ss_registry
+        return ss_registry
+
+    def _initialize_evaluation(self, parameters: dict = None, inputs: dict = None, tbrom_outputs: bool = None):
         """
         Initialize the twin model evaluation with dictionaries:
         (1) Initialize parameters and/or inputs values to their start values (default value found in the twin file),
@@ -145,6 +262,7 @@ class TwinModel(Model):
         if self._twin_runtime.is_model_initialized:
             self._twin_runtime.twin_reset()
 
+        self._dicts_are_outdated = False
         self._initialize_parameters_with_start_values()
         if parameters is not None:
             self._update_parameters(parameters)
@@ -156,17 +274,51 @@ class TwinModel(Model):
         self._warns_if_parameter_key_not_found(parameters)
         self._warns_if_input_key_not_found(inputs)
 
+        self._initialize_twin_runtime(tbrom_outputs)
+
+    def _initialize_sweep_case(self, parameters: dict = None, inputs: dict = None, tbrom_outputs: bool = False):
+        """
+        Initialize the twin model evaluation like _initialize_evaluation, with fewer twin runtime calls: start values
+        are not queried, parameters that differ from their start value are set by index and inputs are set at once.
+        """
+        if self._twin_runtime is None:
+            self._raise_error("Twin model has not been successfully instantiated!")
+
+        if self._twin_runtime.is_model_initialized:
+            self._twin_runtime.twin_reset()
+
+        self._dicts_are_outdated = False
+        self._initialize_parameters_with_start_values()
+        if parameters is not None:
+            for name, value in parameters.items():
+                if name in self._parameters:
+                    self._parameters[name] = value
+                    if value != self._start_parameters[name]:
+                        self._twin_runtime.twin_set_param_by_index(self._parameter_indices[name], value)
+
+        self._initialize_inputs_with_start_values()
+        if inputs is not None:
+            for name, value in inputs.items():
+                if name in self._inputs:
+                    self._inputs[name] = value
+            self._twin_runtime.twin_set_inputs(list(self._inputs.values()))
+
+        self._warns_if_parameter_key_not_found(parameters)
+        self._warns_if_input_key_not_found(inputs)
+
+        self._initialize_twin_runtime(tbrom_outputs)
+
+    def _initialize_twin_runtime(self, tbrom_outputs: bool = None):
+        """
+        Initialize the twin runtime once parameters and inputs are set, reset evaluation time and update outputs.
+        """
         self._evaluation_time = 0.0
         self._initialization_time = time.time()
 
         try:
-            tbrom_info = self._twin_runtime.twin_get_visualization_resources()
-            if tbrom_info:
-                self._log_key += "WithTBROM : {}".format(tbrom_info)
-                self._tbrom_info = tbrom_info
-                directory_path = os.path.join(self.model_dir, self.TBROM_FOLDER_NAME)
-                for model_name, data in tbrom_info.items():
-                    self._twin_runtime.twin_set_rom_image_directory(model_name, directory_path)
+            self._resolve_tbrom_info()
+            if self._tbrom_info is not None:
+                self._set_tbrom_outputs(tbrom_outputs)
 
             self._twin_runtime.twin_initialize()
         except Exception as e:
@@ -177,22 +329,85 @@ class TwinModel(Model):
 
         self._update_outputs()
 
+    def _resolve_tbrom_info(self):
+        """
+        Resolve the TBROM included in the twin model from its visualization resources, once per instance.
+        """
+        if self._tbrom_info_is_resolved:
+            return
+        if self._metadata is not None:
+            tbrom_info = self._metadata["visualization_resources"]
+        else:
+            tbrom_info = self._twin_runtime.twin_get_visualization_resources()
+        if tbrom_info:
+            self._tbrom_info = tbrom_info
+            self._log_message(f"Twin model includes TBROM: {tbrom_info}", level=PyTwinLogLevel.PYTWIN_LOG_DEBUG)
+        self._tbrom_info_is_resolved = True
+
+    def _set_tbrom_outputs(self, tbrom_outputs: bool = None):
+        """
+        Enable or disable the TBROM outputs (images, snapshots and mode coefficients files) of the next evaluation. The
+        twin runtime is only called when the setting changes, None keeps the current setting (enabled by default).
+        """
+        if tbrom_outputs is None:
+            tbrom_outputs = self._tbrom_outputs_enabled is not False
+        if tbrom_outputs == self._tbrom_outputs_enabled:
+            return
+        for model_name in self._tbrom_info:
+            if not self._tbrom_image_directory_is_set:
+                directory_path = os.path.join(self.model_dir, self.TBROM_FOLDER_NAME)
+                self._twin_runtime.twin_set_rom_image_directory(model_name, directory_path)
+            view_names = list(self._tbrom_info[model_name].get(self.TBROM_VIEWS_KEY, []))
+            if tbrom_outputs:
+                if self._tbrom_outputs_enabled is False:
+                    self._twin_runtime.twin_enable_3d_rom_model_data(model_name)
+                    if view_names:
+                        self._twin_runtime.twin_enable_rom_model_images(model_name, view_names)
+            else:
+                self._twin_runtime.twin_disable_3d_rom_model_data(model_name)
+                if view_names:
+                    self._twin_runtime.twin_disable_rom_model_images(model_name, view_names)
+        self._tbrom_image_directory_is_set = True
+        self._tbrom_outputs_enabled = tbrom_outputs
+
+    def _cache_start_values(self):
+        """
+        Query the start values of inputs and parameters (default values found in twin model) once per instance, as
+        well as the index of each parameter.
+        """
+        if self._metadata is not None:
+            input_start_values = zip(self._metadata["input_names"], self._metadata["input_start_values"])
+            parameter_names = self._metadata["parameter_names"]
+            parameter_start_values = self._metadata["parameter_start_values"]
+        else:
+            input_start_values = [
+                (name, self._twin_runtime.twin_get_var_start(var_name=name))
+                for name in self._twin_runtime.twin_get_input_names()
+            ]
+            parameter_names = list(self._twin_runtime.twin_get_param_names())
+            parameter_start_values = [
+                None if "solver." in name else self._twin_runtime.twin_get_var_start(var_name=name)
+                for name in parameter_names
+            ]
+        self._start_inputs = dict(input_start_values)
+        self._start_parameters = dict()
+        self._parameter_indices = dict()
+        for index, (name, value) in enumerate(zip(parameter_names, parameter_start_values)):
+            if "solver." not in name:
+                self._start_parameters[name] = value
+                self._parameter_indices[name] = index
+
     def _initialize_inputs_with_start_values(self):
         """
         Initialize inputs dictionary {name:value} with starting input values found in twin model.
         """
-        self._inputs = dict()
-        for name in self._twin_runtime.twin_get_input_names():
-            self._inputs[name] = self._twin_runtime.twin_get_var_start(var_name=name)
+        self._inputs = dict(self._start_inputs)
 
     def _initialize_parameters_with_start_values(self):
         """
         Initialize parameters dictionary {name:value} with starting parameter values found in twin model.
         """
-        self._parameters = dict()
-        for name in self._twin_runtime.twin_get_param_names():
-            if "solver." not in name:
-                self._parameters[name] = self._twin_runtime.twin_get_var_start(var_name=name)
+        self._parameters = dict(self._start_parameters)
 
     def _initialize_outputs_with_none_values(self):
         """
@@ -228,8 +443,13 @@ class TwinModel(Model):
             if os.path.exists(self.model_log):
                 os.link(self.model_log, self.model_log_link)
 
+            # Load metadata from the on-disk cache if requested
+            if self._metadata_cache_dir is not None:
+                self._load_metadata()
+
             # Update TwinModel variables
             self._instantiation_time = time.time()
+            self._cache_start_values()
             self._initialize_inputs_with_start_values()
             self._initialize_parameters_with_start_values()
             self._initialize_outputs_with_none_values()
@@ -239,6 +459,21 @@ class TwinModel(Model):
             msg += f"\n{str(e)}"
             self._raise_error(msg)
 
+    def _load_metadata(self):
+        """
+        Read twin model metadata from the on-disk cache, or query it from the twin runtime and store it in the cache.
+        """
+        metadata = read_twin_model_metadata(self._model_filepath, self._metadata_cache_dir)
+        if metadata is None:
+            metadata = query_twin_model_metadata(self._twin_runtime)
+            write_twin_model_metadata(self._model_filepath, self._metadata_cache_dir, metadata)
+            self._log_message(f"Twin model metadata stored in cache directory {self._metadata_cache_dir}")
+        var_properties = metadata["var_properties"]
+        start_values = dict(zip(var_properties["Name"], map(float, var_properties["Start"])))
+        metadata["input_start_values"] = [start_values[name] for name in metadata["input_names"]]
+        metadata["parameter_start_values"] = [start_values[name] for name in metadata["parameter_names"]]
+        self._metadata = metadata
+
     def _raise_model_error(self, msg):
         """
         Raise a TwinModelError with formatted message.
@@ -282,6 +517,16 @@ class TwinModel(Model):
                 self._parameters[name] = value
                 self._twin_runtime.twin_set_param_by_name(param_name=name, value=value)
 
+    def _sync_dicts_with_array_step(self):
+        """
+        Update inputs and outputs dictionaries with the values of the last array based step by step evaluation. This is
+        done lazily so that array based evaluations do not create any Python object.
+        """
+        if self._dicts_are_outdated:
+            self._inputs = dict(zip(self._inputs, self._array_step_inputs.tolist()))
+            self._outputs = dict(zip(self._outputs, self._array_step_outputs.tolist()))
+            self._dicts_are_outdated = False
+
     def _tbrom_resource_directory(self, rom_name: str):
         """
         Return the path of the resource directory associated with rom_name.
@@ -329,11 +574,19 @@ class TwinModel(Model):
         """
         return self._evaluation_time
 
+    @property
+    def input_names(self):
+        """
+        Return the list of input names, in the order used by the twin runtime and by array based evaluations.
+        """
+        return list(self._inputs)
+
     @property
     def inputs(self):
         """
         Return a dictionary with input values at current evaluation time.
         """
+        self._sync_dicts_with_array_step()
         return self._inputs
 
     @property
@@ -355,8 +608,16 @@ class TwinModel(Model):
         """
         Return a dictionary with output values at current evaluation time.
         """
+        self._sync_dicts_with_array_step()
         return self._outputs
 
+    @property
+    def output_names(self):
+        """
+        Return the list of output names, in the order used by the twin runtime and by array based evaluations.
+        """
+        return list(self._outputs)
+
     @property
     def parameters(self):
         """
@@ -397,7 +658,9 @@ class TwinModel(Model):
         """
         return os.path.join(self.model_dir, self.TBROM_FOLDER_NAME)
 
-    def initialize_evaluation(self, parameters: dict = None, inputs: dict = None, json_config_filepath: str = None):
+    def initialize_evaluation(
+        self, parameters: dict = None, inputs: dict = None, json_config_filepath: str = None, tbrom_outputs: bool = True
+    ):
         """
         Initialize the twin model evaluation with: (1) a dictionary of parameters values and/or inputs (start) values
         OR (2) a json configuration file (see example below).
@@ -425,6 +688,11 @@ class TwinModel(Model):
             The input values (i.e. {"name": value}) to be used for twin model initialization.
         json_config_filepath : str, optional
             A file path to a json config file (with .json extension) to be used to initialize the evaluation
+        tbrom_outputs : bool, optional
+            Whether TBROM included in the twin model write their outputs (images, snapshots and mode coefficients
+            files) during the evaluation. Default is True. Use False for evaluations that do not need any field
+            result (e.g. parametric sweeps), so that no TBROM file is written. Visualization resources of the twin
+            model are resolved at first initialization only.
 
         Examples
         --------
@@ -444,7 +712,7 @@ class TwinModel(Model):
 
         if json_config_filepath is None:
             self._log_key += "WithDictionary"
-            self._initialize_evaluation(parameters=parameters, inputs=inputs)
+            self._initialize_evaluation(parameters=parameters, inputs=inputs, tbrom_outputs=tbrom_outputs)
         else:
             self._log_key += "WithConfigFile"
             cfg = self._read_eval_init_config(json_config_filepath)
@@ -455,7 +723,49 @@ class TwinModel(Model):
                     _parameters = cfg["model"]["parameters"]
                 if "inputs" in cfg["model"]:
                     _inputs = cfg["model"]["inputs"]
-            self._initialize_evaluation(parameters=_parameters, inputs=_inputs)
+            self._initialize_evaluation(parameters=_parameters, inputs=_inputs, tbrom_outputs=tbrom_outputs)
+
+    def evaluate_sweep_case(
+        self, parameters: dict = None, inputs: dict = None, inputs_df: pd.DataFrame = None, tbrom_outputs: bool = False
+    ):
+        """
+        Evaluate one case of a parametric sweep: initialize the evaluation with given parameters and inputs values,
+        then evaluate the twin model in batch mode if inputs_df is given.
+
+        It gives the same results as initialize_evaluation (followed by evaluate_batch) but it is optimized for many
+        re-initializations of the same twin model: start values are queried once per instance, only parameters that
+        differ from their start value are set (by index) and inputs are set with a single twin runtime call. TBROM
+        outputs are disabled by default.
+
+        Parameters
+        ----------
+        parameters : dict, optional
+            The parameter values (i.e. {"name": value}) of the case.
+        inputs : dict, optional
+            The input values (i.e. {"name": value}) used for twin model initialization.
+        inputs_df : pandas.DataFrame, optional
+            The input values over time of a batch evaluation (see evaluate_batch).
+        tbrom_outputs : bool, optional
+            Whether TBROM included in the twin model write their outputs (see initialize_evaluation). Default is False.
+
+        Returns
+        -------
+        outputs : dict or pandas.DataFrame
+            A copy of the outputs dictionary after initialization if inputs_df is None, otherwise the batch evaluation
+            outputs dataframe.
+
+        Examples
+        --------
+        >>> from pytwin import TwinModel
+        >>> twin_model = TwinModel(model_filepath='path_to_your_twin_model.twin')
+        >>> results = [twin_model.evaluate_sweep_case(parameters={'param1': value}) for value in range(50000)]
+        """
+        self._log_key = "EvaluateSweepCase"
+
+        self._initialize_sweep_case(parameters=parameters, inputs=inputs, tbrom_outputs=tbrom_outputs)
+        if inputs_df is None:
+            return dict(self._outputs)
+        return self.evaluate_batch(inputs_df)
 
     def evaluate_step_by_step(self, step_size: float, inputs: dict = None):
         """
@@ -487,6 +797,8 @@ class TwinModel(Model):
         if self._twin_runtime is None:
             self._raise_error("Twin model has not been successfully instantiated!")
 
+        self._sync_dicts_with_array_step()
+
         if not self.evaluation_is_initialized:
             self._raise_error("Twin model evaluation has not been initialized! Please initialize evaluation.")
 
@@ -509,6 +821,107 @@ class TwinModel(Model):
             msg += f"\nYou will find more details in model log (see {self.model_log} file)"
             self._raise_error(msg)
 
+    def evaluate_step_by_step_array(self, step_size: float, inputs: np.ndarray = None, outputs: np.ndarray = None):
+        """
+        Evaluate the twin model at time instant t + step_size given inputs at time instant t, with inputs and outputs
+        given as float64 arrays (ordered by input_names and output_names). This is the fast counterpart of the
+        `evaluate_step_by_step` method, meant for soft real-time loops: inputs are set with a single runtime call and
+        outputs are written into a caller owned array, so that no Python object is created per step.
+
+        The inputs and outputs properties are updated lazily, the next time they are accessed.
+
+        Twin model evaluation must have been initialized before calling this method
+        (see `initialize_evaluation` method).
+
+        Parameters
+        ----------
+        step_size : float
+            The step size (in second) to reach next time step. It must be strictly positive.
+        inputs : np.ndarray (optional)
+            The values of all the twin model inputs (ordered by input_names) at time instant t. Inputs keep current
+            values if not provided.
+        outputs : np.ndarray (optional)
+            A writeable C-contiguous float64 array with one value per twin model output in which outputs values at time
+            instant t + step_size are written (ordered by output_names). A new array is returned if not provided.
+
+        Returns
+        -------
+        outputs: np.ndarray
+            The outputs values at time instant t + step_size (ordered by output_names).
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> from pytwin import TwinModel
+        >>> twin_model = TwinModel(model_filepath='path_to_your_twin_model.twin')
+        >>> twin_model.initialize_evaluation()
+        >>> # Resolve names to indices once, before the loop
+        >>> input1_idx = twin_model.input_names.index('input1')
+        >>> output1_idx = twin_model.output_names.index('output1')
+        >>> inputs = np.array(list(twin_model.inputs.values()))
+        >>> outputs = np.empty(len(twin_model.output_names))
+        >>> for i in range(1000):
+        >>>     inputs[input1_idx] = i * 0.1
+        >>>     twin_model.evaluate_step_by_step_array(step_size=0.001, inputs=inputs, outputs=outputs)
+        >>>     output1 = outputs[output1_idx]
+        """
+        self._log_key = "EvaluateStepByStepArray"
+
+        if self._twin_runtime is None:
+            self._raise_error("Twin model has not been successfully instantiated!")
+
+        if not self._twin_runtime.is_model_initialized:
+            self._raise_error("Twin model evaluation has not been initialized! Please initialize evaluation.")
+
+        if step_size <= 0.0:
+            msg = f"Step size must be strictly bigger than zero ({step_size} was provided)!"
+            self._raise_error(msg)
+
+        # Check arrays before any runtime call, so that a failed step can be retried
+        if inputs is not None and np.shape(inputs) != (len(self._inputs),):
+            msg = f"The input array size must match the number of twin model inputs ({len(self._inputs)})!"
+            msg += f" (given inputs array has shape {np.shape(inputs)})."
+            self._raise_error(msg)
+
+        if outputs is not None and not (
+            isinstance(outputs, np.ndarray)
+            and outputs.shape == (len(self._outputs),)
+            and outputs.dtype == np.float64
+            and outputs.flags.c_contiguous
+            and outputs.flags.writeable
+        ):
+            msg = "Given outputs array is not a writeable C-contiguous float64 array"
+            msg += f" of shape ({len(self._outputs)},)!"
+            msg += "\nPlease provide an array created with np.empty(len(twin_model.output_names))."
+            self._raise_error(msg)
+
+        if not self._dicts_are_outdated:
+            if self._array_step_inputs is None:
+                self._array_step_inputs = np.empty(len(self._inputs), dtype=np.float64)
+                self._array_step_outputs = np.empty(len(self._outputs), dtype=np.float64)
+            self._array_step_inputs[:] = list(self._inputs.values())
+
+        if outputs is None:
+            outputs = np.empty(len(self._outputs), dtype=np.float64)
+
+        try:
+            if inputs is not None:
+                self._twin_runtime.twin_set_inputs(inputs)
+                self._array_step_inputs[:] = inputs
+            self._twin_runtime.twin_simulate(self._evaluation_time + step_size)
+            self._evaluation_time += step_size
+            self._twin_runtime.twin_get_outputs_array(outputs)
+            self._array_step_outputs[:] = outputs
+            self._dicts_are_outdated = True
+        except Exception as e:
+            msg = f"Something went wrong during evaluation at time step {self._evaluation_time}:"
+            msg += f"\n{str(e)}"
+            msg += f"\nPlease reinitialize the model evaluation and restart evaluation."
+            msg += f"\nYou will find more details in model log (see {self.model_log} file)"
+            self._raise_error(msg)
+
+        return outputs
+
     def evaluate_batch(self, inputs_df: pd.DataFrame):
         """
         Evaluate the twin model with historical input values given with a data frame.
@@ -546,6 +959,8 @@ class TwinModel(Model):
         if self._twin_runtime is None:
             self._raise_error("Twin model has not been successfully instantiated!")
 
+        self._sync_dicts_with_array_step()
+
         if not self.evaluation_is_initialized:
             self._raise_error("Twin model evaluation has not been initialized! Please initialize evaluation.")
 
@@ -577,6 +992,355 @@ class TwinModel(Model):
             msg += f"\nYou will find more details in model log (see {self.model_log} file)"
             self._raise_error(msg)
 
+    def evaluate_batch_array(
+        self, time: np.ndarray, inputs: Union[np.ndarray, dict] = None, output_array: np.ndarray = None
+    ):
+        """
+        Evaluate the twin model with historical input values given with NumPy arrays. This is the array counterpart
+        of the `evaluate_batch` method: no pandas object is created and inputs are copied only once, into the
+        contiguous block that is handed to the twin runtime.
+
+        Parameters
+        ----------
+        time : np.ndarray
+            The time instants (in second) of the input values, starting at time instant t=0.(s).
+        inputs : np.ndarray or dict (optional)
+            The historical input values. Either a 2D array with one row per time instant and one column per twin
+            model input (ordered by input_names), or a dictionary {"name": values} with one array of input values per
+            time instant. An input that is not provided is kept constant to its initialization value.
+        output_array : np.ndarray (optional)
+            A writeable C-ordered float64 buffer with at least len(time) rows and len(output_names) + 1 columns in
+            which results are written. It lets high-rate callers reuse the same memory for successive evaluations.
+
+        Returns
+        -------
+        time, outputs: (np.ndarray, np.ndarray)
+            The output time instants and a 2D array with one row per output time instant and one column per twin
+            model output (ordered by output_names). Both arrays are views on the same output block.
+
+        Raises
+        ------
+        TwinModelError:
+            if initialize_evaluation(...) has not been called before, if there is no time instant t=0.s, if inputs
+            or output_array have not the expected shape.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> from pytwin import TwinModel
+        >>> twin_model = TwinModel(model_filepath='path_to_your_twin_model.twin')
+        >>> twin_model.initialize_evaluation()
+        >>> time = np.array([0., 1., 2.])
+        >>> time, outputs = twin_model.evaluate_batch_array(time, inputs={'input1': np.array([1., 2., 3.])})
+        >>> output1 = outputs[:, twin_model.output_names.index('output1')]
+        """
+        self._log_key = "EvaluateBatchArray"
+
+        if self._twin_runtime is None:
+            self._raise_error("Twin model has not been successfully instantiated!")
+
+        self._sync_dicts_with_array_step()
+
+        if not self.evaluation_is_initialized:
+            self._raise_error("Twin model evaluation has not been initialized! Please initialize evaluation.")
+
+        _time = np.asarray(time, dtype=np.float64)
+        if _time.ndim != 1 or _time.shape[0] == 0:
+            self._raise_error(f"Given time must be a non empty 1D array (given shape is {_time.shape})!")
+
+        t0 = _time[0]
+        if not np.isclose(t0, 0.0, atol=np.spacing(0.0)):
+            msg = "Given time has no time instant t=0.s!"
+            msg += f" (first provided time instant is : {t0})."
+            msg += "\nPlease provide inputs at time instant t=0.s"
+            self._raise_error(msg)
+
+        # Ensure SDK conventions are fulfilled
+        if isinstance(inputs, dict):
+            self._warns_if_input_key_not_found(inputs)
+        _inputs = self._create_array_inputs(_time, inputs)
+        if output_array is not None:
+            if output_array.ndim != 2 or output_array.shape[1] != len(self._outputs) + 1:
+                msg = f"Given output array has shape {output_array.shape}!"
+                msg += f"\nPlease provide an output array with {len(self._outputs) + 1} columns (time and outputs)."
+                self._raise_error(msg)
+
+        try:
+            outputs = self._twin_runtime.twin_simulate_batch_mode_array(input_array=_inputs, output_array=output_array)
+            return outputs[:, 0], outputs[:, 1:]
+        except Exception as e:
+            msg = f"Something went wrong during batch evaluation:"
+            msg += f"\n{str(e)}"
+            msg += f"\nPlease reinitialize the model evaluation and restart evaluation."
+            msg += f"\nYou will find more details in model log (see {self.model_log} file)"
+            self._raise_error(msg)
+
+    def evaluate_batch_chunks(self, chunks: Iterable, output_as_dataframe: bool = True):
+        """
+        Evaluate the twin model with historical input values given as a sequence of chunks, and yield the twin output
+        values chunk by chunk. Chunks are simulated one after the other and the twin model state is carried across
+        chunk boundaries, so that the results are the same as a batch evaluation of the whole history while memory is
+        bounded by the chunk size.
+
+        After (or while) iterating, the twin model evaluation time, inputs and outputs properties are the ones at the
+        last simulated time instant, so that the evaluation can be continued step by step.
+
+        Parameters
+        ----------
+        chunks : Iterable
+            Iterable over the historical input values. Each chunk is either a pandas.DataFrame with a 'Time' column
+            and one column per input (as in `evaluate_batch`), an object with a `to_pandas` method (e.g. Arrow record
+            batches of a Parquet file), or a 2D array with the time as first column followed by the inputs (ordered by
+            input_names). The first chunk must start at time instant t=0.(s) and time instants must be strictly
+            increasing across chunks. Inputs not found in a chunk are kept constant to their initialization value.
+            CSV and Parquet files can be streamed with `pandas.read_csv(..., chunksize=n)` or
+            `pyarrow.parquet.ParquetFile(...).iter_batches(n)`.
+        output_as_dataframe : bool (optional)
+            If True (default), output chunks are pandas.DataFrame with the same columns as `evaluate_batch`
+            results. Otherwise they are 2D arrays with the time as first column followed by the outputs (ordered by
+            output_names).
+
+        Yields
+        ------
+        output_chunk: pandas.DataFrame or np.ndarray
+            The twin output values associated to the input chunk time instants.
+
+        Raises
+        ------
+        TwinModelError:
+            if initialize_evaluation(...) has not been called before, if the first chunk has no time instant t=0.s,
+            if time instants are not increasing across chunks.
+
+        Examples
+        --------
+        >>> import pandas as pd
+        >>> from pytwin import TwinModel
+        >>> twin_model = TwinModel(model_filepath='path_to_your_twin_model.twin')
+        >>> twin_model.initialize_evaluation()
+        >>> chunks = pd.read_csv('path_to_your_long_input_history.csv', chunksize=100000)
+        >>> for output_df in twin_model.evaluate_batch_chunks(chunks):
+        >>>     output_df.to_csv('path_to_your_outputs.csv', mode='a', header=False)
+        """
+        self._log_key = "EvaluateBatchChunks"
+
+        if self._twin_runtime is None:
+            self._raise_error("Twin model has not been successfully instantiated!")
+
+        self._sync_dicts_with_array_step()
+
+        if not self.evaluation_is_initialized:
+            self._raise_error("Twin model evaluation has not been initialized! Please initialize evaluation.")
+
+        initial_inputs = dict(self._inputs)
+        output_col_names = ["Time"] + list(self._outputs)
+        last_inputs = None
+        for chunk in chunks:
+            self._log_key = "EvaluateBatchChunks"
+            _inputs = self._create_chunk_inputs(chunk, initial_inputs, warns=last_inputs is None)
+            if _inputs.shape[0] == 0:
+                continue
+
+            if last_inputs is None:
+                t0 = _inputs[0, 0]
+                if not np.isclose(t0, 0.0, atol=np.spacing(0.0)):
+                    msg = "Given first chunk has no time instant t=0.s!"
+                    msg += f" (first provided time instant is : {t0})."
+                    msg += "\nPlease provide inputs at time instant t=0.s"
+                    self._raise_error(msg)
+            else:
+                if _inputs[0, 0] <= last_inputs[0]:
+                    msg = f"Given chunk starts at time instant {_inputs[0, 0]} which is not after the last time "
+                    msg += f"instant of the previous chunk ({last_inputs[0]})!"
+                    msg += "\nPlease provide chunks with strictly increasing time instants."
+                    self._raise_error(msg)
+                # Restart from the previous chunk boundary so that inputs are continuous across chunks
+                _inputs = np.vstack((last_inputs, _inputs))
+
+            try:
+                outputs = self._twin_runtime.twin_simulate_batch_mode_array(
+                    input_array=_inputs, start_time=self._evaluation_time
+                )
+            except Exception as e:
+                msg = f"Something went wrong during batch evaluation of chunk starting at {_inputs[0, 0]}:"
+                msg += f"\n{str(e)}"
+                msg += f"\nPlease reinitialize the model evaluation and restart evaluation."
+                msg += f"\nYou will find more details in model log (see {self.model_log} file)"
+                self._raise_error(msg)
+
+            if last_inputs is not None:
+                # First row is the state at the boundary that has already been yielded with the previous chunk
+                outputs = outputs[1:]
+            last_inputs = _inputs[-1].copy()
+            self._evaluation_time = float(outputs[-1, 0])
+            self._inputs = dict(zip(self._inputs, last_inputs[1:].tolist()))
+            self._outputs = dict(zip(self._outputs, outputs[-1, 1:].tolist()))
+
+            if output_as_dataframe:
+                yield pd.DataFrame(data=outputs, columns=output_col_names, copy=False)
+            else:
+                yield outputs
+
+    def _read_batch_file_chunks(self, input_path: str, chunksize: int):
+        """
+        Return an iterator over the chunks of historical input values of a CSV or Parquet file (see
+        evaluate_batch_file).
+        """
+        if input_path.lower().endswith(".parquet"):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                self._raise_error("Parquet files can only be evaluated if pyarrow is installed!")
+            return pq.ParquetFile(input_path).iter_batches(batch_size=chunksize)
+        return load_data(input_path, chunksize=chunksize)
+
+    def _write_batch_file_chunks(self, output_chunks: Iterable, output_path: str):
+        """
+        Write the chunks of output values yielded by evaluate_batch_chunks into a CSV or Parquet file (see
+        evaluate_batch_file).
+        """
+        if output_path.lower().endswith(".parquet"):
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                self._raise_error("Parquet files can only be written if pyarrow is installed!")
+            writer = None
+            try:
+                for output_df in output_chunks:
+                    table = pa.Table.from_pandas(output_df, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(output_path, table.schema)
+                    writer.write_table(table)
+            finally:
+                if writer is not None:
+                    writer.close()
+        else:
+            with open(output_path, "w", newline="") as f:
+                for chunk_index, output_df in enumerate(output_chunks):
+                    output_df.to_csv(f, header=chunk_index == 0, index=False)
+
+    def _batch_file_fits_runtime_csv(self, input_path: str, output_path: str):
+        """
+        Return True if the input file can be evaluated by the twin runtime CSV batch mode, that is if both files are CSV
+        files and if the input header is 'Time' followed by all twin model inputs (ordered by input_names).
+        """
+        if not (input_path.lower().endswith(".csv") and output_path.lower().endswith(".csv")):
+            return False
+        with open(input_path, newline="") as f:
+            reader = csv.reader(f, skipinitialspace=True)
+            header = next(reader, None)
+            first_row = next(reader, None)
+        if header != ["Time"] + self.input_names or first_row is None:
+            return False
+        try:
+            t0 = float(first_row[0])
+        except ValueError:
+            msg = f"Given input file has a non numerical first time instant ({first_row[0]})!"
+            msg += "\nPlease provide numerical inputs at time instant t=0.s"
+            self._raise_error(msg)
+        if not np.isclose(t0, 0.0, atol=np.spacing(0.0)):
+            msg = "Given input file has no time instant t=0.s!"
+            msg += f" (first provided time instant is : {t0})."
+            msg += "\nPlease provide inputs at time instant t=0.s"
+            self._raise_error(msg)
+        return True
+
+    @staticmethod
+    def _read_last_csv_row(filepath: str, block_size: int = 4096):
+        """
+        Return the values of the last row of a CSV file, reading the file backwards from its end.
+        """
+        with open(filepath, "rb") as f:
+            position = f.seek(0, os.SEEK_END)
+            data = b""
+            while position > 0 and b"\n" not in data.rstrip():
+                read_size = min(position, block_size)
+                position -= read_size
+                f.seek(position)
+                data = f.read(read_size) + data
+        last_line = data.rstrip().rsplit(b"\n", 1)[-1].decode()
+        return [float(value) for value in next(csv.reader([last_line], skipinitialspace=True))]
+
+    def evaluate_batch_file(self, input_path: str, output_path: str, chunksize: int = 100000):
+        """
+        Evaluate the twin model with historical input values read from a file, and write the twin output values into
+        another file, without loading the whole history in memory.
+
+        If both files are CSV files and the input file header is 'Time' followed by all twin model inputs (ordered by
+        input_names), the files are handed to the twin runtime CSV batch mode. Otherwise, input values are read by
+        chunks (CSV or Parquet file) and evaluated with `evaluate_batch_chunks`, and output values are written chunk by
+        chunk (CSV or Parquet file). Inputs that are not found in the input file are kept constant to their
+        initialization value (see `evaluate_batch`). Parquet files require pyarrow. In both cases, the twin model
+        evaluation time, inputs and outputs properties are the ones at the last simulated time instant afterwards.
+
+        Parameters
+        ----------
+        input_path : str
+            Path to the input file (.csv or .parquet), with a 'Time' column starting at time instant t=0.(s) and one
+            column per input.
+        output_path : str
+            Path to the output file (.csv or .parquet), with a 'Time' column and one column per output.
+        chunksize : int (optional)
+            Number of rows read and evaluated at once when the input file is read by chunks. Default is 100000.
+
+        Returns
+        -------
+        output_path: str
+            Path to the output file.
+
+        Raises
+        ------
+        TwinModelError:
+            if initialize_evaluation(...) has not been called before, if the input file does not exist, if there is
+            no time instant t=0.s in the input file.
+
+        Examples
+        --------
+        >>> from pytwin import TwinModel
+        >>> twin_model = TwinModel(model_filepath='path_to_your_twin_model.twin')
+        >>> twin_model.initialize_evaluation()
+        >>> twin_model.evaluate_batch_file('path_to_your_inputs.csv', 'path_to_your_outputs.parquet')
+        """
+        self._log_key = "EvaluateBatchFile"
+
+        if self._twin_runtime is None:
+            self._raise_error("Twin model has not been successfully instantiated!")
+
+        self._sync_dicts_with_array_step()
+
+        if not self.evaluation_is_initialized:
+            self._raise_error("Twin model evaluation has not been initialized! Please initialize evaluation.")
+
+        if not os.path.exists(input_path):
+            self._raise_error(f"Given input file {input_path} does not exist!")
+
+        if self._batch_file_fits_runtime_csv(input_path, output_path):
+            try:
+                self._twin_runtime.twin_simulate_batch_mode_csv(input_path, output_path)
+            except Exception as e:
+                msg = f"Something went wrong during batch evaluation of file {input_path}:"
+                msg += f"\n{str(e)}"
+                msg += f"\nPlease reinitialize the model evaluation and restart evaluation."
+                msg += f"\nYou will find more details in model log (see {self.model_log} file)"
+                self._raise_error(msg)
+            # Same evaluation time, inputs and outputs as after a chunked evaluation (last simulated time instant)
+            try:
+                last_inputs = self._read_last_csv_row(input_path)
+                last_outputs = self._read_last_csv_row(output_path)
+            except Exception as e:
+                msg = "Something went wrong while reading the last time instant of batch evaluation files:"
+                msg += f"\n{str(e)}"
+                self._raise_error(msg)
+            self._evaluation_time = last_outputs[0]
+            self._inputs = dict(zip(self._inputs, last_inputs[1:]))
+            self._outputs = dict(zip(self._outputs, last_outputs[1:]))
+            return output_path
+
+        chunks = self._read_batch_file_chunks(input_path, chunksize)
+        self._write_batch_file_chunks(self.evaluate_batch_chunks(chunks), output_path)
+        self._log_key = "EvaluateBatchFile"
+        return output_path
+
     def get_available_view_names(self, rom_name: str):
         """
         Get a list of available view names for a given Reduced Order Model (ROM) available in the TwinModel.
@@ -697,10 +1461,81 @@ class TwinModel(Model):
 
         return filepath
 
-    def get_geometry_filepath(self, rom_name: str):
+    def get_image_filepaths(self, rom_name: str, view_names: list = None, time_from: float = -1, time_to: float = -1):
         """
-        Get the geometry file associated to a Reduced Order Model (ROM) available in the TwinModel. The geometry file
-        contains the coordinates of the points that are used to define the geometrical support of the ROM field output.
+        Get all image files associated to a Reduced Order Model (ROM) available in the TwinModel, for several views
+        and a range of evaluation times, with a single query to the twin runtime. Contrary to `get_image_filepath`, no
+        file name is formatted nor checked per view and per evaluation time.
+
+        Parameters
+        ----------
+        rom_name : str
+            This is the name of a ROM model that is available in the TwinModel. See TwinModel.tbrom_names property to
+            get a list of available ROM model.
+        view_names : list, optional
+            The view names to list. All available views are listed if None (default).
+        time_from : float, optional
+            First evaluation time. All available evaluation times are listed if -1 (default).
+        time_to : float, optional
+            Last evaluation time. All available evaluation times are listed if -1 (default).
+
+        Returns
+        -------
+        image_filepaths : dict
+            Dictionary {evaluation_time: {view_name: image_filepath}} sorted by evaluation time.
+
+        Raises
+        ------
+        TwinModelError:
+            It raises an error if TwinModel has not been initialized.
+            It raises an error if TwinModel does not include any TBROM.
+            It raises an error if rom_name is not available.
+            It raises an error if a view_name is not available.
+
+        Examples
+        --------
+        >>> from pytwin import TBROMImagePrefetcher, TwinModel
+        >>> model = TwinModel(model_filepath='path_to_twin_model_with_TBROM_in_it.twin')
+        >>> model.initialize_evaluation()
+        >>> rom_name = model.tbrom_names[0]
+        >>> view_name = model.get_available_view_names(rom_name)[0]
+        >>> for step in range(100):
+        >>>     model.evaluate_step_by_step(step_size=0.1)
+        >>> image_filepaths = model.get_image_filepaths(rom_name, [view_name])
+        >>> for filepath, image in TBROMImagePrefetcher([views[view_name] for views in image_filepaths.values()]):
+        >>>     print(filepath, len(image))
+        """
+        self._log_key = "GetImageFilePaths"
+
+        if not self.evaluation_is_initialized:
+            msg = "TwinModel has not been initialized! "
+            msg += "Please initialize evaluation before to call this method!"
+            self._raise_error(msg)
+
+        available_view_names = self.get_available_view_names(rom_name)
+        if view_names is None:
+            view_names = available_view_names
+        for view_name in view_names:
+            if view_name not in available_view_names:
+                msg = f"The provided view_name {view_name} is not available for rom_name {rom_name}."
+                msg += f"Please call this method with valid view names."
+                msg += f'\n Available view name for "{rom_name}" are: {available_view_names}'
+                self._raise_error(msg)
+        if len(view_names) == 0:
+            return dict()
+
+        try:
+            image_filepaths = self._twin_runtime.twin_get_rom_images_files(rom_name, view_names, time_from, time_to)
+            return map_tbrom_image_files(image_filepaths, view_names)
+        except Exception as e:
+            msg = f"Something went wrong while getting image files of TBROM {rom_name}:"
+            msg += f"\n{str(e)}"
+            self._raise_error(msg)
+
+    def get_geometry_filepath(self, rom_name: str):
+        """
+        Get the geometry file associated to a Reduced Order Model (ROM) available in the TwinModel. The geometry file
+        contains the coordinates of the points that are used to define the geometrical support of the ROM field output.
 
         Parameters
         ----------
@@ -850,6 +1685,267 @@ class TwinModel(Model):
 
         return filepath
 
+    def get_tbrom_reconstructor(self, rom_name: str):
+        """
+        Get the reconstructor of the fields of a Reduced Order Model (ROM) available in the TwinModel from its mode
+        coefficients. The ROM basis is loaded from the ROM resource directory at first call only.
+
+        Parameters
+        ----------
+        rom_name : str
+            This is the name of a ROM model that is available in the TwinModel. See TwinModel.tbrom_names property to
+            get a list of available ROM model.
+
+        Returns
+        -------
+        reconstructor : TBROMReconstructor
+            The field reconstructor of the ROM.
+
+        Raises
+        ------
+        TwinModelError:
+            It raises an error if TwinModel has not been initialized.
+            It raises an error if TwinModel does not include any TBROM.
+            It raises an error if rom_name is not available.
+            It raises an error if the ROM basis cannot be read.
+
+        Examples
+        --------
+        >>> from pytwin import TwinModel
+        >>> model = TwinModel(model_filepath='path_to_twin_model_with_TBROM_in_it.twin')
+        >>> model.initialize_evaluation()
+        >>> reconstructor = model.get_tbrom_reconstructor(model.tbrom_names[0])
+        >>> field = reconstructor.reconstruct(mode_coefficients)
+        """
+        self._log_key = "GetTbromReconstructor"
+
+        reconstructor = self._tbrom_reconstructors.get(rom_name)
+        if reconstructor is None:
+            resource_directory = self._tbrom_resource_directory(rom_name)
+            try:
+                reconstructor = TBROMReconstructor(resource_directory)
+            except Exception as e:
+                msg = f"Something went wrong while loading the basis of TBROM {rom_name}:"
+                msg += f"\n{str(e)}"
+                self._raise_error(msg)
+            self._tbrom_reconstructors[rom_name] = reconstructor
+        return reconstructor
+
+    def reconstruct_tbrom_fields(self, rom_name: str, time_from: float = -1, time_to: float = -1):
+        """
+        Reconstruct the fields of a Reduced Order Model (ROM) available in the TwinModel from the mode coefficient
+        files written by the twin runtime (see TwinRuntime.twin_get_rom_mode_coef_files), with one matrix product.
+        Contrary to snapshot files, mode coefficient files only hold one value per mode.
+
+        Parameters
+        ----------
+        rom_name : str
+            This is the name of a ROM model that is available in the TwinModel. See TwinModel.tbrom_names property to
+            get a list of available ROM model.
+        time_from : float, optional
+            Evaluation time of the first reconstructed field. All available fields are reconstructed if -1 (default).
+        time_to : float, optional
+            Evaluation time of the last reconstructed field. All available fields are reconstructed if -1 (default).
+
+        Returns
+        -------
+        times : numpy.ndarray
+            Evaluation times of the reconstructed fields (parsed from the mode coefficient file names), sorted.
+        fields : numpy.ndarray
+            Array of shape (n_times, n_points) or (n_times, n_points, field_dim), in the order of times.
+
+        Raises
+        ------
+        TwinModelError:
+            It raises an error if TwinModel has not been initialized.
+            It raises an error if TwinModel does not include any TBROM.
+            It raises an error if rom_name is not available.
+            It raises an error if mode coefficient files cannot be read.
+
+        Examples
+        --------
+        >>> from pytwin import TwinModel
+        >>> model = TwinModel(model_filepath='path_to_twin_model_with_TBROM_in_it.twin')
+        >>> rom_name = model.tbrom_names[0]
+        >>> model.initialize_evaluation()
+        >>> for step in range(100):
+        >>>     model.evaluate_step_by_step(step_size=0.1)
+        >>> times, fields = model.reconstruct_tbrom_fields(rom_name)
+        """
+        reconstructor = self.get_tbrom_reconstructor(rom_name)
+        self._log_key = "ReconstructTbromFields"
+
+        try:
+            mode_coef_filepaths = self._twin_runtime.twin_get_rom_mode_coef_files(rom_name, time_from, time_to)
+            times, coefficients = reconstructor.read_mode_coefficient_series([str(f) for f in mode_coef_filepaths])
+            return times, reconstructor.reconstruct(coefficients)
+        except Exception as e:
+            msg = f"Something went wrong while reconstructing fields of TBROM {rom_name}:"
+            msg += f"\n{str(e)}"
+            self._raise_error(msg)
+
+    def create_tbrom_probe(self, rom_name: str, point_indices: list = None, coordinates: list = None):
+        """
+        Create a probe computing the field values of a Reduced Order Model (ROM) available in the TwinModel at a few
+        points, without reconstructing the full field (see TBROMProbe). Points are given by their indices, or by
+        coordinates resolved to the nearest ROM points (the ROM geometry is read once per TwinModel).
+
+        Parameters
+        ----------
+        rom_name : str
+            This is the name of a ROM model that is available in the TwinModel. See TwinModel.tbrom_names property to
+            get a list of available ROM model.
+        point_indices : list, optional
+            Indices of the probed points.
+        coordinates : list, optional
+            Coordinates (x, y, z) of the probed locations, used if point_indices is None.
+
+        Returns
+        -------
+        probe : TBROMProbe
+            The probe, to evaluate with TwinModel.evaluate_tbrom_probe or TBROMProbe.evaluate.
+
+        Raises
+        ------
+        TwinModelError:
+            It raises an error if TwinModel has not been initialized.
+            It raises an error if TwinModel does not include any TBROM.
+            It raises an error if rom_name is not available.
+            It raises an error if neither point_indices nor coordinates are given, or if they are not valid.
+
+        Examples
+        --------
+        >>> from pytwin import TwinModel
+        >>> model = TwinModel(model_filepath='path_to_twin_model_with_TBROM_in_it.twin')
+        >>> model.initialize_evaluation()
+        >>> rom_name = model.tbrom_names[0]
+        >>> probe = model.create_tbrom_probe(rom_name, coordinates=[[0., 0., 0.], [0.1, 0., 0.]])
+        >>> for step in range(100):
+        >>>     model.evaluate_step_by_step(step_size=0.1)
+        >>> times, probe_values = model.evaluate_tbrom_probe(probe)
+        """
+        reconstructor = self.get_tbrom_reconstructor(rom_name)
+        self._log_key = "CreateTbromProbe"
+
+        if point_indices is None and coordinates is None:
+            self._raise_error("Please provide either point indices or coordinates to create a TBROM probe!")
+        try:
+            if point_indices is None:
+                points = self._tbrom_points.get(rom_name)
+                if points is None:
+                    points = read_tbrom_points(self.get_geometry_filepath(rom_name))
+                    self._tbrom_points[rom_name] = points
+                point_indices = nearest_point_indices(points, coordinates)
+            return TBROMProbe(reconstructor, point_indices, rom_name)
+        except Exception as e:
+            msg = f"Something went wrong while creating a probe of TBROM {rom_name}:"
+            msg += f"\n{str(e)}"
+            self._raise_error(msg)
+
+    def evaluate_tbrom_probe(self, probe: TBROMProbe, time_from: float = -1, time_to: float = -1):
+        """
+        Evaluate a TBROM probe at each evaluation time of the mode coefficient files written by the twin runtime (see
+        TwinRuntime.twin_get_rom_mode_coef_files).
+
+        Parameters
+        ----------
+        probe : TBROMProbe
+            The probe, created with TwinModel.create_tbrom_probe.
+        time_from : float, optional
+            First evaluation time. All available evaluation times are used if -1 (default).
+        time_to : float, optional
+            Last evaluation time. All available evaluation times are used if -1 (default).
+
+        Returns
+        -------
+        times : numpy.ndarray
+            Evaluation times (parsed from the mode coefficient file names), sorted.
+        values : numpy.ndarray
+            Array of shape (n_times, n_probes) or (n_times, n_probes, field_dim), in the order of times.
+
+        Raises
+        ------
+        TwinModelError:
+            It raises an error if mode coefficient files cannot be read.
+        """
+        reconstructor = self.get_tbrom_reconstructor(probe.rom_name)
+        self._log_key = "EvaluateTbromProbe"
+
+        try:
+            mode_coef_filepaths = self._twin_runtime.twin_get_rom_mode_coef_files(probe.rom_name, time_from, time_to)
+            times, coefficients = reconstructor.read_mode_coefficient_series([str(f) for f in mode_coef_filepaths])
+            return times, probe.evaluate(coefficients)
+        except Exception as e:
+            msg = f"Something went wrong while evaluating a probe of TBROM {probe.rom_name}:"
+            msg += f"\n{str(e)}"
+            self._raise_error(msg)
+
+    def get_snapshot_series(self, rom_name: str, time_from: float = -1, time_to: float = -1):
+        """
+        Get the snapshot files written by a Reduced Order Model (ROM) available in the TwinModel as a time series that
+        is lazily memory-mapped. Snapshots are written at each evaluation time if the ROM stores its snapshots (see
+        its 'store_snapshots' and 'field_data_storage_period' parameters) or if its 3D data is enabled.
+
+        Parameters
+        ----------
+        rom_name : str
+            This is the name of a ROM model that is available in the TwinModel. See TwinModel.tbrom_names property to
+            get a list of available ROM model.
+        time_from : float, optional
+            Evaluation time of the first snapshot of the series. All snapshots are listed if -1 (default).
+        time_to : float, optional
+            Evaluation time of the last snapshot of the series. All snapshots are listed if -1 (default).
+
+        Returns
+        -------
+        series : TBROMSeries
+            The snapshot series, sorted by evaluation time.
+
+        Raises
+        ------
+        TwinModelError:
+            It raises an error if TwinModel has not been initialized.
+            It raises an error if TwinModel does not include any TBROM.
+            It raises an error if rom_name is not available.
+
+        Examples
+        --------
+        >>> from pytwin import TwinModel
+        >>> model = TwinModel(model_filepath='path_to_twin_model_with_TBROM_in_it.twin')
+        >>> rom_name = model.tbrom_names[0]
+        >>> model.initialize_evaluation(parameters={f'{rom_name}_store_snapshots': 1})
+        >>> for step in range(100):
+        >>>     model.evaluate_step_by_step(step_size=0.1)
+        >>> series = model.get_snapshot_series(rom_name)
+        >>> series.export('temperature_series.npy')
+        >>> print(series.times, series.history(point_index=0))
+        """
+        self._log_key = "GetSnapshotSeries"
+
+        if not self.evaluation_is_initialized:
+            msg = "TwinModel has not been initialized! "
+            msg += "Please initialize evaluation before to call this method!"
+            self._raise_error(msg)
+
+        if self.tbrom_info is None:
+            self._raise_error("Twin model does not include any TBROM!")
+
+        if rom_name not in self.tbrom_names:
+            msg = f"The provided rom_name {rom_name} has not been found in the available TBROM names. "
+            msg += f"Please call this method with a valid TBROM name."
+            msg += f"\n Available TBROM name are: {self.tbrom_names}"
+            self._raise_error(msg)
+
+        try:
+            snapshot_filepaths = self._twin_runtime.twin_get_rom_snapshot_files(rom_name, time_from, time_to)
+            series = TBROMSeries([str(filepath) for filepath in snapshot_filepaths])
+            order = np.argsort(series.times, kind="stable")
+            return TBROMSeries([series.snapshot_filepaths[i] for i in order], times=series.times[order])
+        except Exception as e:
+            msg = f"Something went wrong while getting snapshot series:"
+            msg += f"\n{str(e)}"
+            self._raise_error(msg)
+
     def load_state(self, model_id: str, evaluation_time: float, epsilon: float = 1e-8):
         """
         Load a state that has been saved by a TwinModel instantiated with same .twin file. Calling this method replaces
@@ -888,13 +1984,13 @@ class TwinModel(Model):
 
         try:
             # Search for existing state in registry
-            ss_registry = SavedStateRegistry(model_id=model_id, model_name=self.name)
+            ss_registry = self._get_saved_state_registry(model_id)
             ss = ss_registry.extract_saved_state(evaluation_time, epsilon)
-            ss_filepath = ss_registry.return_saved_state_filepath(ss)
 
-            # Initialize model accordingly and load existing state
+            # Initialize model accordingly and load existing state (restored from its storage if needed)
             self._initialize_evaluation(parameters=ss.parameters, inputs=ss.inputs)
-            self._twin_runtime.twin_load_state(ss_filepath)
+            with ss_registry.saved_state_file(ss) as ss_filepath:
+                self._twin_runtime.twin_load_state(ss_filepath)
             self._evaluation_time = ss.time
 
             BU732106_WORKAROUND = True
@@ -935,7 +2031,7 @@ class TwinModel(Model):
         try:
             # Lazy init saved state registry for this TwinModel
             if self._ss_registry is None:
-                self._ss_registry = SavedStateRegistry(model_id=self.id, model_name=self.name)
+                self._ss_registry = self._get_saved_state_registry(self.id)
 
             # Store saved state meta-data
             ss = SavedState()
@@ -945,14 +2041,295 @@ class TwinModel(Model):
             ss.inputs = self.inputs
             ss_filepath = self._ss_registry.return_saved_state_filepath(ss)
 
-            # Create actual saved state and register it
+            # Create actual saved state and register it (the registry stores it through its storage)
             self._twin_runtime.twin_save_state(save_to=ss_filepath)
             self._ss_registry.append_saved_state(ss)
+
+            # Prune saved states if a retention policy is applied after each save
+            if self._ss_retention_policy is not None:
+                self._ss_registry.apply_retention_policy(self._ss_retention_policy)
         except Exception as e:
             msg = f"Something went wrong while saving state:"
             msg += f"\n{str(e)}"
             self._raise_error(msg)
 
+    def set_saved_state_retention_policy(self, retention_policy: RetentionPolicy, background_interval: float = None):
+        """
+        Set the retention policy of the states saved by this twin model (see `save_state`). Saved states that are not
+        retained by the policy are removed from the registry and from the backup folder after each `save_state` call,
+        or periodically by a background thread if background_interval is given.
+
+        Parameters
+        ----------
+        retention_policy: RetentionPolicy
+            The retention policy (keep last N saved states, keep one per time bucket, maximum total bytes). None
+            disables pruning.
+        background_interval: float, optional
+            Period (in second) of the background compaction. If None, the policy is applied after each save.
+
+        Examples
+        --------
+        >>> from pytwin import RetentionPolicy, TwinModel
+        >>> twin_model = TwinModel('model.twin')
+        >>> twin_model.set_saved_state_retention_policy(RetentionPolicy(keep_last=10, time_bucket=3600.))
+        >>> twin_model.initialize_evaluation()
+        >>> for i in range(1000):
+        >>>     twin_model.evaluate_step_by_step(step_size=60.)
+        >>>     twin_model.save_state()
+        """
+        self._log_key = "SetSavedStateRetentionPolicy"
+
+        try:
+            if self._ss_registry is None:
+                self._ss_registry = self._get_saved_state_registry(self.id)
+            self._ss_registry.stop_background_compaction()
+            self._ss_retention_policy = None
+            if retention_policy is not None:
+                if background_interval is None:
+                    self._ss_retention_policy = retention_policy
+                else:
+                    self._ss_registry.start_background_compaction(retention_policy, background_interval)
+        except Exception as e:
+            msg = f"Something went wrong while setting saved state retention policy:"
+            msg += f"\n{str(e)}"
+            self._raise_error(msg)
+
+    def set_saved_state_storage(self, storage: SavedStateStorage):
+        """
+        Set the storage of the states saved by this twin model (see `save_state`). States can be compressed and/or
+        deduplicated into content-addressed chunks. States saved with any storage can be loaded with `load_state`.
+
+        Parameters
+        ----------
+        storage: SavedStateStorage
+            The saved state storage. None restores the default (raw) storage.
+
+        Examples
+        --------
+        >>> from pytwin import SavedStateStorage, TwinModel
+        >>> twin_model = TwinModel('model.twin')
+        >>> twin_model.set_saved_state_storage(SavedStateStorage(compression='lzma', chunk_size=64 * 1024))
+        >>> twin_model.initialize_evaluation()
+        >>> for i in range(100):
+        >>>     twin_model.evaluate_step_by_step(step_size=0.1)
+        >>>     twin_model.save_state()
+        >>> print(twin_model.saved_state_storage_statistics['space_savings'])
+        """
+        self._ss_storage = storage if storage is not None else SavedStateStorage()
+        for ss_registry in self._ss_registries.values():
+            ss_registry.storage = self._ss_storage
+
+    @property
+    def saved_state_storage_statistics(self):
+        """
+        Statistics of the states saved and loaded by this twin model: number of saves and loads, raw and stored bytes,
+        space savings and time spent storing and restoring state files (see SavedStateStorage.statistics).
+        """
+        return self._ss_storage.statistics
+
+    def save_snapshot(self, store: StateSnapshotStore = None):
+        """
+        Save the state of the twin model in memory. Contrary to `save_state`, nothing is persisted in the working
+        directory: the state written by the twin runtime is kept in the returned snapshot. The state file is exchanged
+        with the twin runtime through a tmpfs directory if available.
+
+        It should be used in conjunction with the `load_snapshot` method.
+
+        Parameters
+        ----------
+        store : StateSnapshotStore, optional
+            Store in which the snapshot is added.
+
+        Returns
+        -------
+        snapshot : StateSnapshot
+            The in-memory state of the twin model.
+
+        Raises
+        ------
+        TwinModelError:
+            If the twin model evaluation has not been initialized or if the twin runtime fails to save its state.
+
+        Examples
+        --------
+        >>> from pytwin import TwinModel
+        >>> twin_model = TwinModel('model.twin')
+        >>> twin_model.initialize_evaluation()
+        >>> twin_model.evaluate_step_by_step(step_size=0.1)
+        >>> snapshot = twin_model.save_snapshot()
+        >>> # Evaluate two branches starting from the same state
+        >>> twin_model.evaluate_step_by_step(step_size=0.1, inputs={'input1': 1.})
+        >>> twin_model.load_snapshot(snapshot)
+        >>> twin_model.evaluate_step_by_step(step_size=0.1, inputs={'input1': 2.})
+        """
+        self._log_key = "SaveSnapshot"
+
+        if self._twin_runtime is None:
+            self._raise_error("Twin model has not been successfully instantiated!")
+
+        self._sync_dicts_with_array_step()
+
+        if not self.evaluation_is_initialized:
+            self._raise_error("Twin model evaluation has not been initialized! Please initialize evaluation.")
+
+        snapshot_filepath = self._snapshot_filepath()
+        try:
+            self._twin_runtime.twin_save_state(save_to=snapshot_filepath)
+            with open(snapshot_filepath, "rb") as f:
+                data = f.read()
+        except Exception as e:
+            msg = f"Something went wrong while saving snapshot:"
+            msg += f"\n{str(e)}"
+            self._raise_error(msg)
+        finally:
+            if os.path.exists(snapshot_filepath):
+                os.remove(snapshot_filepath)
+
+        snapshot = StateSnapshot(
+            model_name=self.name,
+            time=self._evaluation_time,
+            parameters=dict(self._parameters),
+            inputs=dict(self._inputs),
+            outputs=dict(self._outputs),
+            data=data,
+        )
+        if store is not None:
+            store.put(snapshot)
+        return snapshot
+
+    def load_snapshot(self, snapshot: StateSnapshot):
+        """
+        Restore an in-memory state saved by a TwinModel instantiated with same .twin file. Calling this method replaces
+        evaluation initialization.
+
+        If the evaluation is already initialized with the parameters values of the snapshot, the twin model is not
+        re-initialized: only its inputs values and state are restored.
+
+        Parameters
+        ----------
+        snapshot: StateSnapshot
+            The snapshot returned by `save_snapshot`.
+
+        Raises
+        ------
+        TwinModelError:
+            If the snapshot was taken with a twin model of another name or if the twin runtime fails to load it.
+
+        Examples
+        --------
+        >>> from pytwin import TwinModel
+        >>> twin_model = TwinModel('model.twin')
+        >>> twin_model.initialize_evaluation()
+        >>> twin_model.evaluate_step_by_step(step_size=0.1)
+        >>> snapshot = twin_model.save_snapshot()
+        >>> twin_model.evaluate_step_by_step(step_size=0.1, inputs={'input1': 1.})
+        >>> twin_model.load_snapshot(snapshot)
+        >>> twin_model.evaluate_step_by_step(step_size=0.1, inputs={'input1': 2.})
+        """
+        self._log_key = "LoadSnapshot"
+
+        if self._twin_runtime is None:
+            self._raise_error("Twin model has not been successfully instantiated!")
+
+        if snapshot.model_name != self.name:
+            msg = f"Snapshot was taken with model {snapshot.model_name} and cannot be loaded into model {self.name}!"
+            self._raise_error(msg)
+
+        self._sync_dicts_with_array_step()
+
+        snapshot_filepath = self._snapshot_filepath()
+        try:
+            if self.evaluation_is_initialized and self._parameters == snapshot.parameters:
+                self._inputs = dict(snapshot.inputs)
+                self._twin_runtime.twin_set_inputs(np.array(list(self._inputs.values()), dtype=np.float64))
+            else:
+                self._initialize_evaluation(parameters=snapshot.parameters, inputs=snapshot.inputs)
+            with open(snapshot_filepath, "wb") as f:
+                f.write(snapshot.data)
+            self._twin_runtime.twin_load_state(snapshot_filepath)
+            self._evaluation_time = snapshot.time
+            # Same workaround as load_state: outputs are restored from the snapshot
+            self._outputs = dict(snapshot.outputs)
+        except Exception as e:
+            msg = f"Something went wrong while loading snapshot:"
+            msg += f"\n{str(e)}"
+            self._raise_error(msg)
+        finally:
+            if os.path.exists(snapshot_filepath):
+                os.remove(snapshot_filepath)
+
+    def evaluate_batch_from_snapshot(self, snapshot: StateSnapshot, inputs_df: pd.DataFrame):
+        """
+        Restore an in-memory state (see `load_snapshot`) and evaluate the twin model from this state with historical
+        input values given with a data frame. This is the building block of what-if analyses branching from a common
+        state, see TwinModelPool.evaluate_branches to evaluate several branches in parallel.
+
+        Parameters
+        ----------
+        snapshot: StateSnapshot
+            The snapshot returned by `save_snapshot`.
+        inputs_df: pandas.DataFrame
+            The historical input values stored in a pandas dataframe. It must have a 'Time' column starting at the
+            snapshot evaluation time and all twin model inputs history you want to simulate (one input per column).
+            If a twin model input is not found in the dataframe columns then this input is kept constant to its
+            snapshot value.
+
+        Returns
+        -------
+        output_df: pandas.DataFrame
+            The twin output values associated to the input values, stored in a pandas.DataFrame.
+
+        Raises
+        ------
+        TwinModelError:
+            If the snapshot cannot be loaded, if there is no 'Time' column in the inputs dataframe, if the inputs
+            dataframe does not start at the snapshot evaluation time.
+
+        Examples
+        --------
+        >>> import pandas as pd
+        >>> from pytwin import TwinModel
+        >>> twin_model = TwinModel(model_filepath='path_to_your_twin_model.twin')
+        >>> twin_model.initialize_evaluation()
+        >>> twin_model.evaluate_step_by_step(step_size=1.)
+        >>> snapshot = twin_model.save_snapshot()
+        >>> inputs_df = pd.DataFrame({'Time': [1., 2., 3.], 'input1': [1., 2., 3.]})
+        >>> outputs_df = twin_model.evaluate_batch_from_snapshot(snapshot, inputs_df)
+        """
+        self.load_snapshot(snapshot)
+        self._log_key = "EvaluateBatchFromSnapshot"
+
+        if "Time" not in inputs_df:
+            msg = "Given inputs dataframe has no 'Time' column!"
+            msg += f"\nExisting column labels are :{[s for s in inputs_df.columns]}"
+            msg += f"\nPlease provide a dataframe with a 'Time' column to use batch mode evaluation."
+            self._raise_error(msg)
+
+        _inputs = self._create_chunk_inputs(inputs_df, dict(self._inputs), warns=True)
+        t0 = _inputs[0, 0]
+        if not np.isclose(t0, snapshot.time, rtol=0.0, atol=1e-12 + 1e-12 * abs(snapshot.time)):
+            msg = f"Given inputs dataframe does not start at the snapshot evaluation time t={snapshot.time}s!"
+            msg += f" (first provided time instant is : {t0})."
+            msg += f"\nPlease provide inputs starting at time instant t={snapshot.time}s"
+            self._raise_error(msg)
+        _inputs[0, 0] = snapshot.time
+
+        try:
+            outputs = self._twin_runtime.twin_simulate_batch_mode_array(
+                input_array=_inputs, start_time=self._evaluation_time
+            )
+        except Exception as e:
+            msg = f"Something went wrong during batch evaluation from snapshot:"
+            msg += f"\n{str(e)}"
+            msg += f"\nPlease reinitialize the model evaluation and restart evaluation."
+            msg += f"\nYou will find more details in model log (see {self.model_log} file)"
+            self._raise_error(msg)
+
+        self._evaluation_time = float(outputs[-1, 0])
+        self._inputs = dict(zip(self._inputs, _inputs[-1, 1:].tolist()))
+        self._outputs = dict(zip(self._outputs, outputs[-1, 1:].tolist()))
+        return pd.DataFrame(data=outputs, columns=["Time"] + list(self._outputs), copy=False)
+
 
 class TwinModelError(Exception):
     def __str__(self):
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import uuid
+
+import numpy as np
+from pytwin import get_pytwin_logger, get_pytwin_working_dir
+from pytwin.settings import PYTWIN_SETTINGS
+from pytwin.twin_runtime.log_level import LogLevel
+from pytwin.twin_runtime.twin_runtime_core import CUR_DIR, TwinRuntime
+
+METADATA_FORMAT_VERSION = 1
+METADATA_FILE_EXT = ".json"
+
+# Content hashes of already hashed twin files, keyed by (path, mtime, size)
+_twin_file_hashes = {}
+
+
+def _nan_to_none(values):
+    return [None if np.isnan(value) else float(value) for value in values]
+
+
+def _none_to_nan(values):
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+def twin_file_hash(model_filepath: str):
+    """
+    Return the sha256 hex digest of the twin model file content. Digests are memoized per process as long as the
+    file modification time and size do not change.
+    """
+    model_filepath = os.path.abspath(model_filepath)
+    model_stat = os.stat(model_filepath)
+    hash_key = (model_filepath, model_stat.st_mtime_ns, model_stat.st_size)
+    file_hash = _twin_file_hashes.get(hash_key)
+    if file_hash is None:
+        sha256 = hashlib.sha256()
+        with open(model_filepath, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha256.update(block)
+        file_hash = sha256.hexdigest()
+        _twin_file_hashes[hash_key] = file_hash
+    return file_hash
+
+
+def runtime_fingerprint(twin_runtime_library_path: str = None):
+    """
+    Return a short fingerprint of the Twin Runtime SDK library (path, size and modification time). The runtime API
+    version can only be queried from an opened model, so the library file stands for the runtime version.
+    """
+    if twin_runtime_library_path is None:
+        twin_runtime_library_path = os.path.join(CUR_DIR, TwinRuntime.os_version, TwinRuntime.twin_runtime_library)
+    library_path = os.path.abspath(twin_runtime_library_path)
+    if os.path.exists(library_path):
+        library_stat = os.stat(library_path)
+        library_id = f"{library_path}|{library_stat.st_size}|{library_stat.st_mtime_ns}"
+    else:
+        library_id = library_path
+    return hashlib.sha256(library_id.encode()).hexdigest()[0:16]
+
+
+def twin_model_metadata_filepath(model_filepath: str, metadata_cache_dir: str):
+    """
+    Return the path of the metadata cache file of a twin model file in the given cache directory.
+    """
+    file_name = f"{twin_file_hash(model_filepath)}-{runtime_fingerprint()}{METADATA_FILE_EXT}"
+    return os.path.join(metadata_cache_dir, file_name)
+
+
+def query_twin_model_metadata(twin_runtime: TwinRuntime):
+    """
+    Query the metadata of an instantiated twin runtime: model name, runtime API version, variable names and
+    properties (including start values), default simulation settings and visualization resources.
+    """
+    var_properties = twin_runtime.twin_get_var_properties()
+    return {
+        "version": METADATA_FORMAT_VERSION,
+        "model_name": twin_runtime.twin_get_model_name(),
+        "api_version": twin_runtime.twin_get_api_version(),
+        "input_names": list(map(str, twin_runtime.twin_get_input_names())),
+        "output_names": list(map(str, twin_runtime.twin_get_output_names())),
+        "parameter_names": list(map(str, twin_runtime.twin_get_param_names())),
+        "default_simulation_settings": list(twin_runtime.twin_get_default_simulation_settings()),
+        "visualization_resources": twin_runtime.twin_get_visualization_resources(),
+        "var_properties": var_properties,
+    }
+
+
+def read_twin_model_metadata(model_filepath: str, metadata_cache_dir: str):
+    """
+    Read the cached metadata of a twin model file without opening the model. Return None if the cache directory has
+    no valid metadata for the current content of the file and the current runtime.
+
+    Parameters
+    ----------
+    model_filepath : str
+        File path to the twin model (with .twin) extension.
+    metadata_cache_dir : str
+        Directory holding the metadata cache files.
+
+    Returns
+    -------
+    metadata : dict
+        The twin model metadata (see get_twin_model_metadata), or None.
+    """
+    metadata_filepath = twin_model_metadata_filepath(model_filepath, metadata_cache_dir)
+    if not os.path.exists(metadata_filepath):
+        return None
+    try:
+        with open(metadata_filepath, "r") as f:
+            metadata = json.load(f)
+        if metadata["version"] != METADATA_FORMAT_VERSION:
+            return None
+        var_properties = metadata["var_properties"]
+        for column in ["Start", "Min", "Max"]:
+            var_properties[column] = _none_to_nan(var_properties[column])
+        return metadata
+    except (ValueError, KeyError, TypeError) as e:
+        get_pytwin_logger().warning(f"Ignoring corrupted twin model metadata file {metadata_filepath}: {e}")
+        return None
+
+
+def write_twin_model_metadata(model_filepath: str, metadata_cache_dir: str, metadata: dict):
+    """
+    Write the metadata of a twin model file into the cache directory (created if needed). The file is written under
+    a temporary name then renamed, so that concurrent readers never see a partial file.
+    """
+    os.makedirs(metadata_cache_dir, exist_ok=True)
+    metadata_filepath = twin_model_metadata_filepath(model_filepath, metadata_cache_dir)
+    metadata = dict(metadata)
+    var_properties = dict(metadata["var_properties"])
+    for column in ["Start", "Min", "Max"]:
+        var_properties[column] = _nan_to_none(var_properties[column])
+    metadata["var_properties"] = var_properties
+    temp_filepath = f"{metadata_filepath}.{uuid.uuid4().hex[0:8]}.tmp"
+    with open(temp_filepath, "w") as f:
+        json.dump(metadata, f, separators=(",", ":"))
+    os.replace(temp_filepath, metadata_filepath)
+    return metadata_filepath
+
+
+def get_twin_model_metadata(model_filepath: str, metadata_cache_dir: str = None):
+    """
+    Return the metadata of a twin model file. It is read from the cache directory if available there, otherwise the
+    model is opened to query it and the cache directory is updated.
+
+    Cache files are named after the sha256 hash of the twin model file content and a fingerprint of the Twin Runtime
+    library, so that a modified twin file or runtime never reuses stale metadata.
+
+    Parameters
+    ----------
+    model_filepath : str
+        File path to the twin model (with .twin) extension.
+    metadata_cache_dir : str, optional
+        Directory holding the metadata cache files. Metadata is not cached if None.
+
+    Returns
+    -------
+    metadata : dict
+        Dictionary with 'model_name', 'api_version', 'input_names', 'output_names', 'parameter_names',
+        'default_simulation_settings' (end time, step size and tolerance), 'visualization_resources' and
+        'var_properties' (see TwinRuntime.twin_get_var_properties) keys.
+
+    Examples
+    --------
+    >>> import glob
+    >>> from pytwin import get_twin_model_metadata
+    >>> for model_filepath in glob.glob('path_to_your_twin_models/*.twin'):
+    >>>     metadata = get_twin_model_metadata(model_filepath, metadata_cache_dir='path_to_your_cache_dir')
+    >>>     print(metadata['model_name'], metadata['input_names'], metadata['output_names'])
+    """
+    if not os.path.exists(model_filepath):
+        raise FileNotFoundError(f"File is not found at {model_filepath}")
+
+    if metadata_cache_dir is not None:
+        metadata = read_twin_model_metadata(model_filepath, metadata_cache_dir)
+        if metadata is not None:
+            return metadata
+
+    temp_dir = os.path.join(get_pytwin_working_dir(), PYTWIN_SETTINGS.TEMP_WD_NAME)
+    os.makedirs(temp_dir, exist_ok=True)
+    twin_runtime = TwinRuntime(
+        model_path=model_filepath,
+        log_path=os.path.join(temp_dir, f"metadata_{uuid.uuid4().hex[0:8]}.log"),
+        log_level=LogLevel.TWIN_NO_LOG,
+        load_model=True,
+    )
+    try:
+        twin_runtime.twin_instantiate()
+        metadata = query_twin_model_metadata(twin_runtime)
+    finally:
+        twin_runtime.twin_close()
+
+    if metadata_cache_dir is not None:
+        write_twin_model_metadata(model_filepath, metadata_cache_dir, metadata)
+    return metadata
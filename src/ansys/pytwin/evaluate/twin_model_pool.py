@@ -0,0 +1,347 @@
+import functools
+import multiprocessing
+import multiprocessing.pool
+import os
+import sys
+from typing import Callable, Iterable, Union
+
+import pandas as pd
+from pytwin.evaluate.model import Model
+from pytwin.evaluate.state_snapshot import StateSnapshot
+from pytwin.settings import PYTWIN_SETTINGS, _initialize_pool_worker_settings, _PyTwinSettings, get_pytwin_working_dir
+
+# Twin model instantiated once per pool worker process (see _initialize_worker)
+_worker_twin_model = None
+_worker_error = None
+
+
+class _WorkerPool(multiprocessing.pool.Pool):
+    """
+    Process pool whose worker processes are named after _PyTwinSettings.POOL_WORKER_NAME_PREFIX, so that pytwin
+    settings know they run in a TwinModelPool worker when pytwin is imported.
+    """
+
+    if sys.version_info >= (3, 8):
+
+        @staticmethod
+        def Process(ctx, *args, **kwds):
+            return _name_worker_process(ctx.Process(*args, **kwds))
+
+    else:
+
+        def Process(self, *args, **kwds):
+            return _name_worker_process(self._ctx.Process(*args, **kwds))
+
+
+def _name_worker_process(process):
+    process.name = f"{_PyTwinSettings.POOL_WORKER_NAME_PREFIX}:{process.name}"
+    return process
+
+
+def _initialize_worker(model_filepath: str, parent_working_dir: str, logging_option, logging_level):
+    """
+    Pool worker initializer. Apply the pytwin settings of the parent process, then instantiate the twin model once so
+    that evaluated cases skip instantiation. An error is stored rather than raised, otherwise the pool would endlessly
+    restart the failing worker.
+    """
+    global _worker_twin_model, _worker_error
+    from pytwin.evaluate.twin_model import TwinModel
+
+    try:
+        _initialize_pool_worker_settings(parent_working_dir, logging_option, logging_level)
+        _worker_twin_model = TwinModel(model_filepath)
+    except Exception as e:
+        _worker_error = e
+
+
+def _evaluate_case(case: dict, function: Callable = None):
+    """
+    Evaluate one case with the twin model of the current pool worker. Return the outputs dictionary after
+    initialization if the case has no 'inputs_df', otherwise return the batch evaluation outputs dataframe. If a
+    function is given, return function(twin_model, case) instead.
+    """
+    if _worker_error is not None:
+        raise _worker_error
+    if function is not None:
+        return function(_worker_twin_model, case)
+    return _worker_twin_model.evaluate_sweep_case(
+        parameters=case.get("parameters"),
+        inputs=case.get("inputs"),
+        inputs_df=case.get("inputs_df"),
+        tbrom_outputs=case.get("tbrom_outputs", False),
+    )
+
+
+def _evaluate_branch(branch: tuple):
+    """
+    Evaluate one what-if branch (snapshot, inputs_df) with the twin model of the current pool worker.
+    """
+    if _worker_error is not None:
+        raise _worker_error
+    snapshot, inputs_df = branch
+    return _worker_twin_model.evaluate_batch_from_snapshot(snapshot, inputs_df)
+
+
+def _evaluate_indexed_case(indexed_case: tuple):
+    index, case, function = indexed_case
+    return index, _evaluate_case(case, function)
+
+
+class TwinModelPool(Model):
+    """
+    The public class to evaluate many cases of the same twin model in parallel. It instantiates one twin model per
+    worker process (so that twin runtimes never share a process) when the pool is created, then distributes the cases
+    across the workers.
+
+    A case is a dictionary that may contain the following keys: 'parameters' and 'inputs' (dictionaries used to
+    initialize the evaluation, see TwinModel.initialize_evaluation), 'inputs_df' (dataframe used for a batch
+    evaluation, see TwinModel.evaluate_batch) and 'tbrom_outputs' (whether TBROM write their outputs, False by
+    default). Cases are evaluated with TwinModel.evaluate_sweep_case. The result of a case is the outputs dictionary
+    after initialization if it has no 'inputs_df', otherwise the batch evaluation outputs dataframe.
+
+    To evaluate cases differently, give a function to the evaluation methods: it is called with the worker twin model
+    and the case (which can then be any picklable object) and returns the result of the case. The function must be
+    picklable (defined at module level, or an instance of a class defined at module level).
+
+    Worker processes are started with the 'spawn' method. Scripts creating a pool must therefore protect their entry
+    point with an ``if __name__ == "__main__":`` block.
+
+    Parameters
+    ----------
+    model_filepath : str
+        File path to the twin model (with .twin) extension.
+    processes : int, optional
+        Number of worker processes. Default is the number of CPUs.
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> from pytwin import TwinModelPool
+    >>>
+    >>> inputs_df = pd.DataFrame({'Time': [0., 1., 2.], 'input1': [1., 2., 3.]})
+    >>> cases = [{'parameters': {'param1': value}, 'inputs_df': inputs_df} for value in [1., 2., 3., 4.]]
+    >>> with TwinModelPool(model_filepath='path_to_your_twin_model.twin', processes=2) as pool:
+    >>>     results = pool.evaluate(cases)
+    >>>     for case_index, outputs_df in pool.imap_unordered(cases):
+    >>>         print(case_index, outputs_df)
+    """
+
+    def __init__(self, model_filepath: str, processes: int = None):
+        super().__init__()
+        self._log_key = "TwinModelPool"
+        self._pool = None
+
+        if model_filepath is None or not os.path.exists(model_filepath):
+            msg = f"Provided twin model filepath: {model_filepath} does not exist!"
+            msg += "\nPlease provide existing filepath to initialize the TwinModelPool object."
+            self._raise_error(msg)
+        if processes is None:
+            processes = os.cpu_count()
+        if not isinstance(processes, int) or processes < 1:
+            msg = f"TwinModelPool cannot be created with {processes} processes!"
+            msg += "\nPlease provide a strictly positive number of processes."
+            self._raise_error(msg)
+
+        self._model_filepath = os.path.abspath(model_filepath)
+        self._model_name = os.path.splitext(os.path.basename(model_filepath))[0]
+        self._processes = processes
+        context = multiprocessing.get_context("spawn")
+        initargs = (
+            self._model_filepath,
+            get_pytwin_working_dir(),
+            PYTWIN_SETTINGS.LOGGING_OPTION,
+            PYTWIN_SETTINGS.loglevel,
+        )
+        self._pool = _WorkerPool(processes, initializer=_initialize_worker, initargs=initargs, context=context)
+        self._log_message(f"Twin model pool started with {processes} worker processes.")
+
+    def __del__(self):
+        """
+        Terminate worker processes when object is garbage collected.
+        """
+        if getattr(self, "_pool", None) is not None:
+            self._pool.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def _check_pool_is_open(self):
+        if self._pool is None:
+            self._raise_error("Twin model pool has been closed! Please create a new pool.")
+
+    def _raise_model_error(self, msg):
+        """
+        Redefinition of Model._raise_model_error(msg) method to raise a TwinModelPoolError.
+        """
+        raise TwinModelPoolError(msg)
+
+    @property
+    def model_filepath(self):
+        """Twin model file path evaluated by the pool."""
+        return self._model_filepath
+
+    @property
+    def processes(self):
+        """Number of worker processes."""
+        return self._processes
+
+    def close(self):
+        """
+        Close the pool once all submitted cases are evaluated and wait for the worker processes to exit.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+            self._log_message("Twin model pool closed.")
+
+    def terminate(self):
+        """
+        Stop the worker processes immediately, without waiting for submitted cases to be evaluated.
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+            self._log_message("Twin model pool terminated.")
+
+    def evaluate(self, cases: Iterable[dict], function: Callable = None):
+        """
+        Evaluate all cases and return their results in a list, in submission order.
+
+        Parameters
+        ----------
+        cases : Iterable[dict]
+            The cases to evaluate (see class documentation).
+        function : Callable, optional
+            Function called with the worker twin model and each case, returning the case result (see class
+            documentation). Default evaluates cases with TwinModel.evaluate_sweep_case.
+
+        Returns
+        -------
+        results : list
+            The result of each case (outputs dictionary or outputs dataframe).
+
+        Raises
+        ------
+        TwinModelPoolError:
+            If the pool has been closed.
+        """
+        return list(self.imap(cases, function=function))
+
+    def evaluate_branches(self, snapshot: StateSnapshot, inputs_dfs: Union[list, dict]):
+        """
+        Evaluate what-if branches starting from the same state in parallel. Each branch restores the snapshot in a
+        worker twin model and evaluates one input trajectory from there (see TwinModel.evaluate_batch_from_snapshot).
+
+        Parameters
+        ----------
+        snapshot : StateSnapshot
+            The common state of all branches, returned by TwinModel.save_snapshot.
+        inputs_dfs : list or dict
+            The input trajectory of each branch (pandas.DataFrame with a 'Time' column starting at the snapshot
+            evaluation time), given as a list or as a dictionary {branch_name: inputs_df}.
+
+        Returns
+        -------
+        output_df: pandas.DataFrame
+            The outputs of all branches stacked, with an outer 'Branch' index level holding the branch position (list)
+            or name (dictionary).
+
+        Raises
+        ------
+        TwinModelPoolError:
+            If the pool has been closed.
+
+        Examples
+        --------
+        >>> import pandas as pd
+        >>> from pytwin import TwinModel, TwinModelPool
+        >>>
+        >>> twin_model = TwinModel(model_filepath='path_to_your_twin_model.twin')
+        >>> twin_model.initialize_evaluation()
+        >>> twin_model.evaluate_step_by_step(step_size=1., inputs={'load': 100.})
+        >>> snapshot = twin_model.save_snapshot()
+        >>> branches = {f'load -{p}%': pd.DataFrame({'Time': [1., 2.], 'load': [100. - p] * 2}) for p in [10, 20, 30]}
+        >>> with TwinModelPool(model_filepath='path_to_your_twin_model.twin', processes=3) as pool:
+        >>>     outputs_df = pool.evaluate_branches(snapshot, branches)
+        >>> print(outputs_df.loc['load -20%'])
+        """
+        self._log_key = "EvaluateBranches"
+        self._check_pool_is_open()
+        if isinstance(inputs_dfs, dict):
+            branch_names = list(inputs_dfs.keys())
+            inputs_dfs = list(inputs_dfs.values())
+        else:
+            inputs_dfs = list(inputs_dfs)
+            branch_names = list(range(len(inputs_dfs)))
+        output_dfs = self._pool.map(_evaluate_branch, [(snapshot, inputs_df) for inputs_df in inputs_dfs], 1)
+        return pd.concat(output_dfs, keys=branch_names, names=["Branch", None])
+
+    def imap(self, cases: Iterable[dict], chunksize: int = 1, function: Callable = None):
+        """
+        Evaluate cases and yield their results in submission order.
+
+        Parameters
+        ----------
+        cases : Iterable[dict]
+            The cases to evaluate (see class documentation).
+        chunksize : int, optional
+            Number of cases sent to a worker at once. Larger values reduce communication overhead for many small cases.
+        function : Callable, optional
+            Function called with the worker twin model and each case, returning the case result (see class
+            documentation). Default evaluates cases with TwinModel.evaluate_sweep_case.
+
+        Returns
+        -------
+        results : Iterator
+            The result of each case (outputs dictionary or outputs dataframe), in submission order.
+
+        Raises
+        ------
+        TwinModelPoolError:
+            If the pool has been closed.
+        """
+        self._log_key = "Imap"
+        self._check_pool_is_open()
+        return self._pool.imap(functools.partial(_evaluate_case, function=function), cases, chunksize)
+
+    def imap_unordered(self, cases: Iterable[dict], chunksize: int = 1, function: Callable = None):
+        """
+        Evaluate cases and yield their results as soon as they are available.
+
+        Parameters
+        ----------
+        cases : Iterable[dict]
+            The cases to evaluate (see class documentation).
+        chunksize : int, optional
+            Number of cases sent to a worker at once. Larger values reduce communication overhead for many small cases.
+        function : Callable, optional
+            Function called with the worker twin model and each case, returning the case result (see class
+            documentation). Default evaluates cases with TwinModel.evaluate_sweep_case.
+
+        Returns
+        -------
+        results : Iterator
+            Tuples (case_index, result) in completion order, case_index being the position of the case in cases.
+
+        Raises
+        ------
+        TwinModelPoolError:
+            If the pool has been closed.
+        """
+        self._log_key = "ImapUnordered"
+        self._check_pool_is_open()
+        indexed_cases = ((index, case, function) for index, case in enumerate(cases))
+        return self._pool.imap_unordered(_evaluate_indexed_case, indexed_cases, chunksize)
+
+
+class TwinModelPoolError(Exception):
+    def __str__(self):
+        return f"[TwinModelPoolError] {self.args[0]}"
@@ -15,6 +15,7 @@ from typing import Optional
 import urllib.request
 import zipfile
 
+import numpy as np
 import pandas as pd
 
 temp_folder = tempfile.gettempdir()
@@ -144,45 +145,59 @@ def download_file(
     return _download_file(file_name, directory, destination)
 
 
-def load_data(inputs: str):
+def _clean_column_names(column_names: list):
+    """Clean CSV header names exported from Twin Builder: the name is the last word after the "." in each column."""
+    return [
+        name.replace('"', "").replace(" ", "").replace("]", "").replace("[", "").split(".", 1)[-1]
+        for name in column_names
+    ]
+
+
+def _read_csv_header(inputs: str):
+    """Read and clean the header (first row) of a CSV file, without reading its body."""
+    with open(inputs, newline="") as f:
+        return _clean_column_names(next(csv.reader(f, skipinitialspace=True)))
+
+
+def load_data(inputs: str, chunksize: int = None, engine: str = "c"):
     """
     Load a CSV input file into a Pandas Dataframe.
 
+    The header is read once (and cleaned if exported from Twin builder), then the body is parsed with the C engine
+    directly into float64 values, so that the dataframe can be given to batch evaluation without any conversion. Large
+    files can be read by chunks of rows.
+
     Parameters
     ----------
     inputs : str
         Path of the CSV file to be loaded, containing the Time column and all the Twin inputs data.
+    chunksize : int, optional
+        If given, return an iterator of dataframes of (at most) chunksize rows instead of a single dataframe.
+    engine : str, optional
+        CSV parser engine ('c', 'pyarrow' or 'python'). Default is 'c'. The multithreaded 'pyarrow' engine is faster
+        on large files but requires pyarrow and pandas>=1.4, and does not support chunksize.
 
     Returns
     -------
     inputs_df: pandas.DataFrame
-        A ``pandas.DataFrame`` storing time values as well as all the corresponding input data.
+        A ``pandas.DataFrame`` storing time values as well as all the corresponding input data. An iterator of
+        ``pandas.DataFrame`` is returned if chunksize is given.
 
     Examples
     --------
     >>> from pytwin import load_data, download_file
     >>> csv_input = download_file("CoupledClutches_input.csv", "twin_input_files")
     >>> twin_model_input_df = load_data(csv_input)
+    >>> for chunk_df in load_data(csv_input, chunksize=100000):
+    ...     print(chunk_df.shape)
     """
-
-    # Clean CSV headers if exported from Twin builder
-    def clean_column_names(column_names):
-        for name_index in range(len(column_names)):
-            clean_header = column_names[name_index].replace('"', "").replace(" ", "").replace("]", "").replace("[", "")
-            name_components = clean_header.split(".", 1)
-            # The column name should match the last word after the "." in each column
-            column_names[name_index] = name_components[-1]
-
-        return column_names
-
-    # #### Data loading (into Pandas DataFrame) and pre-processing ###### #
-    # C engine can't read rows with quotes, reading just the first row
-    input_header_df = pd.read_csv(inputs, header=None, nrows=1, sep=r",\s+", engine="python", quoting=csv.QUOTE_ALL)
-
-    # Reading all values from the csv but skipping the first row
-    inputs_df = pd.read_csv(inputs, header=None, skiprows=1)
-    inputs_header_values = input_header_df.iloc[0][0].split(",")
-    clean_column_names(inputs_header_values)
-    inputs_df.columns = inputs_header_values
-
-    return inputs_df
+    column_names = _read_csv_header(inputs)
+    return pd.read_csv(
+        inputs,
+        header=None,
+        skiprows=1,
+        names=column_names,
+        dtype=np.float64,
+        engine=engine,
+        chunksize=chunksize,
+    )
@@ -1,5 +1,6 @@
 from enum import Enum
 import logging
+import multiprocessing
 import os
 import shutil
 import sys
@@ -214,6 +215,37 @@ def get_pytwin_working_dir():
     return PYTWIN_SETTINGS.working_dir
 
 
+def _is_pool_worker_process():
+    """
+    Return True in TwinModelPool worker processes (their name is set before pytwin is imported by the worker).
+    """
+    return multiprocessing.current_process().name.startswith(_PyTwinSettings.POOL_WORKER_NAME_PREFIX)
+
+
+def _initialize_pool_worker_settings(parent_working_dir: str, logging_option: PyTwinLogOption, logging_level):
+    """
+    Initialize the settings of a TwinModelPool worker process from the settings of its parent process. The worker
+    working directory is a subdirectory of the parent one (so that it is cleaned with it) and the temporary working
+    directory created when the worker imported pytwin is removed.
+    """
+    import_working_dir = _PyTwinSettings.WORKING_DIRECTORY_PATH
+    pytwin_logger = logging.getLogger(_PyTwinSettings.LOGGER_NAME)
+    for handler in pytwin_logger.handlers:
+        handler.close()
+    pytwin_logger.handlers.clear()
+
+    worker_working_dir = os.path.join(parent_working_dir, _PyTwinSettings.POOL_WORKERS_DIRECTORY_NAME, str(os.getpid()))
+    if os.path.exists(worker_working_dir):
+        shutil.rmtree(worker_working_dir)
+    os.makedirs(worker_working_dir)
+    _PyTwinSettings.WORKING_DIRECTORY_PATH = worker_working_dir
+    _PyTwinSettings.LOGGING_OPTION = None
+    _PyTwinSettings.LOGGING_LEVEL = logging_level
+    _PyTwinSettings.modify_logging(new_option=logging_option, new_level=None)
+    if import_working_dir is not None and os.path.basename(os.path.dirname(import_working_dir)) == str(os.getpid()):
+        shutil.rmtree(os.path.dirname(import_working_dir), ignore_errors=True)
+
+
 def reinit_settings_for_unit_tests():
     # Mutable attributes init
     _PyTwinSettings.LOGGING_OPTION = None
@@ -242,6 +274,8 @@ class _PyTwinSettings(object):
     LOGGING_FILE_NAME = "pytwin.log"
     WORKING_DIRECTORY_NAME = "pytwin"
     TEMP_WD_NAME = ".temp"
+    POOL_WORKER_NAME_PREFIX = "PyTwinPoolWorker"
+    POOL_WORKERS_DIRECTORY_NAME = "pool_workers"
 
     @property
     def logfile(self):
@@ -328,8 +362,9 @@ class _PyTwinSettings(object):
         """
         Default working directory settings.
         """
-        # Clean pytwin temporary directory, each time pytwin is imported.
-        if _PyTwinSettings.MULTI_PROCESS_IS_ENABLED:
+        # Clean pytwin temporary directory, each time pytwin is imported. TwinModelPool workers use their own directory
+        # so that they do not erase the working directory of their parent process.
+        if _PyTwinSettings.MULTI_PROCESS_IS_ENABLED or _is_pool_worker_process():
             pytwin_temp_dir = os.path.join(
                 tempfile.gettempdir(), str(os.getpid()), _PyTwinSettings.WORKING_DIRECTORY_NAME
             )
@@ -346,7 +381,7 @@ class _PyTwinSettings(object):
                 logging.warning(f"_PyTwinSettings failed to clear working dir (attempt #{i})! \n {str(e)}")
                 time.sleep(1)
 
-        os.mkdir(pytwin_temp_dir)
+        os.makedirs(pytwin_temp_dir)
         _PyTwinSettings.WORKING_DIRECTORY_PATH = pytwin_temp_dir
 
     @staticmethod
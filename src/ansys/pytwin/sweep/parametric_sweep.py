@@ -0,0 +1,379 @@
+import hashlib
+import itertools
+import json
+import os
+from typing import Callable, Union
+
+import numpy as np
+import pandas as pd
+from pytwin import get_pytwin_logger
+from pytwin.evaluate.twin_model import TwinModel
+from pytwin.evaluate.twin_model_metadata import twin_file_hash
+from pytwin.evaluate.twin_model_pool import TwinModelPool
+
+SWEEP_MODES = ["batch", "step_by_step"]
+
+
+def full_factorial(grid: dict):
+    """
+    Return the cases of a full factorial design: all combinations of the given parameter values.
+
+    Parameters
+    ----------
+    grid : dict
+        Dictionary {parameter_name: list of values}.
+
+    Returns
+    -------
+    cases : pandas.DataFrame
+        One column per parameter and one row per case.
+
+    Examples
+    --------
+    >>> from pytwin import full_factorial
+    >>> cases = full_factorial({'param1': [1., 2., 3.], 'param2': [10., 20.]})
+    >>> len(cases)
+    6
+    """
+    names = list(grid)
+    return pd.DataFrame(list(itertools.product(*[list(grid[name]) for name in names])), columns=names)
+
+
+def latin_hypercube(bounds: dict, sample_count: int, seed: int = None):
+    """
+    Return the cases of a Latin hypercube design: each parameter range is split into sample_count intervals of
+    same width, and each interval is sampled exactly once per parameter.
+
+    Parameters
+    ----------
+    bounds : dict
+        Dictionary {parameter_name: (lower_bound, upper_bound)}.
+    sample_count : int
+        Number of cases.
+    seed : int, optional
+        Seed of the random generator, for reproducible designs.
+
+    Returns
+    -------
+    cases : pandas.DataFrame
+        One column per parameter and one row per case.
+
+    Examples
+    --------
+    >>> from pytwin import latin_hypercube
+    >>> cases = latin_hypercube({'param1': (0., 1.), 'param2': (10., 20.)}, sample_count=100, seed=0)
+    """
+    if sample_count < 1:
+        raise ParametricSweepError(f"Sample count must be strictly positive ({sample_count} was provided)!")
+    rng = np.random.default_rng(seed)
+    columns = dict()
+    for name, (lower_bound, upper_bound) in bounds.items():
+        unit_samples = (rng.permutation(sample_count) + rng.random(sample_count)) / sample_count
+        columns[name] = lower_bound + unit_samples * (upper_bound - lower_bound)
+    return pd.DataFrame(columns)
+
+
+def _evaluate_step_by_step(twin_model, parameters: dict, inputs: dict, inputs_df: pd.DataFrame):
+    """
+    Evaluate the twin model step by step over the rows of inputs_df and return the outputs dataframe.
+    """
+    twin_model.evaluate_sweep_case(parameters=parameters, inputs=inputs)
+    input_columns = [name for name in inputs_df.columns if name in twin_model.input_names]
+    input_indices = [twin_model.input_names.index(name) for name in input_columns]
+    input_values = inputs_df[input_columns].to_numpy(dtype=np.float64)
+    times = inputs_df["Time"].to_numpy(dtype=np.float64)
+    input_array = np.array(list(twin_model.inputs.values()), dtype=np.float64)
+    output_array = np.empty((len(times), len(twin_model.output_names)))
+    output_array[0] = list(twin_model.outputs.values())
+    for k in range(1, len(times)):
+        input_array[input_indices] = input_values[k - 1]
+        twin_model.evaluate_step_by_step_array(times[k] - times[k - 1], input_array, output_array[k])
+    outputs_df = pd.DataFrame(output_array, columns=twin_model.output_names)
+    outputs_df.insert(0, "Time", times)
+    return outputs_df
+
+
+class _SweepCaseEvaluator:
+    """
+    Per-case function of the TwinModelPool running a sweep: evaluate the parameters of one case with a twin model and
+    return its KPIs, its outputs trajectory (if requested) and the output names.
+    """
+
+    def __init__(self, settings: dict):
+        self._settings = settings
+
+    def __call__(self, twin_model, parameters: dict):
+        settings = self._settings
+        inputs_df = settings["inputs_df"]
+        inputs = dict(settings["inputs"] or {})
+        if inputs_df is None:
+            outputs = twin_model.evaluate_sweep_case(parameters=parameters, inputs=inputs)
+            outputs_df = pd.DataFrame({"Time": [0.0], **{name: [value] for name, value in outputs.items()}})
+        else:
+            inputs.update({name: value for name, value in inputs_df.iloc[0].items() if name != "Time"})
+            if settings["mode"] == "batch":
+                outputs_df = twin_model.evaluate_sweep_case(parameters=parameters, inputs=inputs, inputs_df=inputs_df)
+            else:
+                outputs_df = _evaluate_step_by_step(twin_model, parameters, inputs, inputs_df)
+
+        kpis = settings["kpis"]
+        if kpis is None:
+            kpi_values = {name: float(outputs_df[name].iloc[-1]) for name in twin_model.output_names}
+        else:
+            kpi_values = {name: float(kpi(outputs_df)) for name, kpi in kpis.items()}
+        trajectory = None
+        if settings["keep_trajectories"]:
+            trajectory = outputs_df[twin_model.output_names].to_numpy(dtype=np.float64).tolist()
+        return kpi_values, trajectory, twin_model.output_names
+
+
+class SweepResult:
+    """
+    Result of a parametric sweep: the KPIs of each case gathered in a columnar table and, if requested, the outputs
+    trajectory of each case gathered in one array.
+    """
+
+    def __init__(self, cases: pd.DataFrame, kpis: pd.DataFrame, output_names: list, trajectories: np.ndarray = None):
+        self.cases = cases
+        self.kpis = kpis
+        self.output_names = output_names
+        self.trajectories = trajectories
+
+    def to_dataframe(self):
+        """
+        Return a dataframe with the parameters and the KPIs of each case (one row per case).
+        """
+        return pd.concat([self.cases, self.kpis], axis=1)
+
+    def to_parquet(self, parquet_filepath: str):
+        """
+        Write the parameters and the KPIs of each case into a Parquet file (requires pyarrow or fastparquet).
+        """
+        self.to_dataframe().to_parquet(parquet_filepath)
+        return parquet_filepath
+
+
+class ParametricSweep:
+    """
+    Design-of-experiments engine evaluating a twin model for many parameter cases (see full_factorial, latin_hypercube,
+    or any dataframe with one column per parameter). Each case is initialized with its parameters, then evaluated in
+    batch mode or step by step over a shared input trajectory. Scalar KPIs and, optionally, full outputs trajectories
+    are gathered into one columnar result.
+
+    Cases are evaluated by the worker processes of a TwinModelPool (see TwinModel.evaluate_sweep_case). With a
+    checkpoint file, each finished case is appended to it (JSON lines) so that a sweep that is stopped can be resumed
+    by running the same sweep again with the same checkpoint file: finished cases are not evaluated again.
+
+    Scripts running a sweep with several processes must protect their entry point with an
+    ``if __name__ == "__main__":`` block.
+
+    Parameters
+    ----------
+    model_filepath : str
+        File path to the twin model (with .twin) extension.
+    cases : pandas.DataFrame or dict
+        Parameter values of each case, with one column (or key) per parameter and one row per case.
+    inputs_df : pandas.DataFrame, optional
+        Shared input trajectory, with a 'Time' column. If None, cases are only initialized.
+    inputs : dict, optional
+        Input values used for initialization, for inputs that are not in inputs_df.
+    mode : str, optional
+        'batch' (default) to evaluate cases with TwinModel.evaluate_batch, or 'step_by_step' to evaluate them step by
+        step over the rows of inputs_df.
+    kpis : dict, optional
+        Dictionary {kpi_name: function} of KPIs computed from the outputs dataframe of each case (with a 'Time' column
+        and one column per output). Functions must be picklable (defined at module level). Default is the final value of
+        each output.
+    keep_trajectories : bool, optional
+        Whether to keep the outputs trajectory of each case. Default is False.
+    processes : int, optional
+        Number of worker processes. Default is 1 (cases are evaluated in the current process).
+    checkpoint_filepath : str, optional
+        File path to the JSON lines checkpoint file.
+
+    Examples
+    --------
+    >>> import pandas as pd
+    >>> from pytwin import ParametricSweep, latin_hypercube
+    >>>
+    >>> def max_torque(outputs_df):
+    >>>     return outputs_df['Clutch1_torque'].max()
+    >>>
+    >>> if __name__ == "__main__":
+    >>>     cases = latin_hypercube({'param1': (1., 2.), 'param2': (0., 10.)}, sample_count=1000, seed=0)
+    >>>     inputs_df = pd.DataFrame({'Time': [0., 0.5, 1.], 'Clutch1_in': [0., 1., 1.]})
+    >>>     sweep = ParametricSweep('model.twin', cases, inputs_df=inputs_df, kpis={'max_torque': max_torque},
+    >>>                             processes=4, checkpoint_filepath='sweep.jsonl')
+    >>>     result = sweep.run()
+    >>>     result.to_parquet('sweep.parquet')
+    """
+
+    def __init__(
+        self,
+        model_filepath: str,
+        cases: Union[pd.DataFrame, dict],
+        inputs_df: pd.DataFrame = None,
+        inputs: dict = None,
+        mode: str = "batch",
+        kpis: dict = None,
+        keep_trajectories: bool = False,
+        processes: int = 1,
+        checkpoint_filepath: str = None,
+    ):
+        if model_filepath is None or not os.path.exists(model_filepath):
+            self._raise_error(f"Provided twin model filepath: {model_filepath} does not exist!")
+        if mode not in SWEEP_MODES:
+            self._raise_error(f"Unknown sweep mode {mode}! Please choose among {SWEEP_MODES}.")
+        if mode == "step_by_step" and inputs_df is None:
+            self._raise_error("Step by step sweeps need an input trajectory (inputs_df)!")
+        if inputs_df is not None and "Time" not in inputs_df:
+            self._raise_error("The input trajectory (inputs_df) must have a 'Time' column!")
+        if not isinstance(processes, int) or processes < 1:
+            self._raise_error(f"Sweep cannot be run with {processes} processes!")
+        self._model_filepath = os.path.abspath(model_filepath)
+        self._cases = pd.DataFrame(cases).reset_index(drop=True)
+        self._processes = processes
+        self._checkpoint_filepath = checkpoint_filepath
+        self._settings = {
+            "inputs_df": inputs_df,
+            "inputs": inputs,
+            "mode": mode,
+            "kpis": kpis,
+            "keep_trajectories": keep_trajectories,
+        }
+
+    @staticmethod
+    def _raise_error(msg):
+        logger = get_pytwin_logger()
+        logger.error(msg)
+        raise ParametricSweepError(msg)
+
+    @property
+    def cases(self):
+        """Parameter values of each case."""
+        return self._cases
+
+    @property
+    def signature(self):
+        """
+        Hash of the sweep definition (twin model file, cases, input trajectory and evaluation settings), stored in the
+        checkpoint file to prevent resuming another sweep.
+        """
+        sha256 = hashlib.sha256()
+        sha256.update(twin_file_hash(self._model_filepath).encode())
+        sha256.update(self._cases.to_json(orient="split", double_precision=15).encode())
+        inputs_df = self._settings["inputs_df"]
+        if inputs_df is not None:
+            sha256.update(inputs_df.to_json(orient="split", double_precision=15).encode())
+        settings = [self._settings["inputs"], self._settings["mode"], self._settings["keep_trajectories"]]
+        settings.append(None if self._settings["kpis"] is None else sorted(self._settings["kpis"]))
+        sha256.update(json.dumps(settings, sort_keys=True).encode())
+        return sha256.hexdigest()
+
+    def _read_checkpoint(self):
+        """
+        Return the results {case_index: (kpis, trajectory)} and the output names stored in the checkpoint file, if any,
+        and the size of its complete lines (in bytes).
+        """
+        results = dict()
+        output_names = None
+        checkpoint_size = 0
+        if self._checkpoint_filepath is None or not os.path.exists(self._checkpoint_filepath):
+            return results, output_names, checkpoint_size
+        with open(self._checkpoint_filepath, "rb") as fp:
+            for line_number, line in enumerate(fp):
+                if not line.endswith(b"\n"):
+                    # Last line was being written when the sweep was stopped
+                    break
+                record = json.loads(line.decode("utf-8"))
+                checkpoint_size += len(line)
+                if line_number == 0:
+                    if record.get("signature") != self.signature:
+                        msg = f"Checkpoint file {self._checkpoint_filepath} was written by another sweep!"
+                        msg += "\nPlease use another checkpoint file or remove it."
+                        self._raise_error(msg)
+                    continue
+                if "output_names" in record:
+                    output_names = record["output_names"]
+                    continue
+                results[record["case"]] = (record["kpis"], record.get("trajectory"))
+        return results, output_names, checkpoint_size
+
+    def _open_checkpoint(self, checkpoint_size: int):
+        """
+        Open the checkpoint file for appending, after removing the line that was being written when the sweep was
+        stopped (if any), and write the sweep signature if the file has no complete line.
+        """
+        if os.path.exists(self._checkpoint_filepath):
+            os.truncate(self._checkpoint_filepath, checkpoint_size)
+        checkpoint = open(self._checkpoint_filepath, "ab")
+        if checkpoint_size == 0:
+            checkpoint.write((json.dumps({"signature": self.signature}) + "\n").encode("utf-8"))
+        return checkpoint
+
+    def _iterate_results(self, case_indices: list):
+        """
+        Evaluate the given cases and yield tuples (case_index, (kpis, trajectory, output_names)) in completion order.
+        """
+        evaluator = _SweepCaseEvaluator(self._settings)
+        parameter_records = self._cases.iloc[case_indices].to_dict(orient="records")
+        if self._processes == 1:
+            twin_model = TwinModel(self._model_filepath)
+            for case_index, parameters in zip(case_indices, parameter_records):
+                yield case_index, evaluator(twin_model, parameters)
+        else:
+            with TwinModelPool(self._model_filepath, processes=self._processes) as pool:
+                for position, result in pool.imap_unordered(parameter_records, function=evaluator):
+                    yield case_indices[position], result
+
+    def run(self, progress: Callable = None):
+        """
+        Evaluate the cases that are not in the checkpoint file yet and return the result of all cases.
+
+        Parameters
+        ----------
+        progress : Callable, optional
+            Function called with (finished_case_count, case_count) each time a case is finished.
+
+        Returns
+        -------
+        result : SweepResult
+            KPIs (and trajectories) of all cases, in case order.
+        """
+        results, output_names, checkpoint_size = self._read_checkpoint()
+        case_count = len(self._cases)
+        case_indices = [i for i in range(case_count) if i not in results]
+        get_pytwin_logger().info(f"[ParametricSweep] {len(case_indices)} cases to evaluate ({len(results)} resumed).")
+
+        checkpoint = None
+        if self._checkpoint_filepath is not None:
+            checkpoint = self._open_checkpoint(checkpoint_size)
+        try:
+            for case_index, (kpi_values, trajectory, case_output_names) in self._iterate_results(case_indices):
+                results[case_index] = (kpi_values, trajectory)
+                records = [{"case": case_index, "kpis": kpi_values}]
+                if trajectory is not None:
+                    records[0]["trajectory"] = trajectory
+                if output_names is None:
+                    output_names = case_output_names
+                    records.insert(0, {"output_names": output_names})
+                if checkpoint is not None:
+                    for record in records:
+                        checkpoint.write((json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8"))
+                    checkpoint.flush()
+                if progress is not None:
+                    progress(len(results), case_count)
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
+        kpis = pd.DataFrame([results[i][0] for i in range(case_count)], index=self._cases.index)
+        trajectories = None
+        if self._settings["keep_trajectories"]:
+            trajectories = np.array([results[i][1] for i in range(case_count)], dtype=np.float64)
+        return SweepResult(self._cases, kpis, output_names, trajectories)
+
+
+class ParametricSweepError(Exception):
+    def __str__(self):
+        return f"[ParametricSweepError] {self.args[0]}"
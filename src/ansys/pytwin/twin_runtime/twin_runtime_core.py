@@ -5,6 +5,7 @@ import json
 import sys
 import math
 import platform
+import threading
 from pathlib import Path
 from ctypes import*
 
@@ -19,6 +20,70 @@ CUR_DIR = getattr(sys, '_MEIPASS', os.path.abspath(os.path.dirname(__file__)))
 os.environ['TWIN_RUNTIME_SDK'] = CUR_DIR
 default_log_name = "model.log"
 
+# Prototypes of the SDK functions as (restype, argtypes). None keeps the ctypes default. They are bound once per loaded
+# library since the function pointers are shared by all TwinRuntime instances using the same library.
+_PROTOTYPES = {
+    'TwinOpen': (c_int, None),
+    'TwinClose': (None, None),
+    'TwinReset': (c_int, None),
+    'TwinGetStatusString': (c_char_p, [c_void_p]),
+    'TwinGetModelName': (c_char_p, None),
+    'TwinGetAPIVersion': (c_char_p, None),
+    'TwinGetNumParameters': (c_int, None),
+    'TwinGetNumInputs': (c_int, None),
+    'TwinGetNumOutputs': (c_int, None),
+    'TwinGetParamNames': (c_int, [c_void_p, POINTER(c_char_p), c_int]),
+    'TwinGetInputNames': (c_int, [c_void_p, POINTER(c_char_p), c_int]),
+    'TwinGetOutputNames': (c_int, [c_void_p, POINTER(c_char_p), c_int]),
+    'TwinInstantiate': (c_int, [c_void_p]),
+    'TwinInitialize': (c_int, [c_void_p]),
+    'TwinSetParamByName': (c_int, [c_void_p, c_char_p, c_double]),
+    'TwinSetStrParamByName': (c_int, [c_void_p, c_char_p, c_char_p]),
+    'TwinSetParamByIndex': (c_int, [c_void_p, c_int, c_double]),
+    'TwinGetOutputs': (c_int, [c_void_p, POINTER(c_double), c_int]),
+    'TwinSimulate': (c_int, [c_void_p, c_double, c_double]),
+    'TwinSimulateBatchMode': (c_int, None),
+    'TwinSimulateBatchModeCSV': (c_int, None),
+    'TwinSetInputs': (c_int, [c_void_p, POINTER(c_double), c_int]),
+    'TwinSetInputByName': (c_int, [c_void_p, c_char_p, c_double]),
+    'TwinSetInputByIndex': (c_int, [c_void_p, c_int, c_double]),
+    'TwinGetOutputByName': (c_int, None),
+    'TwinGetOutputByIndex': (c_int, None),
+    'TwinGetDefaultSimulationSettings': (c_int, None),
+    'TwinGetVarDataType': (c_int, None),
+    'TwinGetVarUnit': (c_int, None),
+    'TwinGetVarStart': (c_int, None),
+    'TwinGetStrVarStart': (c_int, None),
+    'TwinGetVarMin': (c_int, None),
+    'TwinGetVarMax': (c_int, None),
+    'TwinGetVarNominal': (c_int, None),
+    'TwinGetVarQuantityType': (c_int, None),
+    'TwinGetVarDescription': (c_int, None),
+    'TwinGetVisualizationResources': (c_int, None),
+    'TwinEnableROMImages': (c_int, None),
+    'TwinDisableROMImages': (c_int, None),
+    'TwinEnable3DROMData': (c_int, None),
+    'TwinDisable3DROMData': (c_int, None),
+    'TwinGetRomImageFiles': (c_int, None),
+    'TwinGetNumRomImageFiles': (c_int, None),
+    'TwinGetRomModeCoefFiles': (c_int, None),
+    'TwinGetNumRomModeCoefFiles': (c_int, None),
+    'TwinGetRomSnapshotFiles': (c_int, None),
+    'TwinGetNumRomSnapshotFiles': (c_int, None),
+    'TwinGetDefaultROMImageDirectory': (c_int, [c_void_p, c_char_p, POINTER(c_char_p)]),
+    'TwinGetRomResourcePath': (c_int, [c_void_p, c_char_p, POINTER(c_char_p)]),
+    'TwinSetROMImageDirectory': (c_int, [c_void_p, c_char_p, c_char_p]),
+    'TwinSaveState': (c_int, [c_void_p]),
+    'TwinLoadState': (c_int, [c_void_p]),
+    'IsTwinCrossPlatform': (None, [c_char_p, POINTER(c_bool)]),
+    'TwinGetVersion': (None, [c_char_p, POINTER(c_bool), POINTER(c_char_p)]),
+    'TwinGetModelDependencies': (None, [c_char_p, POINTER(c_char_p)]),
+}
+
+# Process-wide cache of the loaded SDK libraries, keyed by absolute library path
+_twin_runtime_libraries = {}
+_twin_runtime_libraries_lock = threading.Lock()
+
 
 class TwinStatus(Enum):
     TWIN_STATUS_OK = 0
@@ -51,6 +116,15 @@ class TwinRuntime:
     parameter_names = None
     os_version = None
 
+    # Variable properties of all the model variables, shared by all instances and keyed by model file
+    _var_properties_cache = {}
+    var_properties_columns = ['Name', 'Unit', 'Type', 'Start', 'Min', 'Max', 'Description']
+
+    _inputs_buffer = None
+    _inputs_buffer_ptr = None
+    _outputs_buffer = None
+    _outputs_buffer_ptr = None
+
     if platform.system() == 'Windows':
         twin_runtime_library = 'TwinRuntimeSDK.dll'
         os_version = 'win64'
@@ -58,24 +132,51 @@ class TwinRuntime:
         twin_runtime_library = 'libTwinRuntimeSDK.so'
         os_version = 'linux64'
 
-    @staticmethod    
+    @staticmethod
     def load_dll(twin_runtime_library_path=None):
+        """
+        Load the Twin Runtime SDK library, or return it from the process-wide cache if it is already loaded. The PATH
+        environment variable is updated and the function prototypes are bound only the first time a library is loaded.
+        """
 
         def _setup_env(sdk_folder_path):
             if platform.system() == 'Windows':
                 sep = ';'
             else:
                 sep = ':'
-            if sdk_folder_path not in os.environ['PATH']: 
+            if sdk_folder_path not in os.environ['PATH']:
                 os.environ['PATH'] = '{}{}{}'.format(sdk_folder_path, sep, os.environ['PATH'])
 
         if twin_runtime_library_path is None:
-            folder = os.path.join(CUR_DIR, TwinRuntime.os_version)
-            _setup_env(sdk_folder_path=folder)
-            return cdll.LoadLibrary(os.path.join(folder, TwinRuntime.twin_runtime_library))
-        else:
-            _setup_env(sdk_folder_path=os.path.dirname(twin_runtime_library_path))
-            return cdll.LoadLibrary(twin_runtime_library_path)
+            twin_runtime_library_path = os.path.join(CUR_DIR, TwinRuntime.os_version,
+                                                     TwinRuntime.twin_runtime_library)
+        library_path = os.path.abspath(twin_runtime_library_path)
+
+        twin_runtime_library = _twin_runtime_libraries.get(library_path)
+        if twin_runtime_library is not None:
+            return twin_runtime_library
+
+        with _twin_runtime_libraries_lock:
+            twin_runtime_library = _twin_runtime_libraries.get(library_path)
+            if twin_runtime_library is None:
+                _setup_env(sdk_folder_path=os.path.dirname(library_path))
+                twin_runtime_library = cdll.LoadLibrary(library_path)
+                TwinRuntime._bind_prototypes(twin_runtime_library)
+                _twin_runtime_libraries[library_path] = twin_runtime_library
+        return twin_runtime_library
+
+    @staticmethod
+    def _bind_prototypes(twin_runtime_library):
+        for function_name, (restype, argtypes) in _PROTOTYPES.items():
+            try:
+                function = getattr(twin_runtime_library, function_name)
+            except AttributeError:
+                # Symbol not exported by this library version, an error is raised when it is used
+                continue
+            if restype is not None:
+                function.restype = restype
+            if argtypes is not None:
+                function.argtypes = argtypes
 
     @staticmethod
     def twin_is_cross_platform(file_path):
@@ -179,172 +280,57 @@ class TwinRuntime:
         self._modelPointer = c_void_p()
 
         self._TwinOpen = self._twin_runtime_library.TwinOpen
-        self._TwinOpen.restype = c_int
-
         self._TwinClose = self._twin_runtime_library.TwinClose
-
         self._TwinReset = self._twin_runtime_library.TwinReset
-        self._TwinReset.restype = c_int
-
         self.TwinGetStatusString = self._twin_runtime_library.TwinGetStatusString
-        self.TwinGetStatusString.argtypes = [c_void_p]
-        self.TwinGetStatusString.restype = c_char_p
-
         self._TwinGetModelName = self._twin_runtime_library.TwinGetModelName
-        self._TwinGetModelName.restype = c_char_p
-
         self._TwinGetAPIVersion = self._twin_runtime_library.TwinGetAPIVersion
-        self._TwinGetAPIVersion.restype = c_char_p
-
         self._TwinGetNumParameters = self._twin_runtime_library.TwinGetNumParameters
-        self._TwinGetNumParameters.restype = c_int
-
         self._TwinGetNumInputs = self._twin_runtime_library.TwinGetNumInputs
-        self._TwinGetNumInputs.restype = c_int
-
         self._TwinGetNumOutputs = self._twin_runtime_library.TwinGetNumOutputs
-        self._TwinGetNumOutputs.restype = c_int
-
         self._TwinGetParamNames = self._twin_runtime_library.TwinGetParamNames
-        self._TwinGetParamNames.restype = c_int
-
         self._TwinGetInputNames = self._twin_runtime_library.TwinGetInputNames
-        self._TwinGetInputNames.restype = c_int
-
         self._TwinGetOutputNames = self._twin_runtime_library.TwinGetOutputNames
-        self._TwinGetOutputNames.restype = c_int
-
         self._TwinInstantiate = self._twin_runtime_library.TwinInstantiate
-        self._TwinInstantiate.argtypes = [c_void_p]
-        self._TwinInstantiate.restype = c_int
-
         self._TwinInitialize = self._twin_runtime_library.TwinInitialize
-        self._TwinInitialize.argtypes = [c_void_p]
-        self._TwinInitialize.restype = c_int
-
         self._TwinSetParamByName = self._twin_runtime_library.TwinSetParamByName
-        self._TwinSetParamByName.argtypes = [c_void_p, c_char_p, c_double]
-        self._TwinSetParamByName.restype = c_int
-
         self._TwinSetStrParamByName = self._twin_runtime_library.TwinSetStrParamByName
-        self._TwinSetStrParamByName.argtypes = [c_void_p, c_char_p, c_char_p]
-        self._TwinSetStrParamByName.restype = c_int
-
         self._TwinSetParamByIndex = self._twin_runtime_library.TwinSetParamByIndex
-        self._TwinSetParamByIndex.argtypes = [c_void_p, c_int, c_double]
-        self._TwinSetParamByIndex.restype = c_int
-
         self._TwinGetOutputs = self._twin_runtime_library.TwinGetOutputs
-        self._TwinGetOutputs.restype = c_int
-
         self._TwinSimulate = self._twin_runtime_library.TwinSimulate
-        self._TwinSimulate.restype = c_int
-
         self._TwinSimulateBatchMode = self._twin_runtime_library.TwinSimulateBatchMode
-        self._TwinSimulateBatchMode.restype = c_int
-
         self._TwinSimulateBatchModeCSV = self._twin_runtime_library.TwinSimulateBatchModeCSV
-        self._TwinSimulateBatchModeCSV.restype = c_int
-
         self._TwinSetInputs = self._twin_runtime_library.TwinSetInputs
-        self._TwinSetInputs.restype = c_int
-
         self._TwinSetInputByName = self._twin_runtime_library.TwinSetInputByName
-        self._TwinSetInputByName.argtypes = [c_void_p, c_char_p, c_double]
-        self._TwinSetInputByName.restype = c_int
-
         self._TwinSetInputByIndex = self._twin_runtime_library.TwinSetInputByIndex
-        self._TwinSetInputByIndex.argtypes = [c_void_p, c_int, c_double]
-        self._TwinSetInputByIndex.restype = c_int
-
         self._TwinGetOutputByName = self._twin_runtime_library.TwinGetOutputByName
-        self._TwinGetOutputByName.restype = c_int
-
         self._TwinGetOutputByIndex = self._twin_runtime_library.TwinGetOutputByIndex
-        self._TwinGetOutputByIndex.restype = c_int
-
         self._TwinGetDefaultSimulationSettings = self._twin_runtime_library.TwinGetDefaultSimulationSettings
-        self._TwinGetDefaultSimulationSettings.restype = c_int
-
         self._TwinGetVarDataType = self._twin_runtime_library.TwinGetVarDataType
-        self._TwinGetVarDataType.restype = c_int
-
         self._TwinGetVarUnit = self._twin_runtime_library.TwinGetVarUnit
-        self._TwinGetVarUnit.restype = c_int
-
         self._TwinGetVarStart = self._twin_runtime_library.TwinGetVarStart
-        self._TwinGetVarStart.restype = c_int
-
         self._TwinGetStrVarStart = self._twin_runtime_library.TwinGetStrVarStart
-        self._TwinGetStrVarStart.restype = c_int
-
         self._TwinGetVarMin = self._twin_runtime_library.TwinGetVarMin
-        self._TwinGetVarMin.restype = c_int
-
         self._TwinGetVarMax = self._twin_runtime_library.TwinGetVarMax
-        self._TwinGetVarMax.restype = c_int
-
         self._TwinGetVarNominal = self._twin_runtime_library.TwinGetVarNominal
-        self._TwinGetVarNominal.restype = c_int
-
         self._TwinGetVarQuantityType = self._twin_runtime_library.TwinGetVarQuantityType
-        self._TwinGetVarQuantityType.restype = c_int
-
         self._TwinGetVarDescription = self._twin_runtime_library.TwinGetVarDescription
-        self._TwinGetVarDescription.restype = c_int
-
         self._TwinGetVisualizationResources = self._twin_runtime_library.TwinGetVisualizationResources
-        self._TwinGetVisualizationResources.restype = c_int
-
         self._TwinEnableROMImages = self._twin_runtime_library.TwinEnableROMImages
-        self._TwinEnableROMImages.restype = c_int
-
         self._TwinDisableROMImages = self._twin_runtime_library.TwinDisableROMImages
-        self._TwinDisableROMImages.restype = c_int
-
         self._TwinEnable3DROMData = self._twin_runtime_library.TwinEnable3DROMData
-        self._TwinEnable3DROMData.restype = c_int
-
         self._TwinDisable3DROMData = self._twin_runtime_library.TwinDisable3DROMData
-        self._TwinDisable3DROMData.restype = c_int
-
         self._TwinGetRomImageFiles = self._twin_runtime_library.TwinGetRomImageFiles
-        self._TwinGetRomImageFiles.restype = c_int
-
         self._TwinGetNumRomImageFiles = self._twin_runtime_library.TwinGetNumRomImageFiles
-        self._TwinGetNumRomImageFiles.restype = c_int
-
         self._TwinGetRomModeCoefFiles = self._twin_runtime_library.TwinGetRomModeCoefFiles
-        self._TwinGetRomModeCoefFiles.restype = c_int
-
         self._TwinGetNumRomModeCoefFiles = self._twin_runtime_library.TwinGetNumRomModeCoefFiles
-        self._TwinGetNumRomModeCoefFiles.restype = c_int
-
         self._TwinGetRomSnapshotFiles = self._twin_runtime_library.TwinGetRomSnapshotFiles
-        self._TwinGetRomSnapshotFiles.restype = c_int
-
         self._TwinGetNumRomSnapshotFiles = self._twin_runtime_library.TwinGetNumRomSnapshotFiles
-        self._TwinGetNumRomSnapshotFiles.restype = c_int
-
         self._TwinGetDefaultROMImageDirectory = self._twin_runtime_library.TwinGetDefaultROMImageDirectory
-        self._TwinGetDefaultROMImageDirectory.argtypes = [c_void_p, c_char_p, POINTER(c_char_p)]
-        self._TwinGetDefaultROMImageDirectory.restype = c_int
-
         self._TwinGetRomResourcePath = self._twin_runtime_library.TwinGetRomResourcePath
-        self._TwinGetRomResourcePath.argtypes = [c_void_p, c_char_p, POINTER(c_char_p)]
-        self._TwinGetRomResourcePath.restype = c_int
-
         self._TwinSetROMImageDirectory = self._twin_runtime_library.TwinSetROMImageDirectory
-        self._TwinSetROMImageDirectory.argtypes = [c_void_p, c_char_p, c_char_p]
-        self._TwinSetROMImageDirectory.restype = c_int
-
         self._TwinSaveState = self._twin_runtime_library.TwinSaveState
-        self._TwinSaveState.argtypes = [c_void_p]
-        self._TwinSaveState.restype = c_int
-
         self._TwinLoadState = self._twin_runtime_library.TwinLoadState
-        self._TwinLoadState.argtypes = [c_void_p]
-        self._TwinLoadState.restype = c_int
 
         model_path = Path(model_path)
         if model_path.is_file() is False:
@@ -392,6 +378,12 @@ class TwinRuntime:
         self.twin_get_output_names()
         self.load_twin_default_sim_settings()
 
+        # Persistent I/O buffers reused by each twin_set_inputs/twin_get_outputs call
+        self._inputs_buffer = np.zeros(self.number_inputs, dtype=np.float64)
+        self._inputs_buffer_ptr = self._inputs_buffer.ctypes.data_as(POINTER(c_double))
+        self._outputs_buffer = np.zeros(self.number_outputs, dtype=np.float64)
+        self._outputs_buffer_ptr = self._outputs_buffer.ctypes.data_as(POINTER(c_double))
+
     def twin_close(self):
         if not self.is_model_opened:
             print('[Warning]: twin_close() will not execute since model is not loaded. Maybe it was already closed?')
@@ -416,6 +408,11 @@ class TwinRuntime:
         self.input_names = None
         self.parameter_names = None
 
+        self._inputs_buffer = None
+        self._inputs_buffer_ptr = None
+        self._outputs_buffer = None
+        self._outputs_buffer_ptr = None
+
     """
     Model properties
     Functions for getting model properties
@@ -470,8 +467,6 @@ class TwinRuntime:
             raise TwinRuntimeError("The model has to be opened before returning parameter names!")
 
         if self.parameter_names is None:
-            self._TwinGetParamNames.argtypes = [c_void_p, POINTER(c_char_p * self.number_parameters), c_int]
-
             parameter_names_c = (c_char_p * self.number_parameters)()
 
             self.twin_status = self._TwinGetParamNames(self._modelPointer,parameter_names_c, self.number_parameters)
@@ -488,8 +483,6 @@ class TwinRuntime:
             raise TwinRuntimeError("The model has to be opened before returning input names!")
 
         if self.input_names is None:
-            self._TwinGetInputNames.argtypes = [c_void_p, POINTER(c_char_p * self.number_inputs), c_int]
-
             input_names_c = (c_char_p * self.number_inputs)()
 
             self.twin_status = self._TwinGetInputNames(self._modelPointer, input_names_c, self.number_inputs)
@@ -506,8 +499,6 @@ class TwinRuntime:
             raise TwinRuntimeError("The model has to be opened before returning output names!")
 
         if self.output_names is None:
-            self._TwinGetInputNames.argtypes = [c_void_p, POINTER(c_char_p * self.number_outputs), c_int]
-
             output_names_c = (c_char_p * self.number_outputs)()
 
             self.twin_status = self._TwinGetOutputNames(self._modelPointer, output_names_c, self.number_outputs)
@@ -670,6 +661,100 @@ class TwinRuntime:
 
         return nominal_value.value
 
+    def twin_get_var_properties(self, var_names=None):
+        """
+        Return the unit, quantity type, start, minimum, maximum and description of the given variables (all inputs,
+        outputs and parameters if None) in a columnar dictionary (see var_properties_columns). String properties that
+        are not available hold the property status flag name, numeric ones hold NaN. Properties of all the model
+        variables are queried once per model file and cached.
+        """
+        if self.is_model_opened is False:
+            raise TwinRuntimeError("The model has to be opened before returning variable properties!")
+
+        properties = self._get_cached_var_properties()
+        if var_names is None:
+            return {column: values.copy() for column, values in properties.items()}
+
+        var_names = [name.decode() if type(name) is bytes else str(name) for name in var_names]
+        row_index = {name: i for i, name in enumerate(properties['Name'])}
+        unknown_names = [name for name in var_names if name not in row_index]
+        if len(unknown_names) > 0:
+            # Variables that are not inputs, outputs or parameters are queried without being cached
+            unknown_properties = self._query_var_properties(unknown_names)
+            unknown_index = {name: i for i, name in enumerate(unknown_properties['Name'])}
+
+        var_properties = dict()
+        for column, values in properties.items():
+            column_values = []
+            for name in var_names:
+                if name in row_index:
+                    column_values.append(values[row_index[name]])
+                else:
+                    column_values.append(unknown_properties[column][unknown_index[name]])
+            if isinstance(values, np.ndarray):
+                column_values = np.array(column_values, dtype=np.float64)
+            var_properties[column] = column_values
+        return var_properties
+
+    def _get_cached_var_properties(self):
+        model_stat = os.stat(self.model_path)
+        cache_key = (self.model_path, model_stat.st_mtime_ns, model_stat.st_size)
+        properties = TwinRuntime._var_properties_cache.get(cache_key)
+        if properties is None:
+            var_names = list(self.twin_get_input_names()) + list(self.twin_get_output_names()) + \
+                list(self.twin_get_param_names())
+            properties = self._query_var_properties(var_names)
+            TwinRuntime._var_properties_cache[cache_key] = properties
+        return properties
+
+    def _query_var_properties(self, var_names):
+        """
+        Query all the properties of the given variables in one pass, checking property status flags instead of
+        raising and catching property errors.
+        """
+        number_vars = len(var_names)
+        units = []
+        quantity_types = []
+        descriptions = []
+        start_values = np.full(number_vars, np.nan)
+        min_values = np.full(number_vars, np.nan)
+        max_values = np.full(number_vars, np.nan)
+
+        str_value = c_char_p()
+        double_value = c_double()
+        property_ok = PropertyStatusFlag.TWIN_VARPROP_OK.value
+
+        def _get_str_property(function, c_var_name):
+            str_value.value = None
+            property_status = function(self._modelPointer, c_var_name, byref(str_value))
+            if property_status != property_ok:
+                return PropertyStatusFlag(property_status).name
+            if str_value.value is None:
+                return None
+            return str_value.value.decode()
+
+        def _get_double_property(function, c_var_name, values, i):
+            property_status = function(self._modelPointer, c_var_name, byref(double_value))
+            if property_status == property_ok:
+                values[i] = double_value.value
+
+        for i, var_name in enumerate(var_names):
+            c_var_name = c_char_p(var_name if type(var_name) is bytes else var_name.encode())
+            units.append(_get_str_property(self._TwinGetVarUnit, c_var_name))
+            quantity_types.append(_get_str_property(self._TwinGetVarQuantityType, c_var_name))
+            descriptions.append(_get_str_property(self._TwinGetVarDescription, c_var_name))
+            _get_double_property(self._TwinGetVarStart, c_var_name, start_values, i)
+            _get_double_property(self._TwinGetVarMin, c_var_name, min_values, i)
+            _get_double_property(self._TwinGetVarMax, c_var_name, max_values, i)
+
+        return {'Name': [name.decode() if type(name) is bytes else str(name) for name in var_names],
+                'Unit': units,
+                'Type': quantity_types,
+                'Start': start_values,
+                'Min': min_values,
+                'Max': max_values,
+                'Description': descriptions}
+
     # def twin_get_str_var_nominal(self, var_name):
     #     if self.is_model_opened is False:
     #         raise TwinRuntimeError("The model has to be opened before returning variable nominal value!")
@@ -709,45 +794,69 @@ class TwinRuntime:
         if self.is_model_initialized is False:
             raise TwinRuntimeError("The Model has to be initialized before simulation!")
 
-        self.twin_status = self._TwinSimulate(self._modelPointer, c_double(time_stop), c_double(time_step))
+        self.twin_status = self._TwinSimulate(self._modelPointer, time_stop, time_step)
         self.evaluate_twin_status(self.twin_status, self, "twin_simulate")
 
     def twin_simulate_batch_mode(self, input_df, output_column_names, step_size=0, interpolate=0, time_as_index=False):
-        output_number_of_columns = self.number_outputs + 1
-
         if self.is_model_initialized is False:
             raise TwinRuntimeError("The Model has to be initialized before simulation!")
 
         local_df = input_df  # Creates a local copy so that the source DF does not get modified outside this scope
-        num_input_rows = local_df.shape[0]
         if time_as_index:
             local_df = local_df.reset_index()
 
-        end_time = local_df.iloc[-1, 0]
-        if step_size != 0:
-            max_output_rows = int(math.ceil(end_time / step_size) + 1)
-        else:
-            if local_df.iloc[0, 0] > 0:
-                max_output_rows = num_input_rows + 1  # + 1 to account for t=0 that's not on the input DF
-            else:
-                max_output_rows = num_input_rows
+        output_data = self.twin_simulate_batch_mode_array(local_df.to_numpy(dtype=np.float64), step_size, interpolate)
 
-        # Preallocate Dataframe rows
-        local_df = local_df.astype(np.float64)
-        input_data = build_ctype_2d_array(num_input_rows, local_df)
+        # The DataFrame wraps the output block, no per row copy is made
+        output_df = pd.DataFrame(data=output_data, index=np.arange(0, output_data.shape[0]),
+                                 columns=output_column_names, copy=False)
+        return output_df
 
-        # Pandas float to Python equivalent
-        out_data = build_empty_ctype_2d_array(max_output_rows, output_number_of_columns)
+    def twin_simulate_batch_mode_array(self, input_array, step_size=0, interpolate=0, output_array=None,
+                                       start_time=0):
+        """
+        Batch mode simulation working directly on NumPy arrays. The input array has one row per time instant with the
+        time as first column followed by the inputs (in input names order). The output array has the time as first
+        column followed by the outputs (in output names order). If output_array is given, it must be a C-ordered
+        float64 array with at least the number of rows returned by get_batch_mode_output_rows and number_outputs + 1
+        columns, results are written into it and a view on the used rows is returned. start_time is the model time at
+        which the batch starts (i.e. 0 right after initialization).
+        """
+        if self.is_model_initialized is False:
+            raise TwinRuntimeError("The Model has to be initialized before simulation!")
+
+        input_data = np.ascontiguousarray(input_array, dtype=np.float64)
+        if input_data.ndim != 2 or input_data.shape[1] != self.number_inputs + 1:
+            raise TwinRuntimeError("The input array must have one time column and one column per model input!")
+
+        num_input_rows = input_data.shape[0]
+        output_number_of_columns = self.number_outputs + 1
+        max_output_rows = get_batch_mode_output_rows(input_data[:, 0], step_size, start_time)
 
-        self.twin_status = self._TwinSimulateBatchMode(self._modelPointer, byref(input_data), c_int(num_input_rows),
-                                                       byref(out_data), c_int(max_output_rows),
+        if output_array is None:
+            output_data = np.empty((max_output_rows, output_number_of_columns), dtype=np.float64)
+        else:
+            if output_array.dtype != np.float64 or not output_array.flags['C_CONTIGUOUS'] \
+                    or not output_array.flags['WRITEABLE']:
+                raise TwinRuntimeError("The output array must be a writeable C-ordered float64 array!")
+            if output_array.ndim != 2 or output_array.shape[0] < max_output_rows \
+                    or output_array.shape[1] != output_number_of_columns:
+                raise TwinRuntimeError("The output array must have at least {} rows and {} columns!".format(
+                    max_output_rows, output_number_of_columns))
+            output_data = output_array[:max_output_rows]
+
+        # Row pointer tables reference the contiguous blocks, they must be kept alive during the SDK call
+        input_rows = build_ctype_row_pointers(input_data)
+        output_rows = build_ctype_row_pointers(output_data)
+
+        self.twin_status = self._TwinSimulateBatchMode(self._modelPointer, input_rows.ctypes.data_as(c_void_p),
+                                                       c_int(num_input_rows),
+                                                       output_rows.ctypes.data_as(c_void_p), c_int(max_output_rows),
                                                        c_double(step_size),
                                                        c_int(interpolate))
-        data = [np.ctypeslib.as_array(out_data[i], shape=(output_number_of_columns,)) for i in range(max_output_rows)]
-        output_df = pd.DataFrame(data=data, index=np.arange(0, max_output_rows), columns=output_column_names)
         self.evaluate_twin_status(self.twin_status, self, "twin_simulate_batch_mode")
 
-        return output_df
+        return output_data
 
     # This method will generate the response also as a csv
     def twin_simulate_batch_mode_csv(self, input_csv, output_csv, step_size=0, interpolate=0):
@@ -783,25 +892,36 @@ class TwinRuntime:
         if len(input_array) != self.number_inputs:
             raise TwinRuntimeError("The input array size must match the the models number of inputs!")
 
-        array_np = np.array(input_array)
-        array_ctypes = array_np.ctypes.data_as(POINTER(c_double * self.number_inputs))
+        self._inputs_buffer[:] = input_array
+        self.twin_status = self._TwinSetInputs(self._modelPointer, self._inputs_buffer_ptr, self.number_inputs)
+        self.evaluate_twin_status(self.twin_status, self, "twin_set_inputs")
+
+    def twin_get_outputs(self):
+        if self.is_model_initialized is False:
+            raise TwinRuntimeError("The Model has to be initialized before it can return outputs!")
 
-        self._TwinSetInputs.argtypes = [c_void_p, POINTER(c_double * self.number_inputs), c_int]
-        self.twin_status = self._TwinSetInputs(self._modelPointer, array_ctypes, self.number_inputs)
+        self.twin_status = self._TwinGetOutputs(self._modelPointer, self._outputs_buffer_ptr, self.number_outputs)
         self.evaluate_twin_status(self.twin_status, self, "twin_get_outputs")
 
-    def twin_get_outputs(self):
+        outputs_list = self._outputs_buffer.tolist()
+        return outputs_list
+
+    def twin_get_outputs_array(self, output_array):
+        """
+        Write the outputs (in output names order) into output_array, a writeable array of number_outputs values, and
+        return it.
+        """
         if self.is_model_initialized is False:
             raise TwinRuntimeError("The Model has to be initialized before it can return outputs!")
 
-        self._TwinGetOutputs.argtypes = [c_void_p, POINTER(c_double * self.number_outputs), c_int]
-        outputs = (c_double * self.number_outputs)()
+        if output_array.shape != (self.number_outputs,):
+            raise TwinRuntimeError("The output array must have {} values!".format(self.number_outputs))
 
-        self.twin_status = self._TwinGetOutputs(self._modelPointer, outputs, self.number_outputs)
+        self.twin_status = self._TwinGetOutputs(self._modelPointer, self._outputs_buffer_ptr, self.number_outputs)
         self.evaluate_twin_status(self.twin_status, self, "twin_get_outputs")
 
-        outputs_list = np.array(outputs).tolist()
-        return outputs_list
+        output_array[:] = self._outputs_buffer
+        return output_array
 
     def twin_set_param_by_name(self, param_name, value):
         if self.is_model_instantiated is False:
@@ -1072,64 +1192,42 @@ class TwinRuntime:
         print("\n")
 
     def full_model_properties_info_df(self):
-
-        prop_matrix_list = []
-
-        input_vars = self.twin_get_input_names()
-        prop_matrix_list += self.build_prop_info_df(input_vars)
-
-        output_vars = self.twin_get_output_names()
-        prop_matrix_list += self.build_prop_info_df(output_vars)
-
-        param_vars = self.twin_get_param_names()
-        prop_matrix_list += self.build_prop_info_df(param_vars)
-
-        var_inf_columns = ['Name', 'Unit', 'Type', 'Start', 'Min', 'Max', 'Description']
-        variable_info_df = pd.DataFrame(prop_matrix_list, columns=var_inf_columns)
-
-        return variable_info_df
+        return pd.DataFrame(self.twin_get_var_properties(), columns=self.var_properties_columns)
 
     def model_properties_info_df(self, vars_names, max_var_to_print):
+        var_properties = self.twin_get_var_properties(vars_names[:max_var_to_print])
+        return pd.DataFrame(var_properties, columns=self.var_properties_columns)
 
-        prop_matrix_list = self.build_prop_info_df(vars_names[:max_var_to_print])
+    def build_prop_info_df(self, var_names):
+        var_properties = self.twin_get_var_properties(var_names)
+        columns = [var_properties[column] for column in self.var_properties_columns]
+        prop_matrix_list = []
+        for prop_row in zip(*columns):
+            o_name, o_unit, o_quantity_type, o_start, o_min, o_max, o_var_description = prop_row
+            o_start, o_min, o_max = [None if np.isnan(value) else float(value) for value in [o_start, o_min, o_max]]
+            prop_matrix_list.append([o_name, o_unit, o_quantity_type, o_start, o_min, o_max, o_var_description])
+        return prop_matrix_list
 
-        var_inf_columns = ['Name', 'Unit', 'Type', 'Start', 'Min', 'Max', 'Description']
 
-        variable_info_df = pd.DataFrame(data=prop_matrix_list, columns=var_inf_columns)
-        return variable_info_df
+def get_batch_mode_output_rows(time_column, step_size=0, start_time=0):
+    """
+    Number of rows written by the SDK batch mode for the given input time column and step size, the batch starting
+    from the model time start_time.
+    """
+    end_time = time_column[-1]
+    if step_size != 0:
+        return int(math.ceil((end_time - start_time) / step_size) + 1)
+    if time_column[0] > start_time:
+        return len(time_column) + 1  # + 1 to account for start time that's not on the input array
+    return len(time_column)
 
-    def build_prop_info_df(self, var_names):
-        prop_matrix_list = []
-        for value in var_names:
-            o_name = value
-            try:
-                o_unit = self.twin_get_var_unit(value)
-            except (PropertyNotDefinedError, PropertyNotApplicableError, PropertyInvalidError, PropertyError) as e:
-                o_unit = e.property_status_flag.name
-            try:
-                o_quantity_type = self.twin_get_var_quantity_type(value)
-            except (PropertyNotDefinedError, PropertyNotApplicableError, PropertyInvalidError, PropertyError) as e:
-                o_quantity_type = e.property_status_flag.name
-            try:
-                o_var_description = self.twin_get_var_description(value)
-            except (PropertyNotDefinedError, PropertyNotApplicableError, PropertyInvalidError, PropertyError) as e:
-                o_var_description = e.property_status_flag.name
-            try:
-                o_start = self.twin_get_var_start(value)
-            except (PropertyNotDefinedError, PropertyNotApplicableError, PropertyInvalidError, PropertyError) as e:
-                o_start = None
-            try:
-                o_min = self.twin_get_var_min(value)
-            except (PropertyNotDefinedError, PropertyNotApplicableError, PropertyInvalidError, PropertyError) as e:
-                o_min = None
-            try:
-                o_max = self.twin_get_var_max(value)
-            except (PropertyNotDefinedError, PropertyNotApplicableError, PropertyInvalidError, PropertyError) as e:
-                o_max = None
 
-            prop_row = [o_name, o_unit, o_quantity_type, o_start, o_min, o_max, o_var_description]
-            prop_matrix_list.append(prop_row)
-        return prop_matrix_list
+def build_ctype_row_pointers(data):
+    """
+    Build the row pointer table (i.e. double**) of a C-ordered 2D float64 NumPy array. Pointers are computed at once
+    from the array base address and row stride so that the SDK reads and writes the array memory directly.
+    """
+    return np.arange(data.shape[0], dtype=np.uintp) * np.uintp(data.strides[0]) + np.uintp(data.ctypes.data)
 
 
 def build_empty_ctype_2d_array(num_input_rows, number_of_columns):
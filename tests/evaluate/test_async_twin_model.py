@@ -0,0 +1,52 @@
+import asyncio
+import os
+
+import pytest
+from pytwin import AsyncTwinModel, TwinModel, TwinModelError
+
+COUPLE_CLUTCHES_FILEPATH = os.path.join(os.path.dirname(__file__), "data", "CoupleClutches_22R2_other.twin")
+RC_HEAT_CIRCUIT_23R1 = os.path.join(os.path.dirname(__file__), "data", "RC_heat_circuit_23R1.twin")
+
+
+class TestAsyncTwinModel:
+    def test_instantiation_error_is_raised_when_awaited(self):
+        async def _main():
+            twin_model = AsyncTwinModel(model_filepath=None)
+            with pytest.raises(TwinModelError) as e:
+                await twin_model.initialize_evaluation()
+            assert "Please provide valid filepath" in str(e)
+
+        asyncio.run(_main())
+
+    def test_evaluate_gives_same_results_as_twin_model(self):
+        twin_model_ref = TwinModel(model_filepath=COUPLE_CLUTCHES_FILEPATH)
+        twin_model_ref.initialize_evaluation()
+        outputs_ref = []
+        for i in range(5):
+            twin_model_ref.evaluate_step_by_step(step_size=0.001, inputs={"Clutch1_in": 0.1 * i})
+            outputs_ref.append(dict(twin_model_ref.outputs))
+
+        async def _evaluate(model_filepath):
+            async with AsyncTwinModel(model_filepath=model_filepath) as twin_model:
+                await twin_model.initialize_evaluation()
+                # Calls submitted at once are serialized in submission order
+                steps = [
+                    twin_model.evaluate_step_by_step(step_size=0.001, inputs={"Clutch1_in": 0.1 * i}) for i in range(5)
+                ]
+                return await asyncio.gather(*steps)
+
+        async def _tick(ticks: list, evaluations: asyncio.Future):
+            # The event loop keeps running while evaluations are pending in the executors
+            while not evaluations.done():
+                ticks.append(None)
+                await asyncio.sleep(0.0)
+
+        async def _main():
+            ticks = []
+            evaluations = asyncio.gather(_evaluate(COUPLE_CLUTCHES_FILEPATH), _evaluate(RC_HEAT_CIRCUIT_23R1))
+            await _tick(ticks, evaluations)
+            return await evaluations, ticks
+
+        (outputs, _), ticks = asyncio.run(_main())
+        assert outputs == outputs_ref
+        assert len(ticks) > 0
@@ -4,11 +4,13 @@ import pytest
 from pytwin import get_pytwin_log_file
 from pytwin.evaluate.model import Model
 from pytwin.evaluate.saved_state_registry import (
+    RetentionPolicy,
     SavedState,
     SavedStateError,
     SavedStateRegistry,
     SavedStateRegistryError,
 )
+from pytwin.evaluate.saved_state_storage import CHUNKS_FOLDER_NAME, SavedStateStorage, SavedStateStorageError
 
 from tests.utilities import compare_dictionary
 
@@ -157,3 +159,241 @@ class TestSavedStateRegistry:
         with pytest.raises(SavedStateRegistryError) as e:
             SavedStateRegistry(model_id="unknown", model_name="unknown")
         assert "Please use an existing model id and/or model name" in str(e.value)
+
+    def test_registry_is_read_incrementally(self):
+        # Initialize unit test
+        test_model = reinit_registry()
+        writer = SavedStateRegistry(model_id=test_model.id, model_name=test_model.name)
+        reader = SavedStateRegistry(model_id=test_model.id, model_name=test_model.name)
+        saved_states = []
+        for i in [3, 0, 2, 1]:
+            ss = SavedState()
+            ss.time = float(i)
+            ss.inputs = {"input1": float(i)}
+            ss.outputs = {"output1": float(i)}
+            ss.parameters = {"param1": 0.1}
+            saved_states.append(ss)
+            writer.append_saved_state(ss)
+            # Reader only parses lines appended since its last read
+            extracted_ss = reader.extract_saved_state(simulation_time=float(i), epsilon=1e-8)
+            assert compare_dictionary(extracted_ss.dump(), ss.dump())
+        # Registry file has one saved state per line
+        with open(writer.registry_filepath, "r") as ssr_fp:
+            assert len(ssr_fp.readlines()) == 4
+        assert [ss.dump() for ss in writer.saved_states] == [ss.dump() for ss in saved_states]
+        assert [ss.dump() for ss in reader.saved_states] == [ss.dump() for ss in saved_states]
+        # Time window lookup returns saved states sorted by time
+        assert [ss.time for ss in reader.extract_saved_states_in_window(0.5, 2.0)] == [1.0, 2.0]
+        assert len(reader.extract_saved_states_in_window(5.0, 6.0)) == 0
+
+    def test_legacy_registry_is_read(self):
+        import json
+
+        # Initialize unit test
+        test_model = reinit_registry()
+        ssr = SavedStateRegistry(model_id=test_model.id, model_name=test_model.name)
+        legacy_ss = SavedState()
+        legacy_ss.load(
+            {
+                SavedState.ID_KEY: "legacy",
+                SavedState.TIME_KEY: 0.5,
+                SavedState.INPUTS_KEY: {"input1": 1.0},
+                SavedState.OUTPUTS_KEY: {"output1": 11.0},
+                SavedState.PARAMETERS_KEY: {"param1": 0.1},
+            }
+        )
+        with open(ssr.legacy_registry_filepath, "w") as fp:
+            json.dump({SavedStateRegistry.SAVED_STATES_KEY: [legacy_ss.dump()]}, fp, indent=4)
+        new_ss = SavedState()
+        new_ss.load(dict(legacy_ss.dump(), id="new", time=1.5))
+        ssr.append_saved_state(new_ss)
+        # Legacy saved states are registered before the new ones, with the same registry or a new one
+        other_ssr = SavedStateRegistry(model_id=test_model.id, model_name=test_model.name)
+        for registry in [ssr, other_ssr]:
+            assert [ss._id for ss in registry.saved_states] == ["legacy", "new"]
+            assert compare_dictionary(registry.extract_saved_state(0.5, 1e-8).dump(), legacy_ss.dump())
+            assert compare_dictionary(registry.extract_saved_state(1.5, 1e-8).dump(), new_ss.dump())
+        # The newest saved state is retained
+        pruned_states = ssr.apply_retention_policy(RetentionPolicy(keep_last=1))
+        assert [ss._id for ss in pruned_states] == ["legacy"]
+        assert [ss._id for ss in ssr.saved_states] == ["new"]
+
+    def test_extract_without_registry_raises_error(self):
+        test_model = reinit_registry()
+        ssr = SavedStateRegistry(model_id=test_model.id, model_name=test_model.name)
+        with pytest.raises(SavedStateRegistryError) as e:
+            ssr.extract_saved_state(simulation_time=0.0, epsilon=1e-8)
+        assert "Something went wrong while reading registry file" in str(e.value)
+
+
+def append_saved_states(ssr: SavedStateRegistry, times: list, nbytes: int = 10):
+    saved_states = []
+    for t in times:
+        ss = SavedState()
+        ss.time = t
+        ss.inputs = {"input1": t}
+        ss.outputs = {"output1": t}
+        ss.parameters = {"param1": 0.1}
+        with open(ssr.return_saved_state_filepath(ss), "wb") as f:
+            f.write(bytes(nbytes))
+        ssr.append_saved_state(ss)
+        saved_states.append(ss)
+    return saved_states
+
+
+class TestRetentionPolicy:
+    def test_keep_last_and_time_bucket(self):
+        saved_states = []
+        for t in [0.0, 0.5, 1.0, 1.5, 2.0, 2.5]:
+            ss = SavedState()
+            ss.time = t
+            saved_states.append(ss)
+        sizes = [10] * len(saved_states)
+        assert RetentionPolicy().select(saved_states, sizes) == [0, 1, 2, 3, 4, 5]
+        assert RetentionPolicy(keep_last=2).select(saved_states, sizes) == [4, 5]
+        assert RetentionPolicy(time_bucket=1.0).select(saved_states, sizes) == [1, 3, 5]
+        assert RetentionPolicy(keep_last=2, time_bucket=1.0).select(saved_states, sizes) == [1, 3, 4, 5]
+        assert RetentionPolicy(max_bytes=25).select(saved_states, sizes) == [4, 5]
+        assert RetentionPolicy(max_bytes=0).select(saved_states, sizes) == [5]
+
+    def test_raise_error(self):
+        with pytest.raises(SavedStateRegistryError):
+            RetentionPolicy(keep_last=0)
+        with pytest.raises(SavedStateRegistryError):
+            RetentionPolicy(time_bucket=-1.0)
+
+
+class TestSavedStateRegistryCompaction:
+    def test_apply_retention_policy(self):
+        test_model = reinit_registry()
+        ssr = SavedStateRegistry(model_id=test_model.id, model_name=test_model.name)
+        reader = SavedStateRegistry(model_id=test_model.id, model_name=test_model.name)
+        saved_states = append_saved_states(ssr, [0.0, 1.0, 2.0, 3.0, 4.0])
+        assert len(reader.saved_states) == 5
+        pruned_states = ssr.apply_retention_policy(RetentionPolicy(keep_last=2))
+        assert [ss.time for ss in pruned_states] == [0.0, 1.0, 2.0]
+        # Registry file and saved state files of pruned states are removed
+        with open(ssr.registry_filepath, "r") as ssr_fp:
+            assert len(ssr_fp.readlines()) == 2
+        for ss in saved_states:
+            assert os.path.exists(ssr.return_saved_state_filepath(ss)) == (ss.time >= 3.0)
+        assert [ss.time for ss in ssr.saved_states] == [3.0, 4.0]
+        # Other registry instances rebuild their index after compaction
+        assert [ss.time for ss in reader.saved_states] == [3.0, 4.0]
+        with pytest.raises(SavedStateRegistryError):
+            reader.extract_saved_state(simulation_time=1.0, epsilon=1e-8)
+        # Appending after compaction is consistent for all instances
+        append_saved_states(ssr, [5.0])
+        assert reader.extract_saved_state(simulation_time=5.0, epsilon=1e-8).time == 5.0
+        assert ssr.apply_retention_policy(RetentionPolicy(keep_last=3)) == []
+
+    def test_apply_retention_policy_keeps_unregistered_saved_state_files(self):
+        test_model = reinit_registry()
+        ssr = SavedStateRegistry(model_id=test_model.id, model_name=test_model.name)
+        append_saved_states(ssr, [0.0, 1.0, 2.0])
+        # Saved state file written by the twin runtime but not registered yet
+        ss = SavedState()
+        ss.time = 3.0
+        with open(ssr.return_saved_state_filepath(ss), "wb") as f:
+            f.write(bytes(10))
+        ssr.apply_retention_policy(RetentionPolicy(keep_last=1))
+        assert os.path.exists(ssr.return_saved_state_filepath(ss))
+        ssr.append_saved_state(ss)
+        assert [ss.time for ss in ssr.saved_states] == [2.0, 3.0]
+
+    def test_background_compaction(self):
+        import time
+
+        test_model = reinit_registry()
+        ssr = SavedStateRegistry(model_id=test_model.id, model_name=test_model.name)
+        append_saved_states(ssr, [0.0, 1.0, 2.0, 3.0], nbytes=100)
+        ssr.start_background_compaction(RetentionPolicy(max_bytes=250), interval=0.01)
+        for i in range(100):
+            if len(ssr.saved_states) == 2:
+                break
+            time.sleep(0.01)
+        ssr.stop_background_compaction()
+        assert [ss.time for ss in ssr.saved_states] == [2.0, 3.0]
+
+
+def append_saved_state_blob(ssr: SavedStateRegistry, t: float, data: bytes):
+    ss = SavedState()
+    ss.time = t
+    ss.inputs = {"input1": t}
+    ss.outputs = {"output1": t}
+    ss.parameters = {"param1": 0.1}
+    with open(ssr.return_saved_state_filepath(ss), "wb") as f:
+        f.write(data)
+    ssr.append_saved_state(ss)
+    return ss
+
+
+def read_saved_state_blob(ssr: SavedStateRegistry, ss: SavedState):
+    with ssr.saved_state_file(ss) as ss_filepath:
+        with open(ss_filepath, "rb") as f:
+            return f.read()
+
+
+class TestSavedStateStorage:
+    def test_storage_round_trip(self):
+        data = bytes(range(256)) * 64 + bytes(8192)
+        for storage in [
+            SavedStateStorage(),
+            SavedStateStorage(compression="zlib"),
+            SavedStateStorage(compression="lzma"),
+            SavedStateStorage(chunk_size=4096),
+            SavedStateStorage(compression="zlib", chunk_size=4096),
+        ]:
+            test_model = reinit_registry()
+            ssr = SavedStateRegistry(model_id=test_model.id, model_name=test_model.name, storage=storage)
+            ss = append_saved_state_blob(ssr, 1.0, data)
+            # Saved states stored with any storage are restored by a registry with default storage
+            reader = SavedStateRegistry(model_id=test_model.id, model_name=test_model.name)
+            read_ss = reader.extract_saved_state(simulation_time=1.0, epsilon=1e-8)
+            assert read_ss.storage == ss.storage
+            assert read_saved_state_blob(reader, read_ss) == data
+            statistics = storage.statistics
+            assert statistics["saves"] == 1
+            assert statistics["raw_bytes"] == len(data)
+            if storage.compression is None and storage.chunk_size is None:
+                assert statistics["space_savings"] == 0.0
+            else:
+                # Data is compressible and has identical chunks
+                assert statistics["space_savings"] > 0.5
+
+    def test_chunks_are_deduplicated(self):
+        test_model = reinit_registry()
+        storage = SavedStateStorage(chunk_size=1024)
+        ssr = SavedStateRegistry(model_id=test_model.id, model_name=test_model.name, storage=storage)
+        data = os.urandom(8 * 1024)
+        ss1 = append_saved_state_blob(ssr, 1.0, data)
+        ss2 = append_saved_state_blob(ssr, 2.0, data[:1024] + os.urandom(1024) + data[2048:])
+        chunks_folderpath = os.path.join(ssr.backup_folderpath, CHUNKS_FOLDER_NAME)
+        assert len(os.listdir(chunks_folderpath)) == 9
+        assert storage.statistics["stored_bytes"] == 9 * 1024
+        assert not os.path.exists(ssr.return_saved_state_filepath(ss1))
+        assert read_saved_state_blob(ssr, ss1) == data
+        assert read_saved_state_blob(ssr, ss2)[2048:] == data[2048:]
+        assert storage.statistics["loads"] == 2
+        # Chunks only referenced by pruned saved states are removed
+        ssr.apply_retention_policy(RetentionPolicy(keep_last=1))
+        assert len(os.listdir(chunks_folderpath)) == 8
+        assert read_saved_state_blob(ssr, ss2)[2048:] == data[2048:]
+
+    def test_apply_retention_policy_with_compression(self):
+        test_model = reinit_registry()
+        ssr = SavedStateRegistry(model_id=test_model.id, model_name=test_model.name)
+        raw_ss = append_saved_state_blob(ssr, 1.0, bytes(1000))
+        ssr.storage = SavedStateStorage(compression="zlib")
+        zlib_ss = append_saved_state_blob(ssr, 2.0, bytes(1000))
+        pruned_states = ssr.apply_retention_policy(RetentionPolicy(max_bytes=500))
+        assert [ss.time for ss in pruned_states] == [1.0]
+        assert [ss.time for ss in ssr.saved_states] == [2.0]
+        assert not os.path.exists(ssr.return_saved_state_filepath(raw_ss))
+        assert read_saved_state_blob(ssr, zlib_ss) == bytes(1000)
+
+    def test_raise_error(self):
+        with pytest.raises(SavedStateStorageError):
+            SavedStateStorage(compression="gzip")
+        with pytest.raises(SavedStateStorageError):
+            SavedStateStorage(chunk_size=0)
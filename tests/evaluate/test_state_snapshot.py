@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from pytwin import StateSnapshot, StateSnapshotStore, StateSnapshotStoreError, TwinModel, TwinModelError
+
+COUPLE_CLUTCHES_FILEPATH = os.path.join(os.path.dirname(__file__), "data", "CoupleClutches_22R2_other.twin")
+RC_HEAT_CIRCUIT_23R1 = os.path.join(os.path.dirname(__file__), "data", "RC_heat_circuit_23R1.twin")
+
+
+def build_snapshot(nbytes: int):
+    return StateSnapshot(model_name="model", time=0.0, parameters={}, inputs={}, outputs={}, data=bytes(nbytes))
+
+
+class TestStateSnapshotStore:
+    def test_lru_eviction(self):
+        store = StateSnapshotStore(max_bytes=300)
+        snapshots = [build_snapshot(100) for i in range(3)]
+        for snapshot in snapshots:
+            store.put(snapshot)
+        assert len(store) == 3
+        assert store.nbytes == 300
+        # Mark first snapshot as recently used, then second one is evicted
+        store.get(snapshots[0].id)
+        new_snapshot = build_snapshot(100)
+        store.put(new_snapshot)
+        assert snapshots[1].id not in store
+        assert snapshots[0].id in store
+        assert new_snapshot.id in store
+        assert store.nbytes == 300
+        with pytest.raises(StateSnapshotStoreError) as e:
+            store.get(snapshots[1].id)
+        assert "It may have been evicted from the store" in str(e)
+        # A snapshot bigger than the budget is kept alone
+        big_snapshot = build_snapshot(1000)
+        store.put(big_snapshot)
+        assert len(store) == 1
+        assert store.nbytes == 1000
+        store.remove(big_snapshot.id)
+        assert len(store) == 0
+        assert store.nbytes == 0
+
+    def test_raise_error_if_budget_is_not_positive(self):
+        with pytest.raises(StateSnapshotStoreError):
+            StateSnapshotStore(max_bytes=0)
+
+
+class TestTwinModelSnapshot:
+    def test_load_snapshot_gives_same_results_as_continued_evaluation(self):
+        twin_model = TwinModel(COUPLE_CLUTCHES_FILEPATH)
+        twin_model.initialize_evaluation()
+        twin_model.evaluate_step_by_step(step_size=0.001, inputs={"Clutch1_in": 1.0})
+        store = StateSnapshotStore()
+        snapshot = twin_model.save_snapshot(store=store)
+        assert snapshot.id in store
+        assert snapshot.nbytes > 0
+        assert snapshot.time == twin_model.evaluation_time
+        # Reference branch
+        twin_model.evaluate_step_by_step(step_size=0.001, inputs={"Clutch2_in": 1.0})
+        outputs_ref = twin_model.outputs
+        # Other branch, then restore without re-initialization and evaluate reference branch again
+        twin_model.evaluate_step_by_step(step_size=0.001, inputs={"Clutch2_in": 0.5})
+        initialization_time = twin_model.initialization_time
+        twin_model.load_snapshot(store.get(snapshot.id))
+        assert twin_model.initialization_time == initialization_time
+        assert twin_model.evaluation_time == snapshot.time
+        assert twin_model.inputs == snapshot.inputs
+        twin_model.evaluate_step_by_step(step_size=0.001, inputs={"Clutch2_in": 1.0})
+        assert twin_model.outputs == outputs_ref
+        # Restore into another model with different parameters (re-initialization)
+        other_twin_model = TwinModel(COUPLE_CLUTCHES_FILEPATH)
+        other_twin_model.initialize_evaluation(parameters={"CoupledClutches1_Inert1_J": 2.0})
+        other_twin_model.load_snapshot(snapshot)
+        assert other_twin_model.parameters == snapshot.parameters
+        other_twin_model.evaluate_step_by_step(step_size=0.001, inputs={"Clutch2_in": 1.0})
+        assert other_twin_model.outputs == outputs_ref
+
+    def test_load_snapshot_of_other_model_raises_error(self):
+        twin_model = TwinModel(COUPLE_CLUTCHES_FILEPATH)
+        twin_model.initialize_evaluation()
+        snapshot = twin_model.save_snapshot()
+        other_twin_model = TwinModel(RC_HEAT_CIRCUIT_23R1)
+        with pytest.raises(TwinModelError) as e:
+            other_twin_model.load_snapshot(snapshot)
+        assert "cannot be loaded into model" in str(e)
+
+    def test_evaluate_batch_from_snapshot(self):
+        twin_model = TwinModel(COUPLE_CLUTCHES_FILEPATH)
+        twin_model.initialize_evaluation()
+        twin_model.evaluate_step_by_step(step_size=0.1, inputs={"Clutch1_in": 1.0})
+        snapshot = twin_model.save_snapshot()
+        twin_model.evaluate_step_by_step(step_size=0.1, inputs={"Clutch2_in": 1.0})
+        outputs_ref = twin_model.outputs
+        inputs_df = pd.DataFrame({"Time": [0.1, 0.2], "Clutch2_in": [1.0, 1.0]})
+        outputs_df = twin_model.evaluate_batch_from_snapshot(snapshot, inputs_df)
+        assert outputs_df.shape[0] == 2
+        assert outputs_df["Time"].tolist() == [0.1, 0.2]
+        for name, value in outputs_ref.items():
+            assert np.isclose(outputs_df[name].iloc[-1], value)
+        assert twin_model.evaluation_time == 0.2
+        # Raise error if inputs do not start at snapshot time
+        with pytest.raises(TwinModelError) as e:
+            twin_model.evaluate_batch_from_snapshot(snapshot, pd.DataFrame({"Time": [0.0, 0.2]}))
+        assert "does not start at the snapshot evaluation time" in str(e)
@@ -0,0 +1,262 @@
+import os
+
+import numpy as np
+import pytest
+from pytwin import (
+    TbromError,
+    TBROMImagePrefetcher,
+    TBROMProbe,
+    TBROMReconstructor,
+    TBROMSeries,
+    map_tbrom_image_files,
+    nearest_point_indices,
+    read_tbrom_basis,
+    read_tbrom_points,
+    read_tbrom_snapshot,
+)
+
+UNIT_TEST_WD = os.path.join(os.path.dirname(__file__), "unit_test_wd")
+
+
+def reinit_tbrom_wd():
+    import shutil
+
+    if os.path.exists(UNIT_TEST_WD):
+        shutil.rmtree(UNIT_TEST_WD)
+    os.mkdir(UNIT_TEST_WD)
+    return UNIT_TEST_WD
+
+
+def write_tbrom_file(filepath: str, count: int, values: np.ndarray):
+    with open(filepath, "wb") as f:
+        f.write(np.array([count], dtype="<u8").tobytes())
+        f.write(np.ascontiguousarray(values, dtype="<f8").tobytes())
+    return filepath
+
+
+class TestTbromReader:
+    def test_read_tbrom_snapshot(self):
+        wd = reinit_tbrom_wd()
+        scalar_field = np.random.rand(100)
+        vector_field = np.random.rand(100, 3)
+        scalar_filepath = write_tbrom_file(os.path.join(wd, "scalar.bin"), 100, scalar_field)
+        vector_filepath = write_tbrom_file(os.path.join(wd, "vector.bin"), 100, vector_field)
+        vector_values_filepath = write_tbrom_file(os.path.join(wd, "vector_values.bin"), 300, vector_field)
+        for memmap in [False, True]:
+            field = read_tbrom_snapshot(scalar_filepath, memmap=memmap)
+            assert field.shape == (100,)
+            assert np.array_equal(field, scalar_field)
+            # Field dimension is deduced from the header counting points, or given
+            assert np.array_equal(read_tbrom_snapshot(vector_filepath, memmap=memmap), vector_field)
+            assert np.array_equal(read_tbrom_snapshot(vector_values_filepath, field_dim=3, memmap=memmap), vector_field)
+        assert isinstance(read_tbrom_snapshot(scalar_filepath, memmap=True), np.memmap)
+
+    def test_read_tbrom_points(self):
+        wd = reinit_tbrom_wd()
+        points = np.random.rand(50, 3)
+        for count in [50, 150]:
+            points_filepath = write_tbrom_file(os.path.join(wd, "points.bin"), count, points)
+            assert np.array_equal(read_tbrom_points(points_filepath), points)
+            assert np.array_equal(read_tbrom_points(points_filepath, memmap=True), points)
+
+    def test_raise_error(self):
+        wd = reinit_tbrom_wd()
+        with pytest.raises(TbromError) as e:
+            read_tbrom_snapshot(os.path.join(wd, "missing.bin"))
+        assert "does not exist" in str(e.value)
+        filepath = write_tbrom_file(os.path.join(wd, "snapshot.bin"), 7, np.random.rand(10))
+        with pytest.raises(TbromError):
+            read_tbrom_snapshot(filepath)
+        with pytest.raises(TbromError):
+            read_tbrom_snapshot(filepath, field_dim=3)
+        with pytest.raises(TbromError):
+            read_tbrom_points(filepath)
+        with open(filepath, "ab") as f:
+            f.write(b"123")
+        with pytest.raises(TbromError) as e:
+            read_tbrom_snapshot(filepath, field_dim=1)
+        assert "unexpected size" in str(e.value)
+
+
+def write_snapshot_series(wd: str, times: list, fields: np.ndarray):
+    snapshot_filepaths = []
+    for t, field in zip(times, fields):
+        filepath = os.path.join(wd, f"snapshot_{format(t, '.6f')}.bin")
+        snapshot_filepaths.append(write_tbrom_file(filepath, field.shape[0], field))
+    return snapshot_filepaths
+
+
+class TestTBROMSeries:
+    def test_series_is_lazily_read(self):
+        wd = reinit_tbrom_wd()
+        times = [0.0, 0.1, 0.2, 0.3]
+        fields = np.random.rand(4, 20)
+        series = TBROMSeries(write_snapshot_series(wd, times, fields))
+        assert len(series) == 4
+        assert np.allclose(series.times, times)
+        assert series.shape == (4, 20)
+        assert np.array_equal(series[1], fields[1])
+        assert np.array_equal(series[1:3, 5:8], fields[1:3, 5:8])
+        assert np.array_equal(series.history(point_index=7), fields[:, 7])
+        assert np.array_equal(series.to_numpy(), fields)
+
+    def test_series_export(self):
+        wd = reinit_tbrom_wd()
+        times = [0.0, 0.5, 1.0]
+        fields = np.random.rand(3, 10, 3)
+        series = TBROMSeries(write_snapshot_series(wd, times, fields))
+        assert series.shape == (3, 10, 3)
+        npy_filepath = series.export(os.path.join(wd, "series.npy"))
+        assert np.array_equal(np.load(npy_filepath), fields)
+        # Snapshot files are not read anymore once the series is exported
+        for filepath in series.snapshot_filepaths:
+            os.remove(filepath)
+        assert np.array_equal(series.history(point_index=2), fields[:, 2])
+        loaded_series = TBROMSeries.from_npy(npy_filepath, times)
+        assert np.array_equal(loaded_series[2], fields[2])
+
+    def test_series_raise_error(self):
+        wd = reinit_tbrom_wd()
+        snapshot_filepaths = write_snapshot_series(wd, [0.0, 0.1], [np.random.rand(5), np.random.rand(6)])
+        series = TBROMSeries(snapshot_filepaths)
+        with pytest.raises(TbromError):
+            series.to_numpy()
+        with pytest.raises(TbromError):
+            TBROMSeries(snapshot_filepaths, times=[0.0])
+        with pytest.raises(TbromError):
+            TBROMSeries([os.path.join(wd, "field.bin")])
+
+
+def write_tbrom_resources(wd: str, basis: np.ndarray, dimensionality: int, count_dtype: str = "<u8"):
+    field_directory = os.path.join(wd, "binaryOutputField")
+    os.makedirs(field_directory, exist_ok=True)
+    with open(os.path.join(field_directory, "basis.svd"), "wb") as f:
+        f.write(bytes(16))
+        f.write(np.array([basis.shape[1], basis.shape[0]], dtype=count_dtype).tobytes())
+        f.write(np.ascontiguousarray(basis, dtype="<f8").tobytes())
+    with open(os.path.join(field_directory, "settings.json"), "w") as f:
+        f.write(f'{{"dimensionality": [{dimensionality}]}}')
+    return wd
+
+
+class TestTBROMReconstructor:
+    def test_read_tbrom_basis(self):
+        wd = reinit_tbrom_wd()
+        basis = np.random.rand(4, 30)
+        for count_dtype in ["<u8", "<u4"]:
+            write_tbrom_resources(wd, basis, 1, count_dtype)
+            assert np.array_equal(read_tbrom_basis(os.path.join(wd, "binaryOutputField", "basis.svd")), basis)
+        with pytest.raises(TbromError):
+            read_tbrom_basis(os.path.join(wd, "basis.svd"))
+
+    def test_reconstruct_fields(self):
+        wd = reinit_tbrom_wd()
+        basis = np.random.rand(4, 30)
+        reconstructor = TBROMReconstructor(write_tbrom_resources(wd, basis, 3))
+        assert reconstructor.mode_count == 4
+        assert reconstructor.field_dim == 3
+        coefficients = np.random.rand(5, 4)
+        # Single time step and batch of time steps
+        field = reconstructor.reconstruct(coefficients[0])
+        assert field.shape == (10, 3)
+        assert np.allclose(field.ravel(), coefficients[0] @ basis)
+        fields = reconstructor.reconstruct(coefficients)
+        assert fields.shape == (5, 10, 3)
+        assert np.allclose(fields[2], (coefficients[2] @ basis).reshape(10, 3))
+        # From mode coefficient files
+        mode_coef_filepaths = [
+            write_tbrom_file(os.path.join(wd, f"mode_coef_{i}.bin"), 4, coefficients[i]) for i in range(5)
+        ]
+        assert np.allclose(reconstructor.reconstruct_files(mode_coef_filepaths), fields)
+        with pytest.raises(TbromError):
+            reconstructor.reconstruct(np.random.rand(3))
+
+    def test_mode_coefficient_series_is_sorted_by_time(self):
+        wd = reinit_tbrom_wd()
+        basis = np.random.rand(4, 30)
+        reconstructor = TBROMReconstructor(write_tbrom_resources(wd, basis, 1))
+        coefficients = np.random.rand(3, 4)
+        times = [0.2, 0.0, 0.1]
+        mode_coef_filepaths = [
+            write_tbrom_file(os.path.join(wd, f"mode_coef_{format(t, '.6f')}.bin"), 4, coefficients[i])
+            for i, t in enumerate(times)
+        ]
+        sorted_times, sorted_coefficients = reconstructor.read_mode_coefficient_series(mode_coef_filepaths)
+        assert list(sorted_times) == [0.0, 0.1, 0.2]
+        assert np.array_equal(sorted_coefficients, coefficients[[1, 2, 0]])
+        with pytest.raises(TbromError):
+            reconstructor.read_mode_coefficient_series([os.path.join(wd, "mode_coef.bin")])
+
+
+class TestTBROMProbe:
+    def test_nearest_point_indices(self):
+        points = np.random.rand(1000, 3)
+        coordinates = points[[3, 500, 999]] + 1e-9
+        assert list(nearest_point_indices(points, coordinates)) == [3, 500, 999]
+        # Blocks of points give the same result
+        assert list(nearest_point_indices(points, coordinates, block_size=100)) == [3, 500, 999]
+        assert list(nearest_point_indices(points, points[42])) == [42]
+        with pytest.raises(TbromError):
+            nearest_point_indices(points, [[0.0, 0.0]])
+        # Empty coordinates give no indices, empty points raise an error
+        indices = nearest_point_indices(points, np.empty((0, 3)))
+        assert indices.shape == (0,) and indices.dtype == np.int64
+        with pytest.raises(TbromError) as e:
+            nearest_point_indices(np.empty((0, 3)), coordinates)
+        assert "empty set of points" in str(e)
+
+    def test_probe_gives_same_results_as_reconstruction(self):
+        wd = reinit_tbrom_wd()
+        coefficients = np.random.rand(5, 4)
+        for dimensionality in [1, 3]:
+            reconstructor = TBROMReconstructor(write_tbrom_resources(wd, np.random.rand(4, 30), dimensionality))
+            fields = reconstructor.reconstruct(coefficients)
+            probe = reconstructor.probe([7, 2], rom_name="rom")
+            assert isinstance(probe, TBROMProbe)
+            assert probe.rom_name == "rom"
+            assert np.allclose(probe.evaluate(coefficients), fields[:, [7, 2]])
+            assert np.allclose(probe.evaluate(coefficients[1]), fields[1, [7, 2]])
+            with pytest.raises(TbromError):
+                reconstructor.probe([30 // dimensionality])
+
+
+class TestTBROMImages:
+    def test_map_tbrom_image_files(self):
+        image_filepaths = [
+            os.path.join("rom", "View1_0.100000.png"),
+            os.path.join("rom", "View1_0.000000.png"),
+            os.path.join("rom", "View1_Top_0.000000.png"),
+            os.path.join("rom", "Other_0.000000.png"),
+        ]
+        image_files = map_tbrom_image_files(image_filepaths, ["View1", "View1_Top"])
+        assert list(image_files) == [0.0, 0.1]
+        assert image_files[0.0] == {"View1": image_filepaths[1], "View1_Top": image_filepaths[2]}
+        assert image_files[0.1] == {"View1": image_filepaths[0]}
+
+    def test_image_prefetcher(self):
+        wd = reinit_tbrom_wd()
+        image_filepaths = []
+        for i in range(50):
+            filepath = os.path.join(wd, f"View1_{format(i * 0.1, '.6f')}.png")
+            with open(filepath, "wb") as f:
+                f.write(bytes([i]))
+            image_filepaths.append(filepath)
+        with TBROMImagePrefetcher(image_filepaths, buffer_size=4) as prefetcher:
+            images = list(prefetcher)
+        assert [filepath for filepath, image in images] == image_filepaths
+        assert [image for filepath, image in images] == [bytes([i]) for i in range(50)]
+        # Decoded images
+        prefetcher = TBROMImagePrefetcher(image_filepaths, decode=os.path.getsize)
+        assert all(image == 1 for filepath, image in prefetcher)
+        # Prefetching can be stopped before the end
+        prefetcher = TBROMImagePrefetcher(image_filepaths, buffer_size=2)
+        next(prefetcher)
+        prefetcher.close()
+        with pytest.raises(StopIteration):
+            next(prefetcher)
+        # Errors are raised when reached by the consumer
+        prefetcher = TBROMImagePrefetcher(image_filepaths[0:1] + [os.path.join(wd, "missing.png")])
+        assert next(prefetcher)[0] == image_filepaths[0]
+        with pytest.raises(FileNotFoundError):
+            next(prefetcher)
+        prefetcher.close()
@@ -2,9 +2,10 @@ import os
 import sys
 import time
 
+import numpy as np
 import pandas as pd
 import pytest
-from pytwin import TwinModel, TwinModelError, download_file
+from pytwin import SavedStateStorage, TwinModel, TwinModelError, download_file
 from pytwin.settings import get_pytwin_log_file, get_pytwin_logger, get_pytwin_working_dir, modify_pytwin_working_dir
 
 from tests.utilities import compare_dictionary
@@ -291,6 +292,202 @@ class TestTwinModel:
         sbs_outputs_df = pd.DataFrame(sbs_outputs)
         assert pd.DataFrame.equals(sbs_outputs_df, outputs_df)
 
+    def test_evaluate_sweep_case_gives_same_results(self):
+        twin = TwinModel(model_filepath=COUPLE_CLUTCHES_FILEPATH)
+        inputs_df = pd.DataFrame({"Time": [0.0, 0.1, 0.2], "Clutch1_in": [0.0, 0.5, 1.0]})
+        cases = [
+            {"parameters": {"CoupledClutches1_Inert1_J": 1.0 + i % 5}, "inputs": {"Clutch1_in": (i % 3) / 2}}
+            for i in range(200)
+        ]
+        cases += [{}, {"parameters": {"CoupledClutches1_Inert2_J": 2.0}}, {"inputs": {"Torque_in": 1.0}}]
+        # Evaluate cases with INITIALIZE EVALUATION
+        ref_outputs = []
+        for case in cases:
+            twin.initialize_evaluation(parameters=case.get("parameters"), inputs=case.get("inputs"))
+            ref_outputs.append(dict(twin.outputs))
+        # Evaluate cases with SWEEP CASE EVALUATION
+        sweep_outputs = [twin.evaluate_sweep_case(case.get("parameters"), case.get("inputs")) for case in cases]
+        for ref, outputs in zip(ref_outputs, sweep_outputs):
+            assert compare_dictionary(ref, outputs)
+        # Parameters and inputs dictionaries are updated
+        assert twin.inputs["Torque_in"] == 1.0
+        assert twin.parameters["CoupledClutches1_Inert1_J"] == 1.0
+        # Batch evaluation
+        twin.initialize_evaluation(parameters={"CoupledClutches1_Inert1_J": 2.0})
+        outputs_df = twin.evaluate_batch(inputs_df)
+        sweep_outputs_df = twin.evaluate_sweep_case(parameters={"CoupledClutches1_Inert1_J": 2.0}, inputs_df=inputs_df)
+        assert pd.DataFrame.equals(outputs_df, sweep_outputs_df)
+
+    def test_evaluate_step_by_step_array_gives_same_results(self):
+        twin = TwinModel(model_filepath=COUPLE_CLUTCHES_FILEPATH)
+        step_count = 1000
+        clutch1_idx = twin.input_names.index("Clutch1_in")
+        # Evaluate twin model with STEP BY STEP EVALUATION
+        twin.initialize_evaluation()
+        sbs_outputs = []
+        for i in range(step_count):
+            twin.evaluate_step_by_step(step_size=0.001, inputs={"Clutch1_in": i / step_count})
+            sbs_outputs.append(list(twin.outputs.values()))
+        # Evaluate twin model with ARRAY STEP BY STEP EVALUATION
+        twin.initialize_evaluation()
+        inputs = np.array(list(twin.inputs.values()))
+        outputs = np.empty(len(twin.output_names))
+        array_outputs = np.empty((step_count, len(twin.output_names)))
+        for i in range(step_count):
+            inputs[clutch1_idx] = i / step_count
+            twin.evaluate_step_by_step_array(step_size=0.001, inputs=inputs, outputs=outputs)
+            array_outputs[i] = outputs
+        assert np.allclose(array_outputs, np.array(sbs_outputs))
+        # Inputs and outputs dictionaries are updated after array evaluation
+        assert compare_dictionary(twin.outputs, dict(zip(twin.output_names, outputs.tolist())))
+        assert twin.inputs["Clutch1_in"] == (step_count - 1) / step_count
+        # Raise an error if INPUTS ARRAY HAS WRONG SIZE
+        with pytest.raises(TwinModelError) as e:
+            twin.evaluate_step_by_step_array(step_size=0.001, inputs=np.zeros(1))
+        assert "The input array size must match" in str(e)
+        # Raise an error BEFORE EVALUATION if OUTPUTS ARRAY IS INVALID, so that the step can be retried
+        evaluation_time = twin.evaluation_time
+        read_only_outputs = np.empty(len(twin.output_names))
+        read_only_outputs.flags.writeable = False
+        for invalid_outputs in [
+            np.empty(len(twin.output_names) + 1),
+            np.empty(len(twin.output_names), dtype=np.float32),
+            np.empty(2 * len(twin.output_names))[::2],
+            read_only_outputs,
+        ]:
+            with pytest.raises(TwinModelError) as e:
+                twin.evaluate_step_by_step_array(step_size=0.001, inputs=inputs, outputs=invalid_outputs)
+            assert "Given outputs array is not a writeable C-contiguous float64 array" in str(e)
+            assert twin.evaluation_time == evaluation_time
+        twin.evaluate_step_by_step_array(step_size=0.001, inputs=inputs, outputs=outputs)
+        assert np.isclose(twin.evaluation_time, evaluation_time + 0.001)
+
+    def test_evaluate_batch_array_gives_same_results(self):
+        inputs_df = pd.DataFrame(
+            {"Time": [0.0, 0.1, 0.2, 0.3], "Clutch1_in": [0.0, 1.0, 2.0, 3.0], "Clutch2_in": [0.0, 1.0, 2.0, 3.0]}
+        )
+        twin = TwinModel(model_filepath=COUPLE_CLUTCHES_FILEPATH)
+        twin.initialize_evaluation()
+        outputs_df = twin.evaluate_batch(inputs_df)
+        # Evaluate with a dictionary of arrays
+        twin.initialize_evaluation()
+        inputs = {"Clutch1_in": inputs_df["Clutch1_in"].values, "Clutch2_in": inputs_df["Clutch2_in"].values}
+        time, outputs = twin.evaluate_batch_array(inputs_df["Time"].values, inputs)
+        assert np.allclose(time, outputs_df["Time"].values)
+        assert np.allclose(outputs, outputs_df[twin.output_names].values)
+        # Evaluate with a 2D array and a caller provided output buffer
+        twin.initialize_evaluation()
+        inputs = np.zeros((inputs_df.shape[0], len(twin.input_names)))
+        for name in ["Clutch1_in", "Clutch2_in"]:
+            inputs[:, twin.input_names.index(name)] = inputs_df[name].values
+        buffer = np.empty((inputs_df.shape[0], len(twin.output_names) + 1))
+        time, outputs = twin.evaluate_batch_array(inputs_df["Time"].values, inputs, output_array=buffer)
+        assert np.shares_memory(outputs, buffer)
+        assert np.allclose(outputs, outputs_df[twin.output_names].values)
+        # Raise an error if INPUTS ARRAY HAS WRONG SHAPE
+        with pytest.raises(TwinModelError) as e:
+            twin.evaluate_batch_array(inputs_df["Time"].values, np.zeros((2, 2)))
+        assert "Please provide an array with shape" in str(e)
+        with pytest.raises(TwinModelError) as e:
+            twin.evaluate_batch_array(inputs_df["Time"].values, {"Clutch1_in": np.zeros(2)})
+        assert "Please provide a scalar or one value per time instant" in str(e)
+        # Raise an error if TIME HAS NO TIME INSTANT ZERO
+        with pytest.raises(TwinModelError) as e:
+            twin.evaluate_batch_array(np.array([0.1, 0.2]))
+        assert "Please provide inputs at time instant t=0.s" in str(e)
+
+    def test_evaluate_batch_chunks_gives_same_results(self):
+        inputs_df = pd.DataFrame(
+            {
+                "Time": np.linspace(0.0, 1.0, 101),
+                "Clutch1_in": np.linspace(0.0, 1.0, 101),
+                "Clutch2_in": np.linspace(1.0, 0.0, 101),
+            }
+        )
+        twin = TwinModel(model_filepath=COUPLE_CLUTCHES_FILEPATH)
+        twin.initialize_evaluation()
+        outputs_df = twin.evaluate_batch(inputs_df)
+        # Evaluate the same history with chunks of dataframes
+        twin.initialize_evaluation()
+        chunks = [inputs_df.iloc[i : i + 30].reset_index(drop=True) for i in range(0, inputs_df.shape[0], 30)]
+        chunked_outputs_df = pd.concat(twin.evaluate_batch_chunks(chunks), ignore_index=True)
+        assert chunked_outputs_df.shape == outputs_df.shape
+        assert np.allclose(chunked_outputs_df.values, outputs_df.values)
+        assert twin.evaluation_time == 1.0
+        assert compare_dictionary(
+            twin.inputs, {"Clutch1_in": 1.0, "Clutch2_in": 0.0, "Clutch3_in": 0.0, "Torque_in": 0.0}
+        )
+        # Evaluate the same history with chunks of arrays
+        twin.initialize_evaluation()
+        inputs = twin._create_array_inputs(inputs_df["Time"].values, inputs_df.to_dict(orient="series"))
+        chunks = np.array_split(inputs, 4)
+        chunked_outputs = np.vstack(list(twin.evaluate_batch_chunks(chunks, output_as_dataframe=False)))
+        assert np.allclose(chunked_outputs, outputs_df.values)
+        # Raise an error if CHUNKS ARE NOT INCREASING IN TIME
+        twin.initialize_evaluation()
+        with pytest.raises(TwinModelError) as e:
+            list(twin.evaluate_batch_chunks([inputs_df.iloc[0:10], inputs_df.iloc[0:10]]))
+        assert "Please provide chunks with strictly increasing time instants" in str(e)
+
+    def test_evaluate_batch_file_gives_same_results(self):
+        wd = reinit_settings()
+        os.mkdir(wd)
+        inputs_df = pd.DataFrame(
+            {
+                "Time": np.linspace(0.0, 1.0, 101),
+                "Clutch1_in": np.linspace(0.0, 1.0, 101),
+                "Clutch2_in": np.linspace(1.0, 0.0, 101),
+            }
+        )
+        twin = TwinModel(model_filepath=COUPLE_CLUTCHES_FILEPATH)
+        twin.initialize_evaluation()
+        outputs_df = twin.evaluate_batch(inputs_df)
+        # Missing inputs are kept constant and the input file is evaluated by chunks
+        input_filepath = os.path.join(wd, "inputs.csv")
+        inputs_df.to_csv(input_filepath, index=False)
+        twin.initialize_evaluation()
+        output_filepath = twin.evaluate_batch_file(input_filepath, os.path.join(wd, "outputs.csv"), chunksize=30)
+        assert np.allclose(pd.read_csv(output_filepath).values, outputs_df.values)
+        chunked_state = (twin.evaluation_time, twin.inputs, twin.outputs)
+        assert chunked_state[0] == 1.0
+        # Input file with all inputs is evaluated by the twin runtime, with the same state afterwards
+        full_inputs_df = twin._create_dataframe_inputs(inputs_df)
+        full_inputs_df.to_csv(input_filepath, index=False)
+        twin.initialize_evaluation()
+        output_filepath = twin.evaluate_batch_file(input_filepath, os.path.join(wd, "runtime_outputs.csv"))
+        assert np.allclose(pd.read_csv(output_filepath).values, outputs_df.values)
+        assert np.isclose(twin.evaluation_time, chunked_state[0])
+        assert compare_dictionary(twin.inputs, chunked_state[1])
+        assert np.allclose(list(twin.outputs.values()), list(chunked_state[2].values()))
+        # Raise an error if input file has a NON NUMERICAL first time instant
+        with open(input_filepath, "w") as f:
+            f.write(",".join(["Time"] + twin.input_names) + "\n")
+            f.write(",".join(["zero"] + ["0.0"] * len(twin.input_names)) + "\n")
+        twin.initialize_evaluation()
+        with pytest.raises(TwinModelError) as e:
+            twin.evaluate_batch_file(input_filepath, os.path.join(wd, "runtime_outputs.csv"))
+        assert "non numerical first time instant" in str(e)
+        # Raise an error if input file has NO TIME INSTANT t=0.s
+        inputs_df.iloc[1:].to_csv(input_filepath, index=False)
+        twin.initialize_evaluation()
+        with pytest.raises(TwinModelError) as e:
+            twin.evaluate_batch_file(input_filepath, os.path.join(wd, "outputs.csv"))
+        assert "Please provide inputs at time instant t=0.s" in str(e)
+
+    def test_evaluate_batch_file_with_parquet(self):
+        pytest.importorskip("pyarrow")
+        wd = reinit_settings()
+        os.mkdir(wd)
+        inputs_df = pd.DataFrame({"Time": np.linspace(0.0, 1.0, 101), "Clutch1_in": np.linspace(0.0, 1.0, 101)})
+        twin = TwinModel(model_filepath=COUPLE_CLUTCHES_FILEPATH)
+        twin.initialize_evaluation()
+        outputs_df = twin.evaluate_batch(inputs_df)
+        input_filepath = os.path.join(wd, "inputs.parquet")
+        inputs_df.to_parquet(input_filepath)
+        twin.initialize_evaluation()
+        output_filepath = twin.evaluate_batch_file(input_filepath, os.path.join(wd, "outputs.parquet"), chunksize=30)
+        assert np.allclose(pd.read_parquet(output_filepath).values, outputs_df.values)
+
     def test_evaluation_initialization_with_config_file(self):
         model_filepath = COUPLE_CLUTCHES_FILEPATH
         twin = TwinModel(model_filepath=model_filepath)
@@ -488,6 +685,29 @@ class TestTwinModel:
         out2 = model2.outputs
         assert compare_dictionary(out1, out2)
 
+    def test_save_and_load_state_with_compressed_storage(self):
+        # Init unit test
+        wd = reinit_settings()
+        # Save state test
+        model1 = TwinModel(model_filepath=COUPLE_CLUTCHES_FILEPATH)
+        model1.set_saved_state_storage(SavedStateStorage(compression="zlib", chunk_size=4096))
+        model1.initialize_evaluation()
+        for value in [1.0, 2.0, 3.0]:
+            model1.evaluate_step_by_step(step_size=0.01, inputs={"Clutch1_in": value})
+            model1.save_state()
+        statistics = model1.saved_state_storage_statistics
+        assert statistics["saves"] == 3
+        assert statistics["stored_bytes"] < statistics["raw_bytes"]
+        # Load state test
+        model2 = TwinModel(model_filepath=COUPLE_CLUTCHES_FILEPATH)
+        model2.load_state(model1.id, model1.evaluation_time)
+        assert compare_dictionary(model1.outputs, model2.outputs)
+        assert model2.saved_state_storage_statistics["loads"] == 1
+        # Progress step by step evaluations give same results
+        model1.evaluate_step_by_step(step_size=0.05)
+        model2.evaluate_step_by_step(step_size=0.05)
+        assert compare_dictionary(model1.outputs, model2.outputs)
+
     def test_save_and_load_state_with_dynarom(self):
         # Init unit test
         wd = reinit_settings()
@@ -641,6 +861,35 @@ class TestTwinModel:
         except TwinModelError as e:
             assert "Please call this method with a valid TBROM name." in str(e)
 
+    def test_tbrom_info_is_resolved_once(self):
+        reinit_settings()
+        model_filepath = download_file("ThermalTBROM_23R1_other.twin", "twin_files")
+        twin = TwinModel(model_filepath=model_filepath)
+        twin.initialize_evaluation()
+        tbrom_info = twin.tbrom_info
+        # Visualization resources are not queried anymore and log key does not grow across re-initializations
+        twin._twin_runtime.twin_get_visualization_resources = None
+        for i in range(3):
+            twin.initialize_evaluation(tbrom_outputs=False)
+            assert twin._log_key == "InitializeEvaluationWithDictionary"
+        twin.initialize_evaluation()
+        assert twin.tbrom_info == tbrom_info
+        assert twin._tbrom_outputs_enabled
+
+    def test_tbrom_outputs_are_optional(self):
+        reinit_settings()
+        model_filepath = download_file("ThermalTBROM_23R1_other.twin", "twin_files")
+        twin = TwinModel(model_filepath=model_filepath)
+        # Image directory is set even if TBROM outputs are disabled at first initialization
+        twin.initialize_evaluation(tbrom_outputs=False)
+        assert twin._tbrom_image_directory_is_set
+        assert twin._tbrom_outputs_enabled is False
+        twin.evaluate_step_by_step(step_size=0.1)
+        # TBROM outputs (3D data and images) can be enabled again
+        twin.initialize_evaluation(tbrom_outputs=True)
+        assert twin._tbrom_outputs_enabled is True
+        twin.evaluate_step_by_step(step_size=0.1)
+
     def test_raised_errors_with_tbrom_bad_view(self):
         reinit_settings()
         model_filepath = download_file("ThermalTBROM_23R1_other.twin", "twin_files")
@@ -689,5 +938,28 @@ class TestTwinModel:
             log_str = log.readlines()
         assert "Could not find the image file for given available rom_name" in "".join(log_str)
 
+    def test_get_image_filepaths_gives_same_results_as_get_image_filepath(self):
+        reinit_settings()
+        model_filepath = download_file("ThermalTBROM_23R1_other.twin", "twin_files")
+        twin = TwinModel(model_filepath=model_filepath)
+        twin.initialize_evaluation()
+        for step in range(3):
+            twin.evaluate_step_by_step(step_size=0.1)
+        rom_name = twin.tbrom_names[0]
+        view_names = twin.get_available_view_names(rom_name)
+        image_filepaths = twin.get_image_filepaths(rom_name)
+        assert list(image_filepaths) == sorted(image_filepaths)
+        if sys.platform != "linux":
+            # TODO - Fix BUG755776
+            assert len(image_filepaths) > 0
+        for evaluation_time, view_filepaths in image_filepaths.items():
+            assert set(view_filepaths).issubset(view_names)
+            for view_name, filepath in view_filepaths.items():
+                expected_filepath = twin.get_image_filepath(rom_name, view_name, evaluation_time)
+                assert os.path.normpath(filepath) == os.path.normpath(expected_filepath)
+        # Only the given views are listed
+        image_filepaths = twin.get_image_filepaths(rom_name, view_names[0:1])
+        assert all(list(view_filepaths) == view_names[0:1] for view_filepaths in image_filepaths.values())
+
     def test_clean_unit_test(self):
         reinit_settings()
@@ -0,0 +1,77 @@
+import os
+import shutil
+
+import numpy as np
+from pytwin import TwinModel, get_twin_model_metadata, read_twin_model_metadata
+from pytwin.evaluate.twin_model_metadata import twin_model_metadata_filepath, write_twin_model_metadata
+
+COUPLE_CLUTCHES_FILEPATH = os.path.join(os.path.dirname(__file__), "data", "CoupleClutches_22R2_other.twin")
+
+UNIT_TEST_WD = os.path.join(os.path.dirname(__file__), "unit_test_wd")
+METADATA_CACHE_DIR = os.path.join(UNIT_TEST_WD, "metadata_cache")
+
+
+def reinit_metadata_cache():
+    if os.path.exists(METADATA_CACHE_DIR):
+        shutil.rmtree(METADATA_CACHE_DIR)
+    os.makedirs(METADATA_CACHE_DIR)
+    return METADATA_CACHE_DIR
+
+
+def build_metadata():
+    return {
+        "version": 1,
+        "model_name": "model",
+        "api_version": "1.0",
+        "input_names": ["input1"],
+        "output_names": ["output1"],
+        "parameter_names": ["param1"],
+        "default_simulation_settings": [1.0, 0.1, 1e-4],
+        "visualization_resources": None,
+        "var_properties": {
+            "Name": ["input1", "output1", "param1"],
+            "Unit": ["m", "m", "TWIN_VARPROP_NOTDEFINED"],
+            "Type": ["Length", "Length", None],
+            "Start": np.array([1.0, np.nan, 2.0]),
+            "Min": np.array([np.nan, np.nan, np.nan]),
+            "Max": np.array([np.nan, np.nan, np.nan]),
+            "Description": ["", "", ""],
+        },
+    }
+
+
+class TestTwinModelMetadata:
+    def test_write_and_read_metadata(self):
+        cache_dir = reinit_metadata_cache()
+        model_filepath = os.path.join(UNIT_TEST_WD, "model.twin")
+        with open(model_filepath, "wb") as f:
+            f.write(b"twin file content")
+        assert read_twin_model_metadata(model_filepath, cache_dir) is None
+        metadata_filepath = write_twin_model_metadata(model_filepath, cache_dir, build_metadata())
+        assert metadata_filepath == twin_model_metadata_filepath(model_filepath, cache_dir)
+        metadata = read_twin_model_metadata(model_filepath, cache_dir)
+        assert metadata["input_names"] == ["input1"]
+        assert metadata["var_properties"]["Unit"] == ["m", "m", "TWIN_VARPROP_NOTDEFINED"]
+        assert np.array_equal(metadata["var_properties"]["Start"], [1.0, np.nan, 2.0], equal_nan=True)
+        # Metadata is not found anymore once twin file content has changed
+        with open(model_filepath, "wb") as f:
+            f.write(b"modified twin file content")
+        assert read_twin_model_metadata(model_filepath, cache_dir) is None
+        # Corrupted metadata file is ignored
+        metadata_filepath = write_twin_model_metadata(model_filepath, cache_dir, build_metadata())
+        with open(metadata_filepath, "w") as f:
+            f.write("{")
+        assert read_twin_model_metadata(model_filepath, cache_dir) is None
+
+    def test_twin_model_with_metadata_cache_gives_same_results(self):
+        cache_dir = reinit_metadata_cache()
+        metadata = get_twin_model_metadata(COUPLE_CLUTCHES_FILEPATH, cache_dir)
+        assert read_twin_model_metadata(COUPLE_CLUTCHES_FILEPATH, cache_dir)["input_names"] == metadata["input_names"]
+        twin_model_ref = TwinModel(COUPLE_CLUTCHES_FILEPATH)
+        twin_model = TwinModel(COUPLE_CLUTCHES_FILEPATH, metadata_cache_dir=cache_dir)
+        assert twin_model.inputs == twin_model_ref.inputs
+        assert twin_model.parameters == twin_model_ref.parameters
+        twin_model_ref.initialize_evaluation()
+        twin_model.initialize_evaluation()
+        assert twin_model.outputs == twin_model_ref.outputs
+        assert twin_model.tbrom_info == twin_model_ref.tbrom_info
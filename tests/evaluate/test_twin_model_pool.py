@@ -0,0 +1,107 @@
+import os
+import tempfile
+
+import pandas as pd
+import pytest
+from pytwin import TwinModel, TwinModelPool, TwinModelPoolError, get_pytwin_working_dir, modify_pytwin_logging
+from pytwin.settings import PyTwinLogLevel, get_pytwin_log_level
+
+COUPLE_CLUTCHES_FILEPATH = os.path.join(os.path.dirname(__file__), "data", "CoupleClutches_22R2_other.twin")
+
+
+def get_worker_settings(_):
+    return os.getpid(), get_pytwin_working_dir(), get_pytwin_log_level()
+
+
+def get_output_value(twin_model, case):
+    twin_model.initialize_evaluation(parameters={"CoupledClutches1_Inert1_J": case})
+    return twin_model.outputs["Clutch1_torque"]
+
+
+class TestTwinModelPool:
+    def test_instantiation_with_invalid_arguments(self):
+        with pytest.raises(TwinModelPoolError) as e:
+            TwinModelPool(model_filepath="unknown.twin")
+        assert "Please provide existing filepath" in str(e)
+        with pytest.raises(TwinModelPoolError) as e:
+            TwinModelPool(model_filepath=COUPLE_CLUTCHES_FILEPATH, processes=0)
+        assert "Please provide a strictly positive number of processes" in str(e)
+
+    def test_workers_do_not_erase_parent_working_dir(self):
+        wd = get_pytwin_working_dir()
+        modify_pytwin_logging(new_level=PyTwinLogLevel.PYTWIN_LOG_DEBUG)
+        with TwinModelPool(model_filepath=COUPLE_CLUTCHES_FILEPATH, processes=2) as pool:
+            assert pool.processes == 2
+            # Workers use the parent logging settings and a subdirectory of the parent working directory
+            for pid, worker_wd, worker_log_level in pool._pool.map(get_worker_settings, range(4)):
+                assert worker_wd == os.path.join(wd, "pool_workers", str(pid))
+                assert worker_log_level == PyTwinLogLevel.PYTWIN_LOG_DEBUG
+                assert not os.path.exists(os.path.join(tempfile.gettempdir(), str(pid)))
+        modify_pytwin_logging(new_level=PyTwinLogLevel.PYTWIN_LOG_INFO)
+        assert os.path.exists(wd)
+        assert get_pytwin_working_dir() == wd
+        with pytest.raises(TwinModelPoolError) as e:
+            pool.evaluate([{}])
+        assert "Twin model pool has been closed" in str(e)
+
+    def test_pool_is_terminated_on_error(self):
+        with pytest.raises(ValueError):
+            with TwinModelPool(model_filepath=COUPLE_CLUTCHES_FILEPATH, processes=2) as pool:
+                raise ValueError("Stop")
+        assert pool._pool is None
+
+    def test_evaluate_gives_same_results_as_twin_model(self):
+        inputs_df = pd.DataFrame({"Time": [0.0, 0.1, 0.2], "Clutch1_in": [0.0, 0.5, 1.0]})
+        cases = [
+            {"parameters": {"CoupledClutches1_Inert1_J": 1.0 + i}, "inputs": {"Clutch2_in": 0.1 * i}} for i in range(4)
+        ]
+        cases += [{"inputs_df": inputs_df}]
+        twin_model = TwinModel(model_filepath=COUPLE_CLUTCHES_FILEPATH)
+        expected_results = []
+        for case in cases:
+            twin_model.initialize_evaluation(parameters=case.get("parameters"), inputs=case.get("inputs"))
+            if "inputs_df" in case:
+                expected_results.append(twin_model.evaluate_batch(case["inputs_df"]))
+            else:
+                expected_results.append(twin_model.outputs)
+        with TwinModelPool(model_filepath=COUPLE_CLUTCHES_FILEPATH, processes=2) as pool:
+            # Results in submission order
+            results = pool.evaluate(cases)
+            for result, expected_result in zip(results[:-1], expected_results[:-1]):
+                assert result == expected_result
+            assert results[-1].equals(expected_results[-1])
+            # Results in completion order
+            case_indices = []
+            for case_index, result in pool.imap_unordered(cases[:-1]):
+                assert result == expected_results[case_index]
+                case_indices.append(case_index)
+            assert sorted(case_indices) == list(range(len(cases) - 1))
+
+    def test_evaluate_with_function_gives_same_results_as_twin_model(self):
+        values = [1.0, 2.0, 3.0, 4.0]
+        twin_model = TwinModel(model_filepath=COUPLE_CLUTCHES_FILEPATH)
+        expected_results = [get_output_value(twin_model, value) for value in values]
+        with TwinModelPool(model_filepath=COUPLE_CLUTCHES_FILEPATH, processes=2) as pool:
+            assert pool.evaluate(values, function=get_output_value) == expected_results
+            for case_index, result in pool.imap_unordered(values, chunksize=2, function=get_output_value):
+                assert result == expected_results[case_index]
+
+    def test_evaluate_branches_gives_same_results_as_twin_model(self):
+        twin_model = TwinModel(model_filepath=COUPLE_CLUTCHES_FILEPATH)
+        twin_model.initialize_evaluation()
+        twin_model.evaluate_step_by_step(step_size=0.1, inputs={"Clutch1_in": 1.0})
+        snapshot = twin_model.save_snapshot()
+        branches = {
+            f"Clutch2_in={value}": pd.DataFrame({"Time": [0.1, 0.2, 0.3], "Clutch2_in": [value] * 3})
+            for value in [0.25, 0.5, 0.75]
+        }
+        expected_outputs = {
+            name: twin_model.evaluate_batch_from_snapshot(snapshot, df) for name, df in branches.items()
+        }
+        with TwinModelPool(model_filepath=COUPLE_CLUTCHES_FILEPATH, processes=2) as pool:
+            outputs_df = pool.evaluate_branches(snapshot, branches)
+            assert list(outputs_df.index.get_level_values("Branch").unique()) == list(branches)
+            for name, expected_output_df in expected_outputs.items():
+                assert outputs_df.loc[name].equals(expected_output_df)
+            outputs_df = pool.evaluate_branches(snapshot, list(branches.values()))
+            assert outputs_df.loc[1].equals(expected_outputs["Clutch2_in=0.5"])
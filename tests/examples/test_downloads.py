@@ -1,8 +1,15 @@
 import os
 import shutil
 
+import numpy as np
+import pandas as pd
+import pytest
 import pytwin.examples.downloads as dld
 
+COUPLED_CLUTCHES_INPUT_FILEPATH = os.path.join(
+    os.path.dirname(__file__), "..", "evaluate", "data", "CoupledClutches_input.csv"
+)
+
 
 class TestDownloads:
     def test_delete_downloads(self):
@@ -30,3 +37,22 @@ class TestDownloads:
         csv_input = dld.download_file("CoupledClutches_input.csv", "twin_input_files")
         data = dld.load_data(csv_input)
         assert not data.empty
+
+    def test_load_data_by_chunks(self):
+        data = dld.load_data(COUPLED_CLUTCHES_INPUT_FILEPATH)
+        assert list(data.columns) == ["Time", "Torque_in", "Clutch1_in", "Clutch2_in", "Clutch3_in"]
+        assert data.shape == (1501, 5)
+        assert all(dtype == np.float64 for dtype in data.dtypes)
+        chunks = list(dld.load_data(COUPLED_CLUTCHES_INPUT_FILEPATH, chunksize=400))
+        assert [len(chunk) for chunk in chunks] == [400, 400, 400, 301]
+        assert pd.concat(chunks, ignore_index=True).equals(data)
+        assert dld.load_data(COUPLED_CLUTCHES_INPUT_FILEPATH, engine="python").equals(data)
+
+    def test_load_data_with_pyarrow(self):
+        pytest.importorskip("pyarrow")
+        data = dld.load_data(COUPLED_CLUTCHES_INPUT_FILEPATH)
+        assert dld.load_data(COUPLED_CLUTCHES_INPUT_FILEPATH, engine="pyarrow").equals(data)
+
+    def test_clean_column_names(self):
+        column_names = ['"Time"', '"Model.Clutch1_in [Nm]"', "Model.Sub.Clutch2_in"]
+        assert dld._clean_column_names(column_names) == ["Time", "Clutch1_inNm", "Sub.Clutch2_in"]
@@ -0,0 +1,156 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from pytwin import ParametricSweep, ParametricSweepError, TwinModel, full_factorial, latin_hypercube
+
+COUPLE_CLUTCHES_FILEPATH = os.path.join(
+    os.path.dirname(__file__), "..", "evaluate", "data", "CoupleClutches_22R2_other.twin"
+)
+UNIT_TEST_WD = os.path.join(os.path.dirname(__file__), "unit_test_wd")
+
+
+def reinit_sweep_wd():
+    import shutil
+
+    if os.path.exists(UNIT_TEST_WD):
+        shutil.rmtree(UNIT_TEST_WD)
+    os.mkdir(UNIT_TEST_WD)
+    return UNIT_TEST_WD
+
+
+def max_torque(outputs_df):
+    return outputs_df["Clutch1_torque"].max()
+
+
+class TestDesigns:
+    def test_full_factorial(self):
+        cases = full_factorial({"param1": [1.0, 2.0, 3.0], "param2": [10.0, 20.0]})
+        assert list(cases.columns) == ["param1", "param2"]
+        assert len(cases) == 6
+        assert len(cases.drop_duplicates()) == 6
+
+    def test_latin_hypercube(self):
+        cases = latin_hypercube({"param1": (0.0, 1.0), "param2": (10.0, 20.0)}, sample_count=10, seed=0)
+        assert len(cases) == 10
+        # Each interval of each parameter range is sampled exactly once
+        assert sorted(np.floor(cases["param1"] * 10).astype(int)) == list(range(10))
+        assert sorted(np.floor(cases["param2"] - 10.0).astype(int)) == list(range(10))
+        assert cases.equals(latin_hypercube({"param1": (0.0, 1.0), "param2": (10.0, 20.0)}, 10, seed=0))
+        with pytest.raises(ParametricSweepError):
+            latin_hypercube({"param1": (0.0, 1.0)}, sample_count=0)
+
+
+class TestParametricSweep:
+    def test_instantiation_with_invalid_arguments(self):
+        cases = full_factorial({"CoupledClutches1_Inert1_J": [1.0, 2.0]})
+        with pytest.raises(ParametricSweepError) as e:
+            ParametricSweep("unknown.twin", cases)
+        assert "does not exist" in str(e)
+        with pytest.raises(ParametricSweepError):
+            ParametricSweep(COUPLE_CLUTCHES_FILEPATH, cases, mode="unknown")
+        with pytest.raises(ParametricSweepError):
+            ParametricSweep(COUPLE_CLUTCHES_FILEPATH, cases, mode="step_by_step")
+        with pytest.raises(ParametricSweepError):
+            ParametricSweep(COUPLE_CLUTCHES_FILEPATH, cases, inputs_df=pd.DataFrame({"Clutch1_in": [0.0]}))
+        with pytest.raises(ParametricSweepError):
+            ParametricSweep(COUPLE_CLUTCHES_FILEPATH, cases, processes=0)
+
+    def test_checkpoint_of_another_sweep_is_not_resumed(self):
+        wd = reinit_sweep_wd()
+        checkpoint_filepath = os.path.join(wd, "sweep.jsonl")
+        cases = full_factorial({"CoupledClutches1_Inert1_J": [1.0, 2.0]})
+        sweep = ParametricSweep(COUPLE_CLUTCHES_FILEPATH, cases, checkpoint_filepath=checkpoint_filepath)
+        other_sweep = ParametricSweep(
+            COUPLE_CLUTCHES_FILEPATH, cases.iloc[::-1], checkpoint_filepath=checkpoint_filepath
+        )
+        assert sweep.signature != other_sweep.signature
+        other_model_filepath = os.path.join(os.path.dirname(COUPLE_CLUTCHES_FILEPATH), "RC_heat_circuit_23R1.twin")
+        assert ParametricSweep(other_model_filepath, cases).signature != sweep.signature
+        with open(checkpoint_filepath, "w") as f:
+            f.write(json.dumps({"signature": other_sweep.signature}) + "\n")
+            f.write(json.dumps({"case": 1, "kpis": {"Clutch1_torque": 1.0}}) + "\n")
+            # Record that was being written when the sweep was stopped
+            f.write('{"case": 0, "kp')
+        assert other_sweep._read_checkpoint()[0] == {1: ({"Clutch1_torque": 1.0}, None)}
+        with pytest.raises(ParametricSweepError) as e:
+            sweep.run()
+        assert "written by another sweep" in str(e)
+
+    def test_checkpoint_is_appended_after_last_complete_line(self):
+        wd = reinit_sweep_wd()
+        checkpoint_filepath = os.path.join(wd, "sweep.jsonl")
+        cases = full_factorial({"CoupledClutches1_Inert1_J": [1.0, 2.0]})
+        sweep = ParametricSweep(COUPLE_CLUTCHES_FILEPATH, cases, checkpoint_filepath=checkpoint_filepath)
+        # Empty checkpoint file (sweep stopped before the signature was written)
+        open(checkpoint_filepath, "w").close()
+        results, output_names, checkpoint_size = sweep._read_checkpoint()
+        assert results == {} and output_names is None and checkpoint_size == 0
+        with sweep._open_checkpoint(checkpoint_size) as checkpoint:
+            checkpoint.write(b'{"output_names": ["Clutch1_torque"]}\n')
+            checkpoint.write(b'{"case": 1, "kpis": {"Clutch1_torque": 1.0}}\n')
+            # Record that was being written when the sweep was stopped
+            checkpoint.write(b'{"case": 0, "kp')
+        # Resuming twice does not append records after the partial line
+        for i in range(2):
+            results, output_names, checkpoint_size = sweep._read_checkpoint()
+            assert results == {1: ({"Clutch1_torque": 1.0}, None)}
+            assert output_names == ["Clutch1_torque"]
+            with sweep._open_checkpoint(checkpoint_size) as checkpoint:
+                checkpoint.write(b'{"case": 0, "kp')
+        with open(checkpoint_filepath) as f:
+            assert json.loads(f.readline()) == {"signature": sweep.signature}
+
+    def test_sweep_gives_same_results_as_twin_model(self):
+        inputs_df = pd.DataFrame({"Time": [0.0, 0.1, 0.2, 0.3], "Clutch1_in": [0.0, 0.5, 1.0, 1.0]})
+        cases = latin_hypercube({"CoupledClutches1_Inert1_J": (1.0, 2.0)}, sample_count=6, seed=0)
+        twin_model = TwinModel(model_filepath=COUPLE_CLUTCHES_FILEPATH)
+        expected_trajectories = []
+        for parameters in cases.to_dict(orient="records"):
+            outputs_df = twin_model.evaluate_sweep_case(parameters, inputs={"Clutch1_in": 0.0}, inputs_df=inputs_df)
+            expected_trajectories.append(outputs_df[twin_model.output_names].to_numpy())
+        expected_trajectories = np.array(expected_trajectories)
+        for mode, processes in [("batch", 1), ("batch", 2), ("step_by_step", 1)]:
+            sweep = ParametricSweep(
+                COUPLE_CLUTCHES_FILEPATH,
+                cases,
+                inputs_df=inputs_df,
+                mode=mode,
+                kpis={"max_torque": max_torque},
+                keep_trajectories=True,
+                processes=processes,
+            )
+            result = sweep.run()
+            result_df = result.to_dataframe()
+            assert list(result_df.columns) == ["CoupledClutches1_Inert1_J", "max_torque"]
+            assert result.output_names == twin_model.output_names
+            assert np.allclose(result.trajectories, expected_trajectories)
+            assert np.allclose(result_df["max_torque"], expected_trajectories[:, :, 0].max(axis=1))
+
+    def test_sweep_is_resumed_from_checkpoint(self):
+        wd = reinit_sweep_wd()
+        checkpoint_filepath = os.path.join(wd, "sweep.jsonl")
+        inputs_df = pd.DataFrame({"Time": [0.0, 0.1, 0.2], "Clutch1_in": [0.0, 0.5, 1.0]})
+        cases = full_factorial({"CoupledClutches1_Inert1_J": [1.0, 2.0, 3.0, 4.0]})
+        sweep = ParametricSweep(
+            COUPLE_CLUTCHES_FILEPATH, cases, inputs_df=inputs_df, checkpoint_filepath=checkpoint_filepath
+        )
+        expected_result = sweep.run()
+        expected_df = expected_result.to_dataframe()
+        # Simulate a sweep stopped after 2 cases (signature, output names and 2 cases)
+        with open(checkpoint_filepath) as f:
+            lines = f.readlines()
+        assert len(lines) == 6
+        with open(checkpoint_filepath, "w") as f:
+            f.writelines(lines[0:4])
+        finished_cases = []
+        sweep.run(progress=lambda finished_case_count, case_count: finished_cases.append(finished_case_count))
+        assert finished_cases == [3, 4]
+        result = ParametricSweep(
+            COUPLE_CLUTCHES_FILEPATH, cases, inputs_df=inputs_df, checkpoint_filepath=checkpoint_filepath
+        ).run()
+        assert result.to_dataframe().equals(expected_df)
+        # Output names of a fully resumed sweep are read from the checkpoint file
+        assert result.output_names == expected_result.output_names
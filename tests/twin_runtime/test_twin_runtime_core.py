@@ -1,8 +1,21 @@
+from ctypes import POINTER, c_double, cast
+import os
+
+import numpy as np
+import pandas as pd
 import pytest
 from pytwin import TwinRuntime, TwinRuntimeError
 import pytwin.examples.downloads as downloads
+import pytwin.twin_runtime.twin_runtime_core as twin_runtime_core
 import pytwin.twin_runtime.twin_runtime_error as twin_runtime_error
 
+PROPERTY_ERRORS = (
+    twin_runtime_error.PropertyNotDefinedError,
+    twin_runtime_error.PropertyNotApplicableError,
+    twin_runtime_error.PropertyInvalidError,
+    twin_runtime_error.PropertyError,
+)
+
 
 class TestTwinRuntime:
     def test_evaluate_twin_status(self):
@@ -40,3 +53,113 @@ class TestTwinRuntime:
         with pytest.raises(twin_runtime_error.PropertyNotDefinedError) as e:
             TwinRuntime.evaluate_twin_prop_status(1, twin_runtime, "unit_test_method", 0)
         assert "error" in str(e.value)
+
+    def test_batch_mode_row_pointers(self):
+        data = np.arange(12, dtype=np.float64).reshape(4, 3)
+        rows = twin_runtime_core.build_ctype_row_pointers(data)
+        # Each pointer addresses the first element of its row in the NumPy block
+        for i in range(data.shape[0]):
+            row = cast(int(rows[i]), POINTER(c_double))
+            assert [row[j] for j in range(data.shape[1])] == data[i].tolist()
+        # Output rows follow the SDK batch mode conventions
+        assert twin_runtime_core.get_batch_mode_output_rows(np.array([0.0, 0.1, 0.2])) == 3
+        assert twin_runtime_core.get_batch_mode_output_rows(np.array([0.1, 0.2])) == 3
+        assert twin_runtime_core.get_batch_mode_output_rows(np.array([0.0, 1.0]), step_size=0.1) == 11
+
+    def test_batch_mode_marshalling_gives_same_values(self):
+        rows, cols = 200, 51
+        input_df = pd.DataFrame(np.random.rand(rows, cols))
+        # Cell by cell marshalling (previous implementation)
+        input_data = twin_runtime_core.build_ctype_2d_array(rows, input_df.astype(np.float64))
+        # Row pointer tables over contiguous blocks
+        input_block = np.ascontiguousarray(input_df.to_numpy(dtype=np.float64))
+        input_rows = twin_runtime_core.build_ctype_row_pointers(input_block)
+        assert input_rows.shape[0] == rows
+        for i in [0, rows // 2, rows - 1]:
+            row = cast(int(input_rows[i]), POINTER(c_double))
+            assert [row[j] for j in range(cols)] == [input_data[i][j] for j in range(cols)]
+
+    def test_simulate_batch_mode_array(self):
+        model_fp = downloads.download_file("CoupledClutches_23R1_other.twin", "twin_files", force_download=True)
+        twin_runtime = TwinRuntime(model_fp, load_model=True)
+        twin_runtime.twin_instantiate()
+        twin_runtime.twin_initialize()
+        inputs = np.zeros((3, twin_runtime.number_inputs + 1))
+        inputs[:, 0] = [0.0, 0.1, 0.2]
+        inputs[:, 1] = [1.0, 2.0, 3.0]
+        outputs = twin_runtime.twin_simulate_batch_mode_array(inputs)
+        assert outputs.shape == (3, twin_runtime.number_outputs + 1)
+        assert np.allclose(outputs[:, 0], inputs[:, 0])
+        # Results are written into caller provided buffer
+        buffer = np.zeros((10, twin_runtime.number_outputs + 1))
+        twin_runtime.twin_reset()
+        twin_runtime.twin_initialize()
+        view = twin_runtime.twin_simulate_batch_mode_array(inputs, output_array=buffer)
+        assert np.shares_memory(view, buffer)
+        assert np.allclose(view, outputs)
+        # Raise an error if the buffer is too small
+        with pytest.raises(TwinRuntimeError):
+            twin_runtime.twin_simulate_batch_mode_array(inputs, output_array=np.zeros((1, outputs.shape[1])))
+
+    def test_io_with_multiple_runtimes(self):
+        data_dir = os.path.join(os.path.dirname(__file__), "..", "evaluate", "data")
+        runtimes = []
+        for model_fn in ["CoupleClutches_22R2_other.twin", "RC_heat_circuit_23R1.twin"]:
+            twin_runtime = TwinRuntime(os.path.join(data_dir, model_fn), load_model=True)
+            twin_runtime.twin_instantiate()
+            twin_runtime.twin_initialize()
+            runtimes.append(twin_runtime)
+        # Models with different numbers of inputs and outputs are used alternately in the same process
+        for i in range(3):
+            for twin_runtime in runtimes:
+                twin_runtime.twin_set_inputs(np.full(twin_runtime.number_inputs, float(i)))
+                outputs = twin_runtime.twin_get_outputs()
+                assert len(outputs) == twin_runtime.number_outputs
+                outputs_array = twin_runtime.twin_get_outputs_array(np.empty(twin_runtime.number_outputs))
+                assert outputs_array.tolist() == outputs
+        # Raise an error if the input array size does not match the number of inputs
+        with pytest.raises(TwinRuntimeError):
+            runtimes[0].twin_set_inputs(np.zeros(runtimes[0].number_inputs + 1))
+
+    def test_load_dll_is_cached(self):
+        twin_runtime_library = TwinRuntime.load_dll()
+        default_library_path = os.path.join(
+            twin_runtime_core.CUR_DIR, TwinRuntime.os_version, TwinRuntime.twin_runtime_library
+        )
+        assert TwinRuntime.load_dll() is twin_runtime_library
+        assert TwinRuntime.load_dll(default_library_path) is twin_runtime_library
+        assert twin_runtime_library.TwinSimulate.argtypes is not None
+        path_length = len(os.environ["PATH"])
+        model_filepath = os.path.join(os.path.dirname(__file__), "..", "evaluate", "data", "RC_heat_circuit_23R1.twin")
+        assert TwinRuntime.twin_is_cross_platform(model_filepath) in [True, False]
+        twin_runtime = TwinRuntime(model_filepath, load_model=False)
+        assert twin_runtime._twin_runtime_library is twin_runtime_library
+        assert len(os.environ["PATH"]) == path_length
+
+    def test_var_properties_gives_same_results_as_getters(self):
+        model_filepath = os.path.join(os.path.dirname(__file__), "..", "evaluate", "data", "RC_heat_circuit_23R1.twin")
+        twin_runtime = TwinRuntime(model_filepath, load_model=True)
+        var_properties = twin_runtime.twin_get_var_properties()
+        var_names = (
+            list(twin_runtime.twin_get_input_names())
+            + list(twin_runtime.twin_get_output_names())
+            + list(twin_runtime.twin_get_param_names())
+        )
+        assert var_properties["Name"] == var_names
+        for i, var_name in enumerate(var_names):
+            try:
+                assert var_properties["Unit"][i] == twin_runtime.twin_get_var_unit(var_name)
+            except PROPERTY_ERRORS as e:
+                assert var_properties["Unit"][i] == e.property_status_flag.name
+            try:
+                assert var_properties["Start"][i] == twin_runtime.twin_get_var_start(var_name)
+            except PROPERTY_ERRORS:
+                assert np.isnan(var_properties["Start"][i])
+        # Properties are cached per model file
+        assert len(TwinRuntime._var_properties_cache) > 0
+        other_twin_runtime = TwinRuntime(model_filepath, load_model=True)
+        df = other_twin_runtime.full_model_properties_info_df()
+        assert list(df.columns) == TwinRuntime.var_properties_columns
+        assert df["Name"].tolist() == var_names
+        rows = other_twin_runtime.build_prop_info_df(var_names[:2])
+        assert [row[0] for row in rows] == var_names[:2]